@@ -1,12 +1,81 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from contextlib import aclosing
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
 import sys
 import os
+import json
+import logging
+import time
+import uuid
+from typing import List
+
+PROCESS_STARTED = time.perf_counter()
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from src.rag_system import RAGDemo
-from config import GEMINI_API_KEY
+# Only light modules are imported here; LangChain, FAISS and the embedding model
+# are loaded by the background warmup so the server binds its port at once
+from src.jobs import JobManager
+from src.lifecycle import Warmup
+from src import metrics
+from src.profiler import SamplingProfiler
+from config import (
+    GEMINI_API_KEY,
+    EMBEDDING_BACKEND,
+    EMBEDDING_MODEL,
+    ONNX_MODEL_DIR,
+    ONNX_INT8,
+    RETRIEVAL_WORKERS,
+    INGESTION_WORKERS,
+    EMBEDDING_BATCH_SIZE,
+    PARSER_WORKERS,
+    BATCH_CONCURRENCY,
+    MAX_BATCH_QUESTIONS,
+    LLM_BASE_URL,
+    LLM_TIMEOUT,
+    LLM_MAX_RETRIES,
+    LLM_MAX_CONCURRENCY,
+    LLM_BREAKER_FAILURES,
+    LLM_BREAKER_RESET,
+    LOG_LEVEL,
+    PROFILER_ENABLED,
+    PROFILER_INTERVAL_MS,
+    MIN_CHUNK_SIZE,
+    MAX_CHUNK_SIZE,
+    CHUNK_OVERLAP,
+    ANN_INDEX_TYPE,
+    IVF_NPROBE,
+    HNSW_EF_SEARCH,
+    INDEX_QUANTIZATION,
+    INDEX_STORAGE_DIR,
+    MAX_LOADED_DOCUMENTS,
+    MAX_INDEX_BYTES,
+    GDPR_DOCUMENT_ID,
+    GDPR_PDF_PATH,
+    GDPR_INDEX_PATH,
+    DEFAULT_TOP_K,
+    MAX_TOP_K,
+    DEFAULT_FETCH_K,
+    HYBRID_RETRIEVAL,
+    RRF_K,
+    RERANK_ENABLED,
+    RERANK_MODEL,
+    RERANK_BUDGET_MS,
+    CONTEXT_MAX_TOKENS,
+    CONTEXT_MIN_TRUNCATED_TOKENS,
+    INGEST_CACHE_DIR,
+    INGEST_CACHE_MAX_BYTES,
+    ANSWER_CACHE_BACKEND,
+    ANSWER_CACHE_PATH,
+    ANSWER_CACHE_TTL,
+    ANSWER_CACHE_MAX_ENTRIES,
+    QUERY_CACHE_BYTES,
+)
+
+logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Legal RAG API")
 
@@ -19,37 +88,180 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-rag_system = RAGDemo(gemini_api_key=GEMINI_API_KEY)
+rag_system = None  # RAGDemo, set by the warmup
+# Generation failures of the LLM client and the status /api/ask answers them with
+LLM_ERROR_STATUS = {"llm_timeout": 504, "llm_unavailable": 503, "llm_error": 502}
+profiler = SamplingProfiler(interval=PROFILER_INTERVAL_MS / 1000)
+
+# ── Metrics ──────────────────────────────────────────────────
+HTTP_SECONDS = metrics.REGISTRY.histogram(
+    "rag_http_request_seconds", "Time to response headers by route and status", ("method", "route", "status"))
+DOCUMENTS = metrics.REGISTRY.gauge("rag_documents", "Registered documents, and those with an index in memory",
+                                   ("state",))
+INDEX_BYTES = metrics.REGISTRY.gauge("rag_loaded_index_bytes", "Memory used by loaded document indexes")
+LLM_CIRCUIT_OPEN = metrics.REGISTRY.gauge("rag_llm_circuit_open", "1 while the LLM circuit breaker rejects calls")
+WARMUP_SECONDS = metrics.REGISTRY.gauge("rag_warmup_seconds", "Seconds spent in each startup step", ("stage",))
+
+
+def collect_state():
+    for stage, seconds in warmup.to_dict()["timings"].items():
+        WARMUP_SECONDS.set(seconds, stage=stage)
+    if rag_system is None:
+        return
+    stats = rag_system.registry.stats()
+    DOCUMENTS.set(stats["documents"], state="registered")
+    DOCUMENTS.set(stats["loaded"], state="loaded")
+    INDEX_BYTES.set(stats["loaded_bytes"])
+    breaker = getattr(rag_system.llm, "breaker", None)
+    if breaker is not None:
+        LLM_CIRCUIT_OPEN.set(int(breaker.state == "open"))
+
+
+metrics.REGISTRY.on_collect(collect_state)
+
+
+@app.middleware("http")
+async def record_request_time(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    # The route template, so that /api/jobs/{job_id} is one series
+    HTTP_SECONDS.observe(time.perf_counter() - start, method=request.method,
+                         route=route.path if route is not None else "unmatched", status=response.status_code)
+    return response
+
+
+ingestion_jobs = JobManager(max_workers=INGESTION_WORKERS)
+
+
+def import_modules():
+    import src.rag_system  # LangChain, FAISS, PyMuPDF
+    import src.embeddings  # the embedding backend is imported when created
+
+
+def create_rag_system():
+    global rag_system
+    from src.rag_system import RAGDemo, PROMPT_VERSION
+    from src.chunker import LegalChunker
+    from src.ann import SearchParams
+    from src.context_packer import ContextPacker
+    from src.reranker import CrossEncoderReranker
+    from src.embeddings import create_embeddings
+    from src.answer_cache import create_answer_cache
+    from src.llm_client import LLMClientOptions
+
+    rag_system = RAGDemo(
+        gemini_api_key=GEMINI_API_KEY,
+        embeddings=create_embeddings(
+            EMBEDDING_BACKEND,
+            EMBEDDING_MODEL,
+            batch_size=EMBEDDING_BATCH_SIZE,
+            onnx_model_dir=ONNX_MODEL_DIR,
+            onnx_int8=ONNX_INT8,
+        ),
+        max_workers=RETRIEVAL_WORKERS,
+        embedding_batch_size=EMBEDDING_BATCH_SIZE,
+        storage_dir=INDEX_STORAGE_DIR,
+        max_loaded_documents=MAX_LOADED_DOCUMENTS,
+        max_index_bytes=MAX_INDEX_BYTES,
+        ingest_cache_dir=INGEST_CACHE_DIR,
+        ingest_cache_max_bytes=INGEST_CACHE_MAX_BYTES,
+        answer_cache=create_answer_cache(
+            ANSWER_CACHE_BACKEND,
+            ttl=ANSWER_CACHE_TTL,
+            max_entries=ANSWER_CACHE_MAX_ENTRIES,
+            prompt_version=PROMPT_VERSION,
+            path=ANSWER_CACHE_PATH,
+        ),
+        query_cache_bytes=QUERY_CACHE_BYTES,
+        parser_workers=PARSER_WORKERS,
+        chunker=LegalChunker(max_chunk_size=MAX_CHUNK_SIZE, min_chunk_size=MIN_CHUNK_SIZE, overlap=CHUNK_OVERLAP),
+        index_type=ANN_INDEX_TYPE,
+        search_params=SearchParams(nprobe=IVF_NPROBE, ef_search=HNSW_EF_SEARCH),
+        quantization=INDEX_QUANTIZATION,
+        context_packer=ContextPacker(max_tokens=CONTEXT_MAX_TOKENS, min_truncated_tokens=CONTEXT_MIN_TRUNCATED_TOKENS),
+        reranker=CrossEncoderReranker(RERANK_MODEL) if RERANK_ENABLED else None,
+        llm_options=LLMClientOptions(
+            timeout=LLM_TIMEOUT,
+            max_retries=LLM_MAX_RETRIES,
+            max_concurrency=LLM_MAX_CONCURRENCY,
+            breaker_failures=LLM_BREAKER_FAILURES,
+            breaker_reset=LLM_BREAKER_RESET,
+        ),
+        llm_base_url=LLM_BASE_URL or None,
+    )
+
+
+def preload_gdpr():
+    """Raises if the default index cannot be loaded, so the warmup fails and readiness stays 503"""
+    logger.info("Preloading GDPR embeddings")
+    if not os.path.exists(GDPR_PDF_PATH):
+        raise FileNotFoundError(f"GDPR file not found at {GDPR_PDF_PATH}")
+    # A stale bundled index is rebuilt into INDEX_STORAGE_DIR, which later starts reuse
+    outcome = rag_system.load_or_build(GDPR_PDF_PATH, GDPR_DOCUMENT_ID, index_path=GDPR_INDEX_PATH)
+    logger.info("GDPR index %s", outcome)
+
+
+warmup = Warmup([
+    ("importing", import_modules),
+    ("loading_models", create_rag_system),
+    ("loading_documents", preload_gdpr),
+    ("warming_up", lambda: rag_system.warm_up(GDPR_DOCUMENT_ID)),
+], started_at=PROCESS_STARTED)
+
 
 @app.on_event("startup")
 async def startup_event():
-    try:
-        print("\n" + "=" * 70)
-        print("STARTUP: Preloading GDPR embeddings...")
-        print("=" * 70)
-
-        gdpr_path = "example_data/gdpr.pdf"
-        embeddings_path = "example_data/gdpr_faiss_index"  # folder, not .pkl
-
-        if os.path.exists(gdpr_path):
-            if os.path.exists(embeddings_path):
-                rag_system.load_index(embeddings_path)
-                print("✓ GDPR embeddings loaded from cache")
-            else:
-                rag_system.setup(pdf_path=gdpr_path)
-                rag_system.save_index(embeddings_path)
-                print("✓ GDPR embeddings created and cached")
-        else:
-            print(f"⚠ Warning: GDPR file not found at {gdpr_path}")
-
-        print("=" * 70 + "\n")
-    except Exception as e:
-        print(f"⚠ Warning: Could not preload GDPR: {str(e)}\n")
+    warmup.start()
+
+
+def require_ready():
+    """503 with a Retry-After header until the warmup has finished"""
+    if not warmup.ready:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Service is starting ({warmup.stage})" if warmup.status != "failed"
+            else f"Service failed to start: {warmup.error}",
+            headers={"Retry-After": "5"},
+        )
 
 
-class QuestionRequest(BaseModel):
+class RetrievalRequest(BaseModel):
+    top_k: int = Field(DEFAULT_TOP_K, ge=1, le=MAX_TOP_K)
+    document_id: str = GDPR_DOCUMENT_ID
+    min_score: float | None = Field(None, ge=-1.0, le=1.0)  # cosine similarity threshold
+    mmr: bool = False
+    fetch_k: int = Field(DEFAULT_FETCH_K, ge=1, le=10 * MAX_TOP_K)
+    mmr_lambda: float = Field(0.5, ge=0.0, le=1.0)
+    citations: bool = True  # exact lookup of cited articles / chapters
+    hybrid: bool = HYBRID_RETRIEVAL  # fuse BM25 and dense rankings
+    rerank: bool = RERANK_ENABLED  # cross-encoder over fetch_k candidates (if the server loaded one)
+
+    def retrieval_options(self):
+        from src.retrieval import RetrievalOptions
+
+        return RetrievalOptions(
+            k=self.top_k,
+            min_score=self.min_score,
+            mmr=self.mmr,
+            fetch_k=max(self.fetch_k, self.top_k),
+            lambda_mult=self.mmr_lambda,
+            citations=self.citations,
+            hybrid=self.hybrid,
+            rrf_k=RRF_K,
+            rerank=self.rerank,
+            rerank_budget_ms=RERANK_BUDGET_MS,
+        )
+
+
+class QuestionRequest(RetrievalRequest):
     question: str
-    top_k: int = 3
+    timings: bool = False  # add the milliseconds spent in each pipeline stage to the response
+
+
+class BatchQuestionRequest(RetrievalRequest):
+    questions: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_QUESTIONS)
+    concurrency: int = Field(BATCH_CONCURRENCY, ge=1, le=BATCH_CONCURRENCY)  # LLM calls in flight
 
 
 @app.get("/")
@@ -59,53 +271,255 @@ def root():
 
 @app.post("/api/load-gdpr")
 async def load_gdpr():
+    require_ready()
     try:
-        embeddings_path = "example_data/gdpr_faiss_index"
-        if os.path.exists(embeddings_path):
-            rag_system.load_index(embeddings_path)
-        else:
-            rag_system.setup(pdf_path="example_data/gdpr.pdf")
-            rag_system.save_index(embeddings_path)
-
-        return {"success": True, "document": "gdpr.pdf"}
+        await run_in_threadpool(rag_system.load_or_build, GDPR_PDF_PATH, GDPR_DOCUMENT_ID, index_path=GDPR_INDEX_PATH)
+
+        return {"success": True, "document": "gdpr.pdf", "document_id": GDPR_DOCUMENT_ID}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/api/upload-document")
+@app.post("/api/upload-document", status_code=202)
 async def upload_document(file: UploadFile = File(...)):
-    temp_path = f"temp_{file.filename}"
+    return await start_ingestion(file, document_id=uuid.uuid4().hex)
+
+
+@app.put("/api/documents/{document_id}", status_code=202)
+async def replace_document(document_id: str, file: UploadFile = File(...)):
+    """Re-ingest a new version of a document; only changed chunks are re-embedded"""
+    return await start_ingestion(file, document_id=document_id)
+
+
+@app.delete("/api/documents/{document_id}")
+def delete_document(document_id: str):
+    require_ready()
+    require_valid_document_id(document_id)
+    if not rag_system.remove_document(document_id):
+        raise HTTPException(status_code=404, detail="Document not found")
+    return {"success": True, "document_id": document_id}
+
+
+def require_valid_document_id(document_id: str):
+    """400 for IDs that cannot name a storage directory (e.g. "..", decoded from %2E%2E)"""
+    from src.registry import is_valid_document_id
+
+    if not is_valid_document_id(document_id):
+        raise HTTPException(status_code=400,
+                            detail="Invalid document ID: use 1-64 letters, digits, '_' or '-'")
+
+
+async def start_ingestion(file: UploadFile, document_id: str) -> dict:
+    require_ready()
+    require_valid_document_id(document_id)
+    temp_path = f"temp_{uuid.uuid4().hex}_{file.filename}"
     try:
         with open(temp_path, "wb") as f:
             content = await file.read()
             f.write(content)
-
-        rag_system.setup(pdf_path=temp_path)
-        os.remove(temp_path)
-
-        return {"success": True, "document": file.filename}
     except Exception as e:
         if os.path.exists(temp_path):
             os.remove(temp_path)
         raise HTTPException(status_code=500, detail=str(e))
 
+    def ingest(job):
+        try:
+            rag_system.setup(pdf_path=temp_path, document_id=document_id, progress=job.update, name=file.filename)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    job = ingestion_jobs.submit(file.filename, ingest, document_id=document_id)
+    return {
+        "success": True,
+        "document": file.filename,
+        "document_id": document_id,
+        "job_id": job.id,
+        "status": job.status,
+    }
+
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str):
+    job = ingestion_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
 
 @app.post("/api/ask")
 async def ask_question(request: QuestionRequest):
-    if rag_system.retriever is None:
+    require_ready()
+    if not rag_system.has_document(request.document_id):
         raise HTTPException(status_code=400, detail="No document loaded")
 
+    started = time.perf_counter()
     try:
-        result = rag_system.answer(request.question)
-        return {"answer": result["answer"], "chunks": result["chunks"]}
+        with metrics.collect_timings() as timings:
+            result = await rag_system.aanswer(
+                request.question,
+                document_id=request.document_id,
+                options=request.retrieval_options(),
+            )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    if result["error"] in LLM_ERROR_STATUS:
+        raise HTTPException(
+            status_code=LLM_ERROR_STATUS[result["error"]],
+            detail={"error": result["error"], "message": result["answer"]},
+            headers={"Retry-After": str(int(LLM_BREAKER_RESET))} if result["error"] == "llm_unavailable" else None,
+        )
+    response = {"answer": result["answer"], "chunks": result["chunks"], "context": result.get("context")}
+    if request.timings:
+        timings["total"] = time.perf_counter() - started
+        response["timings"] = {
+            "cached": bool(result.get("cached")),
+            "stages_ms": {stage: round(seconds * 1000, 3) for stage, seconds in timings.items()},
+        }
+    return response
+
+
+@app.post("/api/ask/stream")
+async def ask_question_stream(request: QuestionRequest, http_request: Request):
+    """Server-sent events: a ``chunks`` event, then ``token`` events, then ``done``"""
+    require_ready()
+    if not rag_system.has_document(request.document_id):
+        raise HTTPException(status_code=400, detail="No document loaded")
+
+    async def event_stream():
+        # aclosing() makes sure the LLM stream is cancelled when the client goes away
+        events = rag_system.astream_answer(
+            request.question,
+            document_id=request.document_id,
+            options=request.retrieval_options(),
+        )
+        async with aclosing(events):
+            async for event in events:
+                if await http_request.is_disconnected():
+                    break
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/api/ask-batch")
+async def ask_batch(request: BatchQuestionRequest, http_request: Request):
+    """Server-sent events: a ``result`` event per question in completion order, then ``done``
+
+    Each result carries ``index``, the question's position in the request.
+    """
+    require_ready()
+    if not rag_system.has_document(request.document_id):
+        raise HTTPException(status_code=400, detail="No document loaded")
+
+    async def event_stream():
+        started = time.perf_counter()
+        results = rag_system.aanswer_batch(
+            request.questions,
+            document_id=request.document_id,
+            options=request.retrieval_options(),
+            concurrency=request.concurrency,
+        )
+        answered = 0
+        async with aclosing(results):
+            async for result in results:
+                if await http_request.is_disconnected():
+                    break
+                answered += 1
+                result["question"] = request.questions[result["index"]]
+                yield f"event: result\ndata: {json.dumps(result)}\n\n"
+        done = {"answered": answered, "questions": len(request.questions),
+                "seconds": round(time.perf_counter() - started, 3)}
+        yield f"event: done\ndata: {json.dumps(done)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 @app.get("/api/health")
 def health_check():
+    ready = warmup.ready
     return {
-        "status": "healthy",
+        "status": "healthy" if ready else "starting" if warmup.status != "failed" else "failed",
         "rag_initialized": rag_system is not None,
-        "document_loaded": rag_system.retriever is not None,
-    }
\ No newline at end of file
+        "document_loaded": ready and len(rag_system.registry.documents()) > 0,
+        "documents": rag_system.registry.stats() if ready else None,
+        "warmup": warmup.to_dict(),
+    }
+
+
+@app.get("/api/health/live")
+def liveness():
+    """The process is up and serving requests, whether or not the warmup has finished"""
+    return {"status": "alive"}
+
+
+@app.get("/api/health/ready")
+def readiness():
+    """200 once models and the default index are loaded, 503 with warmup progress (or its error) otherwise"""
+    return JSONResponse(status_code=200 if warmup.ready else 503, content=warmup.to_dict())
+
+
+@app.get("/api/cache/stats")
+def cache_stats():
+    require_ready()
+    return {
+        "ingestion": rag_system.ingest_cache.stats() if rag_system.ingest_cache else None,
+        "answers": rag_system.answer_cache.stats() if rag_system.answer_cache else None,
+        "queries": rag_system.embeddings.stats(),
+    }
+
+
+@app.get("/api/llm/stats")
+def llm_stats():
+    """Calls, retries, timeouts, failures, fail-fast rejections and the circuit breaker state"""
+    require_ready()
+    stats = getattr(rag_system.llm, "stats", None)
+    return {"llm": stats() if stats else None}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Stage latency histograms, cache / error / token counters and state gauges in the Prometheus text format"""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+def require_profiler():
+    if not PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiler is disabled (set PROFILER_ENABLED=true)")
+
+
+@app.post("/api/debug/profiler/start")
+def start_profiler(interval_ms: float | None = Query(None, ge=1, le=1000)):
+    """Start sampling all threads' stacks (the previous session's samples are discarded)"""
+    require_profiler()
+    if not profiler.start(interval_ms / 1000 if interval_ms is not None else None):
+        raise HTTPException(status_code=409, detail="Profiler is already running")
+    return profiler.status()
+
+
+@app.post("/api/debug/profiler/stop")
+def stop_profiler():
+    require_profiler()
+    return profiler.stop()
+
+
+@app.get("/api/debug/profiler", response_class=PlainTextResponse)
+def profiler_samples(limit: int | None = None):
+    """Sampled stacks in collapsed form, for flamegraph.pl or speedscope"""
+    require_profiler()
+    return PlainTextResponse(profiler.collapsed(limit))
+
+
+@app.get("/api/documents")
+def list_documents():
+    require_ready()
+    return {"documents": rag_system.registry.documents()}
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""
+Benchmark recall@k and query latency of flat, IVF and HNSW indexes
+
+For each synthetic corpus size (clustered vectors of low intrinsic
+dimension, like sentence embeddings), builds every index type with src/ann.py, answers the same
+queries one at a time and reports recall@k against the exact flat results
+plus p50 / p99 latency per query, for several nprobe / efSearch settings.
+
+Usage:
+    python benchmarks/ann_recall.py --sizes 1000 10000 100000
+    python benchmarks/ann_recall.py --sizes 1000000 --dimension 128
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from src.ann import SearchParams, build_faiss_index, choose_index_type
+
+
+def synthetic_vectors(num_vectors: int, dimension: int, rng, latent: int = 64) -> np.ndarray:
+    """Unit vectors with low intrinsic dimension, clustered by topic, like sentence embeddings"""
+    projection = np.random.default_rng(42).normal(size=(latent, dimension)).astype(np.float32)
+    centers = np.random.default_rng(7).normal(size=(256, latent)).astype(np.float32)
+    labels = rng.integers(0, len(centers), size=num_vectors)
+    points = centers[labels] + 1.0 * rng.normal(size=(num_vectors, latent)).astype(np.float32)
+    vectors = points @ projection + 0.05 * rng.normal(size=(num_vectors, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def measure(index, queries: np.ndarray, k: int, params) -> tuple:
+    ids, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        _, found = index.search(query.reshape(1, -1), k, params=params)
+        latencies.append(time.perf_counter() - start)
+        ids.append(found[0])
+    return np.array(ids), np.percentile(latencies, 50) * 1e3, np.percentile(latencies, 99) * 1e3
+
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    return float(np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)]))
+
+
+def run(sizes: list, dimension: int, num_queries: int, k: int, nprobes: list, ef_searches: list):
+    rng = np.random.default_rng(0)
+    print("=" * 78)
+    print(f"dimension: {dimension}  queries: {num_queries}  k: {k}")
+    print(f"{'vectors':>9}  {'index':<6}{'setting':<14}{'build (s)':>10}{'recall@k':>10}{'p50 (ms)':>10}{'p99 (ms)':>10}")
+    for size in sizes:
+        vectors = synthetic_vectors(size, dimension, rng)
+        queries = synthetic_vectors(num_queries, dimension, rng)
+        truth = None
+        for index_type in ("flat", "ivf", "hnsw"):
+            start = time.perf_counter()
+            index = build_faiss_index(vectors, index_type)
+            build = time.perf_counter() - start
+            if index_type == "flat":
+                settings = [("exact", None)]
+            elif index_type == "ivf":
+                settings = [(f"nprobe={n}", SearchParams(nprobe=n)) for n in nprobes]
+            else:
+                settings = [(f"efSearch={e}", SearchParams(ef_search=e)) for e in ef_searches]
+            for label, params in settings:
+                found, p50, p99 = measure(index, queries, k, params and params.for_index(index, k))
+                if truth is None:
+                    truth = found
+                print(f"{size:>9}  {index_type:<6}{label:<14}{build:>10.2f}{recall(found, truth):>10.3f}"
+                      f"{p50:>10.3f}{p99:>10.3f}")
+            del index
+        print(f"{'':>9}  auto -> {choose_index_type(size)}")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[16, 64, 256])
+    args = parser.parse_args()
+    run(args.sizes, args.dimension, args.queries, args.k, args.nprobe, args.ef_search)
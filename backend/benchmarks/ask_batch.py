@@ -0,0 +1,90 @@
+"""
+Benchmark batch question answering against one question per call
+
+Answers a checklist of N questions three ways: one aanswer() call after
+another (as N /api/ask requests from a script would), retrieval alone per
+question versus IndexRetriever.invoke_batch (one embedding call, one FAISS
+search), and RAGDemo.aanswer_batch() at several concurrency limits. With a
+stub LLM of fixed delay, batch wall time should be about
+ceil(N / concurrency) * delay.
+
+Runs offline: hashing embeddings and a stub LLM, with the answer cache off.
+
+Usage:
+    python benchmarks/ask_batch.py --questions 100 --llm-delay 0.2 --concurrency 1 8 32
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.fakes import FakeLLM, HashingEmbeddings
+from src.rag_system import RAGDemo
+from src.retrieval import RetrievalOptions
+
+TOPICS = [
+    "consent", "data breach notification", "data protection officer", "right to erasure", "data portability",
+    "processor contracts", "impact assessment", "administrative fines", "international transfers",
+    "records of processing", "children's data", "profiling", "supervisory authority powers", "certification",
+]
+
+
+def checklist(n: int) -> list:
+    return [f"What does the regulation require about {TOPICS[i % len(TOPICS)]} (item {i + 1})?" for i in range(n)]
+
+
+def run(pdf_path: str, num_questions: int, llm_delay: float, concurrencies: list):
+    rag = RAGDemo(gemini_api_key="", llm=FakeLLM(delay=llm_delay), embeddings=HashingEmbeddings())
+    rag.setup(pdf_path=pdf_path)
+    questions = checklist(num_questions)
+    options = RetrievalOptions()
+
+    # Retrieval alone: one query at a time versus one batch
+    retriever = rag.get_retriever(options=options)
+    start = time.perf_counter()
+    for question in questions:
+        retriever.invoke(question)
+    retrieve_each = time.perf_counter() - start
+    start = time.perf_counter()
+    retriever.invoke_batch(questions)
+    retrieve_batch = time.perf_counter() - start
+
+    async def one_by_one():
+        for question in questions:
+            await rag.aanswer(question, options=options)
+
+    async def batch(concurrency: int):
+        first = None
+        start = time.perf_counter()
+        async for _ in rag.aanswer_batch(questions, options=options, concurrency=concurrency):
+            first = first or time.perf_counter() - start
+        return first, time.perf_counter() - start
+
+    start = time.perf_counter()
+    asyncio.run(one_by_one())
+    sequential = time.perf_counter() - start
+
+    print("=" * 64)
+    print(f"Questions: {num_questions}  LLM delay: {llm_delay:.3f}s")
+    print(f"Retrieval, one query at a time:  {retrieve_each * 1000:>9.1f} ms")
+    print(f"Retrieval, invoke_batch:         {retrieve_batch * 1000:>9.1f} ms")
+    print(f"{'mode':<24}{'first result':>14}{'wall time':>12}{'speedup':>10}")
+    print(f"{'one /api/ask at a time':<24}{'':>14}{sequential:>11.2f}s{1:>9.1f}x")
+    for concurrency in concurrencies:
+        first, total = asyncio.run(batch(concurrency))
+        print(f"{f'batch, concurrency {concurrency}':<24}{first:>13.2f}s{total:>11.2f}s{sequential / total:>9.1f}x")
+    print("=" * 64)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", default="example_data/gdpr.pdf")
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--llm-delay", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+    run(args.pdf, args.questions, args.llm_delay, args.concurrency)
@@ -0,0 +1,55 @@
+"""
+Benchmark chunking throughput and chunk-size distribution on the bundled PDFs
+
+Parses each PDF once, then chunks it with LegalChunker at several character
+budgets ("none" = one chunk per article, the previous behaviour) and
+reports chunks, throughput (MB/s of text) and the chunk length percentiles.
+
+Usage:
+    python benchmarks/chunking.py --budgets none 2000 1000
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from config import CHUNK_OVERLAP, MIN_CHUNK_SIZE
+from src.chunker import LegalChunker
+from src.parser import PDFParser
+
+
+def run(pdfs: list, budgets: list, repeats: int):
+    parser = PDFParser()
+    print("=" * 86)
+    print(f"{'document':<20}{'budget':>8}{'chunks':>8}{'MB/s':>8}"
+          f"{'min':>8}{'p50':>8}{'p95':>8}{'max':>8}{'> budget':>10}")
+    for pdf in pdfs:
+        text, page_starts = parser.parse_pages(pdf)
+        for budget in budgets:
+            chunker = LegalChunker(max_chunk_size=budget, min_chunk_size=MIN_CHUNK_SIZE, overlap=CHUNK_OVERLAP)
+            best = float("inf")
+            for _ in range(repeats):
+                start = time.perf_counter()
+                chunks = chunker.chunk_gdpr(text, page_starts)
+                best = min(best, time.perf_counter() - start)
+            lengths = np.array([len(chunk["text"]) for chunk in chunks])
+            over = int((lengths > budget).sum()) if budget else 0
+            print(f"{os.path.basename(pdf):<20}{str(budget or 'none'):>8}{len(chunks):>8}"
+                  f"{len(text) / 1e6 / best:>8.1f}{lengths.min():>8}{int(np.percentile(lengths, 50)):>8}"
+                  f"{int(np.percentile(lengths, 95)):>8}{lengths.max():>8}{over:>10}")
+    print("=" * 86)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdfs", nargs="*", default=sorted(glob.glob("example_data/*.pdf")))
+    parser.add_argument("--budgets", nargs="+", default=["none", "2000", "1000"])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    run(args.pdfs, [None if b == "none" else int(b) for b in args.budgets], args.repeats)
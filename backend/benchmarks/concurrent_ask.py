@@ -0,0 +1,67 @@
+"""
+Benchmark concurrent question answering
+
+Answers N questions one after another with RAGDemo.answer() and then all at
+once with RAGDemo.aanswer(). With a non-blocking pipeline the concurrent run
+should take roughly as long as the slowest single question, not the sum.
+
+Runs offline: the LLM is a stub with a fixed delay and the embeddings are a
+hashing embedder, so only the pipeline overhead is measured.
+
+Usage:
+    python benchmarks/concurrent_ask.py --questions 8 --llm-delay 0.5
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.fakes import FakeLLM, HashingEmbeddings
+from src.rag_system import RAGDemo
+
+QUESTIONS = [
+    "What are the main principles of data processing under GDPR?",
+    "What rights do data subjects have?",
+    "What are the penalties for GDPR violations?",
+    "When is a Data Protection Officer required?",
+    "How long does an organization have to report a data breach?",
+]
+
+
+def run(pdf_path: str, num_questions: int, llm_delay: float):
+    rag = RAGDemo(gemini_api_key="", llm=FakeLLM(delay=llm_delay), embeddings=HashingEmbeddings())
+    rag.setup(pdf_path=pdf_path)
+    questions = [QUESTIONS[i % len(QUESTIONS)] for i in range(num_questions)]
+
+    start = time.perf_counter()
+    for question in questions:
+        rag.answer(question)
+    sequential = time.perf_counter() - start
+
+    async def answer_all():
+        return await asyncio.gather(*(rag.aanswer(q) for q in questions))
+
+    start = time.perf_counter()
+    asyncio.run(answer_all())
+    concurrent = time.perf_counter() - start
+
+    print("=" * 60)
+    print(f"Questions:        {num_questions}")
+    print(f"LLM delay:        {llm_delay:.3f}s")
+    print(f"Sequential:       {sequential:.3f}s")
+    print(f"Concurrent:       {concurrent:.3f}s")
+    print(f"Speedup:          {sequential / concurrent:.1f}x")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", default="example_data/gdpr.pdf")
+    parser.add_argument("--questions", type=int, default=8)
+    parser.add_argument("--llm-delay", type=float, default=0.5)
+    args = parser.parse_args()
+    run(args.pdf, args.questions, args.llm_delay)
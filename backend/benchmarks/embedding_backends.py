@@ -0,0 +1,95 @@
+"""
+Benchmark embedding backends on CPU: document throughput and query latency
+
+Embeds the chunks of a PDF with each backend (see src/embeddings.py) and
+reports chunks/sec for batched document embedding, single-query latency
+percentiles, and the mean cosine similarity of every backend's document
+vectors to the first backend's (how closely e.g. the int8 ONNX model
+reproduces the float model). Backends that cannot be loaded are skipped.
+
+Usage:
+    python benchmarks/embedding_backends.py --backends sentence-transformers onnx onnx-int8 hashing
+    python benchmarks/embedding_backends.py --onnx-model-dir models/minilm-onnx --batch-size 64
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from config import CHUNK_OVERLAP, EMBEDDING_BATCH_SIZE, EMBEDDING_MODEL, MAX_CHUNK_SIZE, MIN_CHUNK_SIZE, ONNX_MODEL_DIR
+from src.chunker import LegalChunker
+from src.embeddings import create_embeddings
+from src.parser import PDFParser
+
+QUERIES = [
+    "What are the conditions for consent?",
+    "When must a data protection officer be designated?",
+    "How long does a controller have to notify a personal data breach?",
+    "What is the right to erasure?",
+    "Which fines apply to infringements of Article 83?",
+]
+
+
+def load_backend(name: str, model_name: str, batch_size: int, onnx_model_dir: str):
+    """'onnx-int8' is the onnx backend with the quantized model"""
+    backend = "onnx" if name == "onnx-int8" else name
+    return create_embeddings(backend, model_name, batch_size=batch_size,
+                             onnx_model_dir=onnx_model_dir, onnx_int8=name == "onnx-int8")
+
+
+def run(pdf: str, backends: list, model_name: str, batch_size: int, onnx_model_dir: str, queries: int):
+    text, page_starts = PDFParser().parse_pages(pdf)
+    chunker = LegalChunker(max_chunk_size=MAX_CHUNK_SIZE, min_chunk_size=MIN_CHUNK_SIZE, overlap=CHUNK_OVERLAP)
+    texts = [chunk["text"] for chunk in chunker.chunk_gdpr(text, page_starts)]
+
+    print("=" * 82)
+    print(f"Document: {os.path.basename(pdf)}  chunks: {len(texts)}  batch size: {batch_size}  CPUs: {os.cpu_count()}")
+    print(f"{'backend':<24}{'load s':>8}{'chunks/s':>10}{'query p50':>11}{'query p95':>11}{'cos vs first':>14}")
+    reference = None
+    for name in backends:
+        start = time.perf_counter()
+        try:
+            embeddings = load_backend(name, model_name, batch_size, onnx_model_dir)
+        except Exception as e:
+            print(f"{name:<24}⚠ skipped: {e}")
+            continue
+        load_seconds = time.perf_counter() - start
+
+        embeddings.embed_documents(texts[:batch_size])  # warm up
+        start = time.perf_counter()
+        vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+        throughput = len(texts) / (time.perf_counter() - start)
+
+        latencies = []
+        for i in range(queries):
+            start = time.perf_counter()
+            embeddings.embed_query(QUERIES[i % len(QUERIES)])
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        agreement = "-"
+        if reference is None:
+            reference = vectors
+        elif reference.shape == vectors.shape:
+            cosine = (reference * vectors).sum(axis=1) / (
+                np.linalg.norm(reference, axis=1) * np.linalg.norm(vectors, axis=1) + 1e-12)
+            agreement = f"{cosine.mean():.4f}"
+        print(f"{name:<24}{load_seconds:>8.1f}{throughput:>10.1f}{np.percentile(latencies, 50):>9.2f}ms"
+              f"{np.percentile(latencies, 95):>9.2f}ms{agreement:>14}")
+    print("=" * 82)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdf", nargs="?", default="example_data/gdpr.pdf")
+    parser.add_argument("--backends", nargs="+", default=["sentence-transformers", "onnx", "onnx-int8", "hashing"])
+    parser.add_argument("--model", default=EMBEDDING_MODEL)
+    parser.add_argument("--onnx-model-dir", default=ONNX_MODEL_DIR)
+    parser.add_argument("--batch-size", type=int, default=EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+    run(args.pdf, args.backends, args.model, args.batch_size, args.onnx_model_dir, args.queries)
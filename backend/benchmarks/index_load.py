@@ -0,0 +1,91 @@
+"""
+Benchmark index load time and resident memory: LangChain FAISS vs VectorIndex
+
+Builds a synthetic corpus, saves it both with FAISS.save_local() (pickled
+docstore) and as a memory-mapped VectorIndex, then loads each one in a fresh
+process and runs a top-k search. Reports load time, search time and the RSS
+added by loading.
+
+Usage:
+    python benchmarks/index_load.py --vectors 100000
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from src.fakes import HashingEmbeddings
+from src.vector_index import VectorIndex
+
+
+def rss_bytes() -> int:
+    """Current resident set size (Linux), falling back to peak RSS elsewhere"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def measure(fmt: str, path: str, dimension: int, queue):
+    from langchain_community.vectorstores import FAISS
+
+    query = np.random.default_rng(1).random(dimension, dtype=np.float32)
+    before = rss_bytes()
+    start = time.perf_counter()
+    if fmt == "langchain":
+        store = FAISS.load_local(path, HashingEmbeddings(dimension), allow_dangerous_deserialization=True)
+        loaded = time.perf_counter()
+        store.similarity_search_by_vector(query.tolist(), k=3)
+    else:
+        index = VectorIndex.load(path)
+        loaded = time.perf_counter()
+        index.documents([i for i, _ in index.search(query, 3)])
+    searched = time.perf_counter()
+    queue.put((fmt, loaded - start, searched - loaded, rss_bytes() - before))
+
+
+def run(num_vectors: int, dimension: int, chunk_chars: int):
+    from langchain_community.vectorstores import FAISS
+
+    rng = np.random.default_rng(0)
+    vectors = rng.random((num_vectors, dimension), dtype=np.float32)
+    texts = [f"Chunk {i} " + "x" * chunk_chars for i in range(num_vectors)]
+    metadatas = [{"chapter": "N/A", "article": f"Section {i}", "source": f"Section {i}"} for i in range(num_vectors)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        langchain_path = os.path.join(tmp, "langchain")
+        mmap_path = os.path.join(tmp, "mmap")
+        FAISS.from_embeddings(list(zip(texts, vectors.tolist())), HashingEmbeddings(dimension),
+                              metadatas=metadatas).save_local(langchain_path)
+        VectorIndex.from_embeddings(texts, vectors, metadatas).save(mmap_path)
+
+        ctx = multiprocessing.get_context("spawn")
+        queue = ctx.Queue()
+        print("=" * 60)
+        print(f"Vectors: {num_vectors}  dimension: {dimension}  chunk size: {chunk_chars} chars")
+        print(f"{'format':<12}{'load (s)':>10}{'search (s)':>12}{'RSS added (MB)':>16}")
+        for fmt, path in [("langchain", langchain_path), ("mmap", mmap_path)]:
+            process = ctx.Process(target=measure, args=(fmt, path, dimension, queue))
+            process.start()
+            name, load_s, search_s, rss = queue.get()
+            process.join()
+            print(f"{name:<12}{load_s:>10.3f}{search_s:>12.4f}{rss / 1e6:>16.1f}")
+        print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=100_000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--chunk-chars", type=int, default=2000)
+    args = parser.parse_args()
+    run(args.vectors, args.dimension, args.chunk_chars)
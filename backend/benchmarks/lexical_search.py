@@ -0,0 +1,78 @@
+"""
+Benchmark BM25 build and query latency as the corpus grows
+
+Generates synthetic legal-looking chunks (Zipf-distributed vocabulary),
+builds a BM25Index, round-trips it through disk (memory-mapped load) and
+times top-k queries. The first size roughly matches the GDPR index
+(~100 chunks); the larger ones stand in for thousands of documents.
+
+Usage:
+    python benchmarks/lexical_search.py --chunks 100 10000 100000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from src.lexical_index import BM25Index
+
+QUERIES = [
+    "tasks of the data protection officer",
+    "controller obligations for processing",
+    "notification of a personal data breach to the supervisory authority",
+    "right to erasure",
+    "transfers to third countries",
+]
+
+
+def synthetic_texts(num_chunks: int, words_per_chunk: int, vocabulary_size: int = 20_000) -> list:
+    rng = np.random.default_rng(0)
+    base = [word for query in QUERIES for word in query.split()]
+    vocabulary = base + [f"term{i}" for i in range(vocabulary_size - len(base))]
+    ranks = np.minimum(rng.zipf(1.3, size=(num_chunks, words_per_chunk)), vocabulary_size) - 1
+    return [" ".join(vocabulary[r] for r in row) for row in ranks]
+
+
+def run(sizes: list, words_per_chunk: int, k: int, repeats: int):
+    print("=" * 70)
+    print(f"{'chunks':>10}{'build (s)':>12}{'load (ms)':>12}{'p50 (ms)':>12}{'p95 (ms)':>12}")
+    for size in sizes:
+        texts = synthetic_texts(size, words_per_chunk)
+        start = time.perf_counter()
+        index = BM25Index.from_texts(texts)
+        build = time.perf_counter() - start
+
+        with tempfile.TemporaryDirectory() as tmp:
+            index.save(tmp)
+            start = time.perf_counter()
+            index = BM25Index.load(tmp)
+            load = time.perf_counter() - start
+
+            latencies = []
+            for _ in range(repeats):
+                for query in QUERIES:
+                    start = time.perf_counter()
+                    index.search(query, k)
+                    latencies.append(time.perf_counter() - start)
+            latencies.sort()
+            p50 = statistics.median(latencies)
+            p95 = latencies[int(0.95 * (len(latencies) - 1))]
+            print(f"{size:>10}{build:>12.2f}{load * 1e3:>12.2f}{p50 * 1e3:>12.3f}{p95 * 1e3:>12.3f}")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--words-per-chunk", type=int, default=300)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+    run(args.chunks, args.words_per_chunk, args.k, args.repeats)
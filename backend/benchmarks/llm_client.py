@@ -0,0 +1,126 @@
+"""
+Load-test the LLM client against the local fake LLM server
+
+Starts the fake OpenAI-compatible server (src/fakes.py) on a free port and
+fires N concurrent calls through ResilientLLM in three phases:
+    healthy     fixed upstream delay, no errors
+    flaky       a fraction of requests fails with 503 and is retried
+    outage      every request fails: the circuit breaker opens and the
+                remaining calls are rejected at once instead of waiting
+and reports succeeded / failed calls, p50 / p95 latency, retries,
+fail-fast rejections and the peak number of requests upstream saw in flight
+(bounded by --max-concurrency however many calls are started).
+
+Usage:
+    python benchmarks/llm_client.py --calls 200 --delay 0.1 --max-concurrency 16 --error-rate 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import urllib.request
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import uvicorn
+from langchain_core.messages import HumanMessage
+
+from src.fakes import create_fake_llm_server
+from src.llm_client import HTTPChatModel, LLMClientOptions, LLMError, ResilientLLM
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, delay: float) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(create_fake_llm_server(delay=delay), port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def fake_request(base_url: str, path: str, body: dict = None) -> dict:
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(base_url + path, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+async def load(llm: ResilientLLM, calls: int) -> tuple:
+    """(latencies of successful calls, latencies of failed calls, error counts by kind)"""
+    ok, failed, errors = [], [], {}
+
+    async def one():
+        start = time.perf_counter()
+        try:
+            await llm.ainvoke([HumanMessage(content="What does Article 33 require?")])
+            ok.append(time.perf_counter() - start)
+        except LLMError as e:
+            failed.append(time.perf_counter() - start)
+            errors[e.kind] = errors.get(e.kind, 0) + 1
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return ok, failed, errors
+
+
+def run(calls: int, delay: float, error_rate: float, options: LLMClientOptions):
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = start_server(port, delay)
+
+    phases = [
+        ("healthy", {"error_rate": 0.0}),
+        ("flaky", {"error_rate": error_rate}),
+        ("outage", {"error_rate": 0.0, "outage_seconds": 3600}),
+    ]
+    print("=" * 100)
+    print(f"Calls: {calls}  upstream delay: {delay}s  max concurrency: {options.max_concurrency}  "
+          f"retries: {options.max_retries}  timeout: {options.timeout}s")
+    print(f"{'phase':<10}{'ok':>6}{'failed':>8}{'p50 ms':>10}{'p95 ms':>10}{'fail ms':>10}"
+          f"{'retries':>9}{'rejected':>10}{'peak upstream':>15}  errors")
+    try:
+        for name, settings in phases:
+            fake_request(base_url, "/fake/config", settings)
+            llm = ResilientLLM(HTTPChatModel(base_url, timeout=options.timeout,
+                                             max_connections=options.max_concurrency), options)
+            ok, failed, errors = asyncio.run(load(llm, calls))
+            stats = llm.stats()
+            peak = fake_request(base_url, "/fake/stats")["peak_in_flight"]
+
+            def ms(values, q):
+                return f"{np.percentile(values, q) * 1000:.0f}" if values else "-"
+
+            print(f"{name:<10}{len(ok):>6}{len(failed):>8}{ms(ok, 50):>10}{ms(ok, 95):>10}{ms(failed, 50):>10}"
+                  f"{stats['retries']:>9}{stats['rejected']:>10}{peak:>15}  {errors or ''}")
+    finally:
+        server.should_exit = True
+    print("=" * 100)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.1, help="fake upstream latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.2, help="fraction of 503s in the flaky phase")
+    parser.add_argument("--timeout", type=float, default=5.0)
+    parser.add_argument("--max-retries", type=int, default=2)
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    parser.add_argument("--breaker-failures", type=int, default=5)
+    args = parser.parse_args()
+    run(args.calls, args.delay, args.error_rate, LLMClientOptions(
+        timeout=args.timeout,
+        max_retries=args.max_retries,
+        backoff_base=0.05,
+        max_concurrency=args.max_concurrency,
+        breaker_failures=args.breaker_failures,
+    ))
@@ -0,0 +1,74 @@
+"""
+Benchmark PDF parse throughput (pages/sec)
+
+Builds a large PDF by repeating the pages of a source document, then
+compares the old whole-document parse (``text += page.get_text()``) with
+PDFParser.iter_pages() in-process and with a process pool.
+
+Usage:
+    python benchmarks/pdf_parse.py --pages 600 --workers 1 2 4
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pymupdf
+
+from src.parser import PDFParser
+
+
+def make_pdf(source: str, pages: int, path: str):
+    with pymupdf.open(source) as src, pymupdf.open() as out:
+        while out.page_count < pages:
+            out.insert_pdf(src, to_page=min(src.page_count, pages - out.page_count) - 1)
+        out.save(path)
+
+
+def concatenate(pdf_path: str) -> int:
+    """The previous PDFParser.parse(): one growing string"""
+    doc = pymupdf.open(pdf_path)
+    text = ""
+    for page in doc:
+        text += page.get_text()
+    doc.close()
+    return len(text)
+
+
+def stream(pdf_path: str, workers: int) -> int:
+    return sum(len(text) for _, text in PDFParser(workers=workers).iter_pages(pdf_path))
+
+
+def run(source: str, pages: int, workers: list, repeats: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, "bundle.pdf")
+        make_pdf(source, pages, pdf_path)
+
+        cases = [("concatenate", lambda: concatenate(pdf_path))]
+        cases += [(f"iter_pages x{w}", lambda w=w: stream(pdf_path, w)) for w in workers]
+
+        print("=" * 60)
+        print(f"Source: {os.path.basename(source)}  pages: {pages}  CPUs: {os.cpu_count()}")
+        print(f"{'mode':<18}{'seconds':>10}{'pages/sec':>12}{'chars':>14}")
+        for name, parse in cases:
+            best, chars = float("inf"), 0
+            for _ in range(repeats):
+                start = time.perf_counter()
+                chars = parse()
+                best = min(best, time.perf_counter() - start)
+            print(f"{name:<18}{best:>10.2f}{pages / best:>12.0f}{chars:>14}")
+        print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default="example_data/gdpr.pdf")
+    parser.add_argument("--pages", type=int, default=600)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    run(args.source, args.pages, args.workers, args.repeats)
@@ -0,0 +1,264 @@
+"""
+End-to-end benchmark of the ingestion and query pipeline, fully offline
+
+For every corpus (the bundled GDPR and NDA PDFs, plus the GDPR repeated
+``--scales`` times as larger synthetic documents) a fresh process:
+    1. times the ingestion stages: parse, chunk, embed, index build, save
+       and load of the memory-mapped index
+    2. answers ``--queries`` questions one at a time and reports p50 / p95 /
+       p99 latency of retrieval (query embedding + search) and prompt
+       assembly (context packing + prompt text)
+    3. answers them with RAGDemo.aanswer() at each ``--concurrency`` level
+       and reports end-to-end latency percentiles and queries/sec
+    4. records its peak RSS
+Embeddings are the hashing embedder and the LLM a stub with a fixed delay;
+the query embedding and answer caches are off so every query does the work.
+
+``--output`` writes the results as JSON; ``--compare`` prints the change of
+every metric against an earlier run, e.g. one from the previous commit.
+
+Usage:
+    python benchmarks/pipeline.py --output before.json
+    python benchmarks/pipeline.py --scales 4 16 --concurrency 1 8 32 --compare before.json --output after.json
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+import numpy as np
+import pymupdf
+
+QUESTIONS = [
+    "How long does a controller have to notify a personal data breach?",
+    "Under what conditions is consent valid?",
+    "When does a data subject have the right to erasure?",
+    "When must a data protection officer be designated?",
+    "What are the maximum administrative fines?",
+    "What must a contract between a controller and a processor contain?",
+    "When is a data protection impact assessment required?",
+    "Which records of processing activities must be kept?",
+    "What counts as confidential information?",
+    "How long do the confidentiality obligations last?",
+    "Can confidential information be disclosed to employees?",
+    "What happens to confidential information when the agreement ends?",
+]
+STAGES = ["parse", "chunk", "embed", "index_build", "save", "load"]
+
+
+def make_pdf(source: str, copies: int, path: str):
+    """``copies`` back-to-back copies of the source document"""
+    with pymupdf.open(source) as src, pymupdf.open() as out:
+        for _ in range(copies):
+            out.insert_pdf(src)
+        out.save(path)
+
+
+def percentiles(seconds: list) -> dict:
+    values = np.asarray(seconds) * 1000
+    return {f"p{q}_ms": round(float(np.percentile(values, q)), 3) for q in (50, 95, 99)}
+
+
+def measure_corpus(pdf_path: str, settings: dict, queue):
+    """Runs in a child process so that peak RSS and lazy imports are per corpus"""
+    from src.chunker import LegalChunker
+    from src.fakes import FakeLLM, HashingEmbeddings
+    from src.index_builder import to_langchain_docs
+    from src.parser import PDFParser
+    from src.rag_system import RAGDemo
+    from src.retrieval import RetrievalOptions
+    from src.vector_index import VectorIndex
+
+    embeddings = HashingEmbeddings()
+    timings = {}
+
+    def timed(stage, fn, *args, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        timings[stage] = round(time.perf_counter() - start, 4)
+        return result
+
+    # ── Ingestion ────────────────────────────────────────────────
+    text, page_starts = timed("parse", PDFParser().parse_pages, pdf_path)
+    chunker = LegalChunker()
+    docs = timed("chunk", lambda: to_langchain_docs(chunker.chunk_gdpr(text, page_starts)))
+    texts = [doc.page_content for doc in docs]
+    batch = settings["batch_size"]
+    vectors = timed("embed", lambda: [vector for start in range(0, len(texts), batch)
+                                      for vector in embeddings.embed_documents(texts[start:start + batch])])
+    index = timed("index_build", VectorIndex.from_embeddings, texts, vectors, [doc.metadata for doc in docs],
+                  manifest={"model_name": embeddings.model_name}, index_type=settings["index_type"],
+                  quantization=settings["quantization"])
+
+    with tempfile.TemporaryDirectory() as directory:
+        timed("save", index.save, directory)
+        index = timed("load", VectorIndex.load, directory)
+
+        # ── Queries ──────────────────────────────────────────────────
+        rag = RAGDemo(gemini_api_key="", llm=FakeLLM(delay=settings["llm_delay"]), embeddings=embeddings,
+                      query_cache_bytes=0, index_type=settings["index_type"])
+        rag.registry.add("bench", index, name=os.path.basename(pdf_path))
+        options = RetrievalOptions()
+        questions = [QUESTIONS[i % len(QUESTIONS)] for i in range(settings["queries"])]
+        rag.warm_up("bench")
+
+        search, prompt = [], []
+        for question in questions:
+            start = time.perf_counter()
+            retrieved = rag._retrieve(question, "bench", options)
+            searched = time.perf_counter()
+            packed, _ = rag.context_packer.pack(retrieved)
+            rag._build_prompt(question, packed)
+            search.append(searched - start)
+            prompt.append(time.perf_counter() - searched)
+
+        async def answer_all(concurrency: int) -> tuple:
+            slots = asyncio.Semaphore(concurrency)
+            latencies = []
+
+            async def answer(question: str):
+                async with slots:
+                    start = time.perf_counter()
+                    await rag.aanswer(question, document_id="bench", options=options)
+                    latencies.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(answer(question) for question in questions))
+            return latencies, time.perf_counter() - start
+
+        concurrency = {}
+        for level in settings["concurrency"]:
+            latencies, wall = asyncio.run(answer_all(level))
+            concurrency[str(level)] = {**percentiles(latencies), "qps": round(len(questions) / wall, 2)}
+
+    queue.put({
+        "pages": len(page_starts),
+        "characters": len(text),
+        "chunks": len(texts),
+        "index_type": index.index_type,
+        "stages_s": timings,
+        "search": percentiles(search),
+        "prompt_assembly": percentiles(prompt),
+        "answer": concurrency,
+        # ru_maxrss is in kilobytes on Linux, bytes on macOS
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                             / (1024 * 1024 if sys.platform == "darwin" else 1024), 1),
+    })
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def flatten(result: dict, prefix: str = "") -> dict:
+    """{"corpus.stages_s.parse": 0.1, ...} for comparing runs"""
+    flat = {}
+    for key, value in result.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def print_report(results: dict):
+    print("=" * 102)
+    print(f"Commit: {results['commit']}  Python {results['python']}  CPUs: {results['cpus']}  "
+          f"queries: {results['settings']['queries']}  LLM delay: {results['settings']['llm_delay']}s")
+    print(f"{'corpus':<18}{'pages':>6}{'chunks':>7}" + "".join(f"{stage + ' s':>14}" for stage in STAGES)
+          + f"{'RSS MB':>9}")
+    for name, corpus in results["corpora"].items():
+        print(f"{name:<18}{corpus['pages']:>6}{corpus['chunks']:>7}"
+              + "".join(f"{corpus['stages_s'][stage]:>14.4f}" for stage in STAGES) + f"{corpus['peak_rss_mb']:>9}")
+    print("-" * 102)
+    print(f"{'corpus':<18}{'stage':<18}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'QPS':>10}")
+    for name, corpus in results["corpora"].items():
+        rows = [("search", corpus["search"]), ("prompt assembly", corpus["prompt_assembly"])]
+        rows += [(f"answer c={level}", stats) for level, stats in corpus["answer"].items()]
+        for stage, stats in rows:
+            qps = f"{stats['qps']:>10.1f}" if "qps" in stats else f"{'':>10}"
+            print(f"{name:<18}{stage:<18}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}{qps}")
+    print("=" * 102)
+
+
+def print_comparison(baseline: dict, results: dict):
+    """Change of every shared metric; for QPS higher is better, for everything else lower"""
+    old, new = flatten(baseline["corpora"]), flatten(results["corpora"])
+    print(f"Compared with {baseline['commit']} (negative is faster / smaller, except QPS):")
+    for key in sorted(old.keys() & new.keys()):
+        if old[key] and not key.endswith(("pages", "characters", "chunks")):
+            print(f"  {key:<56}{old[key]:>12.4g} → {new[key]:<12.4g}{(new[key] - old[key]) / old[key]:>+8.1%}")
+
+
+def run(settings: dict, scales: list, output: str, compare: str):
+    corpora = {
+        "gdpr": os.path.join(BACKEND_DIR, "example_data", "gdpr.pdf"),
+        "nda_sample": os.path.join(BACKEND_DIR, "example_data", "nda_sample.pdf"),
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in scales:
+            corpora[f"gdpr_x{scale}"] = os.path.join(directory, f"gdpr_x{scale}.pdf")
+            make_pdf(corpora["gdpr"], scale, corpora[f"gdpr_x{scale}"])
+
+        results = {
+            "commit": git_commit(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "settings": settings,
+            "corpora": {},
+        }
+        context = multiprocessing.get_context("spawn")
+        for name, path in corpora.items():
+            queue = context.Queue()
+            process = context.Process(target=measure_corpus, args=(path, settings, queue))
+            process.start()
+            results["corpora"][name] = queue.get()
+            process.join()
+
+    print_report(results)
+    if compare:
+        with open(compare) as f:
+            print_comparison(json.load(f), results)
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Results written to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="*", default=[4], help="synthetic corpora: GDPR repeated N times")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--llm-delay", type=float, default=0.0, help="stub LLM latency in seconds")
+    parser.add_argument("--index-type", default="auto", choices=["auto", "flat", "ivf", "hnsw"])
+    parser.add_argument("--quantization", default="none", choices=["none", "int8", "pq"])
+    parser.add_argument("--batch-size", type=int, default=32, help="chunks per embedding call")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON file of an earlier run to compare against")
+    args = parser.parse_args()
+    run({
+        "queries": args.queries,
+        "concurrency": args.concurrency,
+        "llm_delay": args.llm_delay,
+        "index_type": args.index_type,
+        "quantization": args.quantization,
+        "batch_size": args.batch_size,
+    }, args.scales, args.output, args.compare)
@@ -0,0 +1,98 @@
+"""
+Benchmark cross-encoder re-ranking: added retrieval latency versus prompt tokens saved
+
+Answers questions whose answer lives in a known GDPR article with three
+retrieval set-ups:
+    k=3             the current default
+    k=N             over-fetching to find the right article more often
+    rerank M→3      fetch M candidates, re-score them in one batch, keep 3
+and reports how often the article is retrieved (hit@k), retrieval latency
+and the prompt tokens after context packing.
+
+Runs offline by default: hashing embeddings and a stub scorer (word
+overlap, ``--pair-delay-ms`` per pair). ``--scorer cross-encoder`` uses a
+real local model instead.
+
+Usage:
+    python benchmarks/rerank.py --pair-delay-ms 2 --over-fetch 8 --candidates 20
+    python benchmarks/rerank.py --scorer cross-encoder
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from src.fakes import FakeLLM, FakeReranker, HashingEmbeddings
+from src.rag_system import RAGDemo
+from src.reranker import DEFAULT_RERANK_MODEL, CrossEncoderReranker
+from src.retrieval import RetrievalOptions
+
+# (question, article that answers it)
+QUESTIONS = [
+    ("How long does a controller have to notify a personal data breach to the supervisory authority?", 33),
+    ("Under what conditions is consent valid, and can it be withdrawn?", 7),
+    ("When does a data subject have the right to have personal data erased?", 17),
+    ("When must a controller designate a data protection officer?", 37),
+    ("Can a data subject receive their personal data in a machine-readable format?", 20),
+    ("On which legal grounds is processing of personal data lawful?", 6),
+    ("What are the maximum administrative fines for infringements?", 83),
+    ("What must a contract between a controller and a processor contain?", 28),
+    ("When is a data protection impact assessment required?", 35),
+    ("Which records of processing activities must a controller maintain?", 30),
+]
+
+
+def article_number(doc) -> int:
+    match = re.search(r"\d+", doc.metadata.get("article") or "")
+    return int(match.group()) if match else -1
+
+
+def run(pdf_path: str, scorer: str, pair_delay_ms: float, over_fetch: int, candidates: int, repeats: int):
+    reranker = (CrossEncoderReranker(DEFAULT_RERANK_MODEL) if scorer == "cross-encoder"
+                else FakeReranker(pair_delay=pair_delay_ms / 1000))
+    rag = RAGDemo(gemini_api_key="", llm=FakeLLM(delay=0), embeddings=HashingEmbeddings(), reranker=reranker)
+    rag.setup(pdf_path=pdf_path)
+    rag.warm_up()
+
+    setups = [
+        ("k=3", RetrievalOptions(k=3)),
+        (f"k={over_fetch}", RetrievalOptions(k=over_fetch)),
+        (f"rerank {candidates}→3", RetrievalOptions(k=3, fetch_k=candidates, rerank=True)),
+    ]
+    print("=" * 78)
+    print(f"Scorer: {scorer}  questions: {len(QUESTIONS)}  repeats: {repeats}")
+    print(f"{'setup':<16}{'hit@k':>8}{'p50 ms':>10}{'p95 ms':>10}{'added ms':>10}{'prompt tokens':>15}{'reranked':>10}")
+    baseline = None
+    for name, options in setups:
+        latencies, hits, tokens, reranked = [], 0, [], 0
+        for question, article in QUESTIONS:
+            for _ in range(repeats):
+                start = time.perf_counter()
+                docs = rag._retrieve(question, "default", options)
+                latencies.append((time.perf_counter() - start) * 1000)
+            hits += any(article_number(doc) == article for doc in docs)
+            reranked += any(doc.metadata.get("rerank_score") is not None for doc in docs)
+            tokens.append(rag.context_packer.pack(docs)[1]["tokens_packed"])
+        p50 = np.percentile(latencies, 50)
+        baseline = p50 if baseline is None else baseline
+        print(f"{name:<16}{hits / len(QUESTIONS):>8.2f}{p50:>10.2f}{np.percentile(latencies, 95):>10.2f}"
+              f"{p50 - baseline:>10.2f}{np.mean(tokens):>15.0f}{reranked / len(QUESTIONS):>10.0%}")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", default="example_data/gdpr.pdf")
+    parser.add_argument("--scorer", choices=["stub", "cross-encoder"], default="stub")
+    parser.add_argument("--pair-delay-ms", type=float, default=2.0, help="stub scorer cost per pair")
+    parser.add_argument("--over-fetch", type=int, default=8)
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    run(args.pdf, args.scorer, args.pair_delay_ms, args.over_fetch, args.candidates, args.repeats)
@@ -0,0 +1,135 @@
+"""
+Benchmark API cold start: import time, time to bind the port and time to ready
+
+Each run starts a fresh interpreter. The import time of api.main is measured
+in its own process; then uvicorn is started on a free port and polled until
+/api/health/live answers (the port is bound) and until /api/health/ready
+returns 200 (models and the default index are loaded). The warmup's own
+per-step timings are printed for the last run.
+
+Every run gets an empty index storage directory and ingestion cache, and the
+server reads a temporary copy of the bundled GDPR index, so nothing in the
+source tree is written to. A bundled index built with another embedder than
+--embedder is rebuilt in every run, which is what that cold start costs.
+
+Usage:
+    python benchmarks/startup.py --runs 3
+    python benchmarks/startup.py --embedder hashing
+"""
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUNDLED_INDEX = os.path.join(BACKEND_DIR, "example_data", "gdpr_faiss_index")
+
+
+def import_seconds(env: dict) -> float:
+    code = "import time; t = time.perf_counter(); import api.main; print(time.perf_counter() - t)"
+    output = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get(url: str):
+    """(status, JSON body), or (None, None) while nothing is listening"""
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+    except (urllib.error.URLError, ConnectionError):
+        return None, None
+
+
+def isolated_env(env: dict, directory: str) -> dict:
+    """Server settings that keep every file it writes inside ``directory``"""
+    index_path = os.path.join(directory, "gdpr_faiss_index")
+    if os.path.exists(BUNDLED_INDEX):
+        shutil.copytree(BUNDLED_INDEX, index_path)
+    return dict(
+        env,
+        GDPR_INDEX_PATH=index_path,
+        INDEX_STORAGE_DIR=os.path.join(directory, "indexes"),
+        INGEST_CACHE_DIR=os.path.join(directory, "ingest-cache"),
+        ANSWER_CACHE_PATH=os.path.join(directory, "answers.sqlite"),
+    )
+
+
+def serve_once(env: dict, timeout: float) -> tuple:
+    """(seconds until the port answers, seconds until ready, readiness body)"""
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(port)],
+                              cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    bound, body = None, None
+    try:
+        while time.perf_counter() - start < timeout:
+            status, _ = get(f"http://127.0.0.1:{port}/api/health/live")
+            if status is not None and bound is None:
+                bound = time.perf_counter() - start
+            if status is not None:
+                status, body = get(f"http://127.0.0.1:{port}/api/health/ready")
+                if status == 200 or (body or {}).get("status") == "failed":
+                    return bound, time.perf_counter() - start, body
+            time.sleep(0.05)
+        return bound, None, body
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def run(runs: int, embedder: str, timeout: float):
+    env = dict(os.environ, PYTHONUNBUFFERED="1")
+    if embedder:
+        env["EMBEDDING_BACKEND"] = embedder
+
+    imports, binds, readies, body = [], [], [], None
+    for _ in range(runs):
+        imports.append(import_seconds(env))
+        with tempfile.TemporaryDirectory() as directory:
+            bound, ready, body = serve_once(isolated_env(env, directory), timeout)
+        binds.append(bound)
+        readies.append(ready)
+
+    def median(values):
+        values = [v for v in values if v is not None]
+        return f"{statistics.median(values):.2f}s" if values else "timeout"
+
+    print("=" * 60)
+    print(f"Runs: {runs}  embedder: {embedder or env.get('EMBEDDING_BACKEND', 'config default')}")
+    print(f"{'import api.main':<28}{median(imports):>12}")
+    print(f"{'port bound (live)':<28}{median(binds):>12}")
+    print(f"{'ready':<28}{median(readies):>12}")
+    if body:
+        print(f"Warmup ({body['status']}):")
+        for stage, seconds in body["timings"].items():
+            print(f"  {stage:<26}{seconds:>11.2f}s")
+        if body["error"]:
+            print(f"  error: {body['error']}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--embedder", help="EMBEDDING_BACKEND for the server (default: config)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="seconds to wait for readiness")
+    args = parser.parse_args()
+    run(args.runs, args.embedder, args.timeout)
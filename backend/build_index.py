@@ -0,0 +1,145 @@
+"""
+Build a vector index for a PDF document offline
+
+Parses and chunks the document with the same PDFParser / LegalChunker the
+API uses, embeds the chunks in batches and saves the index in the format
+RAGDemo.load_index() reads (see src/vector_index.py), including a
+manifest.json (embedding model, dimension, chunk count, source hash, build
+timings). Run it at image build time so the API only has to load the index
+at startup.
+
+--index-type and --quantization select the FAISS index (see src/ann.py);
+the manifest's "memory" section reports bytes per vector and recall@10 of
+the compressed index against exact search, before and after re-ranking.
+
+--convert rewrites an index saved by LangChain's FAISS.save_local() (pickled
+docstore) into the same format without re-embedding anything.
+
+Usage:
+    python build_index.py
+    python build_index.py example_data/nda_sample.pdf --output example_data/nda_faiss_index
+    python build_index.py --embedder hashing --batch-size 64
+    python build_index.py --embedder onnx --onnx-model-dir models/minilm-onnx --onnx-int8
+    python build_index.py --quantization int8
+    python build_index.py --convert example_data/gdpr_faiss_index
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from typing import Optional
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import (ANN_INDEX_TYPE, CHUNK_OVERLAP, EMBEDDING_BACKEND, EMBEDDING_BATCH_SIZE, EMBEDDING_MODEL,
+                    INDEX_QUANTIZATION, MAX_CHUNK_SIZE, MIN_CHUNK_SIZE, ONNX_INT8, ONNX_MODEL_DIR, PARSER_WORKERS)
+from src.ann import INDEX_TYPES, QUANTIZATIONS, quantization_report
+from src.chunker import LegalChunker
+from src.embeddings import EMBEDDING_BACKENDS, create_embeddings
+from src.index_builder import build_vector_index, describe_build, read_manifest
+from src.jobs import IngestionJob
+from src.parser import PDFParser
+from src.vector_index import VectorIndex
+
+
+def build_index(pdf_path: str, output_path: str, embedder: str, model_name: str, batch_size: int,
+                parser_workers: int = 1, max_chunk_size: int = MAX_CHUNK_SIZE, index_type: str = "auto",
+                quantization: str = "none", onnx_model_dir: Optional[str] = None, onnx_int8: bool = False) -> bool:
+    """
+    Build and save the index for one PDF document
+
+    Args:
+        pdf_path: path to the PDF document
+        output_path: directory to write the index and manifest to
+        embedder: embedding backend, see src/embeddings.py
+        model_name: sentence-transformers embedding model
+        batch_size: chunks embedded per call
+        parser_workers: processes extracting PDF pages in parallel
+        max_chunk_size: character budget per chunk
+        index_type: "flat", "ivf", "hnsw" or "auto"
+        quantization: "none", "int8" or "pq"
+        onnx_model_dir: exported model for the "onnx" backend
+        onnx_int8: use the int8-quantized ONNX model
+
+    Returns:
+        True on success
+    """
+    print("=" * 70)
+    print("BUILDING INDEX")
+    print("=" * 70)
+
+    if not os.path.exists(pdf_path):
+        print(f"❌ Error: PDF file not found at {pdf_path}")
+        return False
+
+    try:
+        embeddings = create_embeddings(embedder, model_name, batch_size=batch_size,
+                                       onnx_model_dir=onnx_model_dir, onnx_int8=onnx_int8)
+        job = IngestionJob(os.path.basename(pdf_path))
+        job.start()
+        chunker = LegalChunker(max_chunk_size=max_chunk_size, min_chunk_size=MIN_CHUNK_SIZE, overlap=CHUNK_OVERLAP)
+        index = build_vector_index(pdf_path, embeddings, parser=PDFParser(workers=parser_workers), chunker=chunker,
+                                   batch_size=batch_size, progress=job.update, index_type=index_type,
+                                   quantization=quantization)
+        job.complete()
+
+        timings = {stage: seconds for stage, seconds in job.timings.items() if stage != "queued"}
+        index.manifest.update(describe_build(pdf_path, timings))
+        index.manifest["memory"] = quantization_report(index.index, index.vectors, index.rerank_factor)
+        index.save(output_path)
+
+        print(f"\n✅ Index saved to: {output_path}")
+        print(json.dumps(read_manifest(output_path), indent=2))
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Error while building index: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def convert_legacy_index(path: str, model_name: str, source_path: str) -> bool:
+    """Rewrite a LangChain FAISS directory in place as a VectorIndex"""
+    from langchain_community.vectorstores import FAISS
+
+    if not VectorIndex.is_legacy(path):
+        print(f"❌ Error: no LangChain FAISS index at {path}")
+        return False
+
+    vectorstore = FAISS.load_local(path, None, allow_dangerous_deserialization=True)
+    manifest = {"model_name": model_name, "converted_from": "langchain-faiss"}
+    if os.path.exists(source_path):
+        manifest.update(describe_build(source_path, {}))
+    VectorIndex.from_langchain(vectorstore, manifest).save(path)
+    print(f"✅ Converted {path}")
+    print(json.dumps(read_manifest(path), indent=2))
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdf", nargs="?", default="example_data/gdpr.pdf")
+    parser.add_argument("--output", default="example_data/gdpr_faiss_index")
+    parser.add_argument("--embedder", choices=EMBEDDING_BACKENDS, default=EMBEDDING_BACKEND)
+    parser.add_argument("--model", default=EMBEDDING_MODEL)
+    parser.add_argument("--onnx-model-dir", default=ONNX_MODEL_DIR)
+    parser.add_argument("--onnx-int8", action="store_true", default=ONNX_INT8)
+    parser.add_argument("--batch-size", type=int, default=EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--parser-workers", type=int, default=PARSER_WORKERS)
+    parser.add_argument("--max-chunk-size", type=int, default=MAX_CHUNK_SIZE)
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default=ANN_INDEX_TYPE)
+    parser.add_argument("--quantization", choices=QUANTIZATIONS, default=INDEX_QUANTIZATION)
+    parser.add_argument("--convert", metavar="INDEX_DIR", help="convert a LangChain FAISS index in place")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="   %(message)s")
+
+    if args.convert:
+        success = convert_legacy_index(args.convert, args.model, args.pdf)
+    else:
+        success = build_index(args.pdf, args.output, args.embedder, args.model, args.batch_size, args.parser_workers,
+                              args.max_chunk_size, args.index_type, args.quantization, args.onnx_model_dir,
+                              args.onnx_int8)
+    sys.exit(0 if success else 1)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 
 # Project paths
@@ -6,12 +7,82 @@ PROJECT_ROOT = Path(__file__).parent
 DATA_DIR = PROJECT_ROOT / "example_data"
 
 # Model configuration
-EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+# Embedding backend (see src/embeddings.py): "sentence-transformers", "onnx" (ONNX Runtime on CPU)
+# or "hashing" (deterministic, offline tests)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "sentence-transformers")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", str(PROJECT_ROOT / "models" / "paraphrase-multilingual-MiniLM-L12-v2-onnx"))
+ONNX_INT8 = os.getenv("ONNX_INT8", "false").lower() == "true"  # dynamically quantized weights
 LLM_MODEL = "gemini-pro"
 
-# Chunking parameters
+# Chunking parameters (characters; ~4 characters per token)
 MIN_CHUNK_SIZE = 100
+MAX_CHUNK_SIZE = int(os.getenv("MAX_CHUNK_SIZE", "2000"))  # longer articles are split
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "200"))
+
+# Retrieval parameters (per-request values are bounded by these)
 DEFAULT_TOP_K = 3
+MAX_TOP_K = 20
+DEFAULT_FETCH_K = 20  # candidates considered for MMR re-ranking and rank fusion
+HYBRID_RETRIEVAL = os.getenv("HYBRID_RETRIEVAL", "true").lower() == "true"  # BM25 + dense fusion by default
+RRF_K = int(os.getenv("RRF_K", "60"))
+
+# Cross-encoder re-ranking of the fetch_k search candidates (see src/reranker.py)
+RERANK_ENABLED = os.getenv("RERANK_ENABLED", "false").lower() == "true"  # loads the model; default for requests
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "300"))  # skip re-ranking when retrieval would exceed this
+
+# Generation context (see src/context_packer.py): token budget for the retrieved chunks in the prompt
+CONTEXT_MAX_TOKENS = int(os.getenv("CONTEXT_MAX_TOKENS", "3000"))  # ~4 characters per token
+CONTEXT_MIN_TRUNCATED_TOKENS = int(os.getenv("CONTEXT_MIN_TRUNCATED_TOKENS", "50"))  # smaller remainders are dropped
+
+# Vector index (see src/ann.py): "flat", "ivf", "hnsw" or "auto" (flat up to 20k chunks, HNSW up to 1M, then IVF)
+ANN_INDEX_TYPE = os.getenv("ANN_INDEX_TYPE", "auto")
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", "16"))  # inverted lists scanned per query
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "64"))  # HNSW candidate list size
+INDEX_QUANTIZATION = os.getenv("INDEX_QUANTIZATION", "none")  # "none", "int8" or "pq" (re-ranked with float vectors)
+
+# Concurrency
+RETRIEVAL_WORKERS = int(os.getenv("RETRIEVAL_WORKERS", "4"))  # threads for blocking retrieval
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "1"))  # background document ingestion jobs
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))  # texts per embedding forward pass
+PARSER_WORKERS = int(os.getenv("PARSER_WORKERS", "1"))  # processes for PDF page extraction
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))  # LLM calls in flight per /api/ask-batch request
+MAX_BATCH_QUESTIONS = int(os.getenv("MAX_BATCH_QUESTIONS", "200"))
+
+# LLM client
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "")  # OpenAI-compatible server instead of Gemini (e.g. the fake server)
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))  # seconds per call, or between streamed tokens
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))  # on timeouts, connection errors, 429 and 5xx
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))  # LLM calls in flight across the process
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))  # consecutive failures that stop calls
+LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30"))  # seconds before upstream is tried again
+
+# Observability
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")  # startup, ingestion and warning messages of the API
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "false").lower() == "true"  # /api/debug/profiler endpoints
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "5"))  # default sampling interval
+
+# Document index registry
+GDPR_DOCUMENT_ID = "gdpr"
+GDPR_PDF_PATH = os.getenv("GDPR_PDF_PATH", str(DATA_DIR / "gdpr.pdf"))
+GDPR_INDEX_PATH = os.getenv("GDPR_INDEX_PATH", str(DATA_DIR / "gdpr_faiss_index"))  # prebuilt, only read
+INDEX_STORAGE_DIR = os.getenv("INDEX_STORAGE_DIR", os.path.join(tempfile.gettempdir(), "legal-rag-indexes"))
+MAX_LOADED_DOCUMENTS = int(os.getenv("MAX_LOADED_DOCUMENTS", "8"))  # indexes kept in memory
+MAX_INDEX_BYTES = int(os.getenv("MAX_INDEX_BYTES", str(512 * 1024 * 1024)))  # memory budget for loaded indexes
+
+# Ingestion cache (built indexes keyed by upload content hash)
+INGEST_CACHE_DIR = os.getenv("INGEST_CACHE_DIR", os.path.join(tempfile.gettempdir(), "legal-rag-ingest-cache"))
+INGEST_CACHE_MAX_BYTES = int(os.getenv("INGEST_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))  # disk budget
+
+# Answer cache
+ANSWER_CACHE_BACKEND = os.getenv("ANSWER_CACHE_BACKEND", "memory")  # "memory", "sqlite" or "none"
+ANSWER_CACHE_PATH = os.getenv("ANSWER_CACHE_PATH", os.path.join(tempfile.gettempdir(), "legal-rag-answers.sqlite"))
+ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", "3600"))  # seconds
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1024"))
+
+# Query embedding cache
+QUERY_CACHE_BYTES = int(os.getenv("QUERY_CACHE_BYTES", str(16 * 1024 * 1024)))  # memory cap
 
 
 # API Settings
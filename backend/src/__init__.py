@@ -1,8 +1,16 @@
 """Legal RAG Demo package"""
 
-from .parser import PDFParser
-from .chunker import LegalChunker
-from .rag_system import RAGDemo
+import importlib
 
 __all__ = ['PDFParser', 'LegalChunker', 'RAGDemo']
 __version__ = '1.0.0'
+
+# Imported on first use, so that light modules (src.jobs, src.lifecycle) do
+# not pull in PyMuPDF, FAISS and LangChain with the package
+_EXPORTS = {'PDFParser': '.parser', 'LegalChunker': '.chunker', 'RAGDemo': '.rag_system'}
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,166 @@
+"""FAISS index factory: flat, IVF or HNSW chosen from corpus size, with optional int8 / PQ codes"""
+
+import logging
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+import faiss
+import numpy as np
+
+INDEX_TYPES = ("auto", "flat", "ivf", "hnsw")
+QUANTIZATIONS = ("none", "int8", "pq")
+
+logger = logging.getLogger(__name__)
+
+# Up to FLAT_MAX_VECTORS brute force is exact and about a millisecond per query.
+# For 384-dimensional embeddings (benchmarks/ann_recall.py) HNSW then gives the
+# best recall per millisecond and, unlike IVF, needs no k-means training; past
+# HNSW_MAX_VECTORS its graph links and build time grow too large, so IVF is used.
+FLAT_MAX_VECTORS = 20_000
+HNSW_MAX_VECTORS = 1_000_000
+
+
+@dataclass(frozen=True)
+class SearchParams:
+    """Search-time knobs of approximate indexes
+
+    Attributes:
+        nprobe: inverted lists scanned per query by IVF indexes
+        ef_search: candidate list size of HNSW searches (at least k)
+    """
+
+    nprobe: int = 16
+    ef_search: int = 64
+
+    def for_index(self, index, k: int):
+        """faiss SearchParameters for ``index``, or None for exact indexes"""
+        kind = index_type_of(index)
+        if kind == "ivf":
+            return faiss.SearchParametersIVF(nprobe=self.nprobe)
+        if kind == "hnsw":
+            return faiss.SearchParametersHNSW(efSearch=max(self.ef_search, k))
+        return None
+
+
+def choose_index_type(num_vectors: int) -> str:
+    if num_vectors <= FLAT_MAX_VECTORS:
+        return "flat"
+    if num_vectors <= HNSW_MAX_VECTORS:
+        return "hnsw"
+    return "ivf"
+
+
+def build_faiss_index(vectors: np.ndarray, index_type: str = "auto", quantization: str = "none",
+                      hnsw_m: int = 32, nlist: Optional[int] = None) -> faiss.Index:
+    """
+    Build an L2 index over the given vectors
+
+    Args:
+        vectors: float32 matrix, one vector per row
+        index_type: "flat", "ivf", "hnsw" or "auto" (see choose_index_type)
+        quantization: how vectors are stored in the index: "none" (float32),
+            "int8" (scalar quantizer, 4x smaller) or "pq" (product quantizer,
+            8 dimensions per byte)
+        hnsw_m: neighbours per HNSW node
+        nlist: IVF inverted lists (about 4 * sqrt(n) if omitted)
+
+    Returns:
+        A trained index containing every vector, with ids 0..n-1
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type {index_type!r}, expected one of {INDEX_TYPES}")
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unknown quantization {quantization!r}, expected one of {QUANTIZATIONS}")
+    num_vectors, dimension = vectors.shape
+    if index_type == "auto":
+        index_type = choose_index_type(num_vectors)
+    codec = _codec(quantization, num_vectors, dimension)
+
+    if index_type == "hnsw":
+        index = faiss.index_factory(dimension, f"HNSW{hnsw_m}" + ("" if codec == "Flat" else f"_{codec}"))
+        index.hnsw.efConstruction = max(40, 2 * hnsw_m)
+    elif index_type == "ivf" and num_vectors >= 39:
+        # faiss wants ~39 training points per list; smaller corpora fall back to flat
+        nlist = nlist or int(4 * math.sqrt(num_vectors))
+        nlist = max(1, min(nlist, num_vectors // 39))
+        index = faiss.index_factory(dimension, f"IVF{nlist},{codec}")
+    else:
+        index = faiss.index_factory(dimension, codec)
+    if not index.is_trained:
+        index.train(vectors)
+    index.add(vectors)
+    return index
+
+
+def _codec(quantization: str, num_vectors: int, dimension: int) -> str:
+    """faiss factory name of the vector encoding"""
+    if quantization == "int8":
+        return "SQ8"
+    if quantization == "pq":
+        # Each of the m sub-quantizers needs ~39 training points per centroid
+        nbits = min(8, int(math.log2(max(num_vectors, 1) / 39))) if num_vectors >= 39 * 16 else 0
+        m = next((m for m in range(dimension // 8, 0, -1) if dimension % m == 0), 0)
+        if nbits >= 4 and m:
+            return f"PQ{m}x{nbits}"
+        logger.warning("%d vectors are too few to train PQ codes, storing int8 instead", num_vectors)
+        return "SQ8"
+    return "Flat"
+
+
+def code_size(index) -> int:
+    """Bytes stored per vector (excluding HNSW graph links and IVF list ids)"""
+    if isinstance(index, faiss.IndexHNSW):
+        index = faiss.downcast_index(index.storage)
+    if isinstance(index, faiss.IndexIVF):
+        return index.code_size
+    return index.sa_code_size()
+
+
+def quantization_report(index, vectors: np.ndarray, rerank: int, k: int = 10, queries: int = 200,
+                        params: Optional[SearchParams] = None) -> dict:
+    """
+    Memory per vector and recall@k of a (compressed) index against exact search
+
+    Queries are a sample of the indexed vectors themselves; recall is given
+    for the raw index results and after re-ranking ``rerank * k`` candidates
+    with the float vectors, as VectorIndex.search does.
+    """
+    num_vectors = len(vectors)
+    k = min(k, num_vectors)
+    sample = np.asarray(vectors[np.random.default_rng(0).choice(num_vectors, min(queries, num_vectors), replace=False)],
+                        dtype=np.float32)
+    _, truth = faiss.knn(sample, np.ascontiguousarray(vectors, dtype=np.float32), k)
+
+    fetch = min(rerank * k, num_vectors)
+    params = params or SearchParams()
+    _, found = index.search(sample, fetch, params=params.for_index(index, fetch))
+    reranked = [exact_rerank(vectors, query, row[row >= 0], k)[0] for query, row in zip(sample, found)]
+
+    def recall(results) -> float:
+        return round(float(np.mean([len(set(r[:k]) & set(t)) / k for r, t in zip(results, truth)])), 4)
+
+    return {
+        "bytes_per_vector": code_size(index),
+        "float_bytes_per_vector": 4 * vectors.shape[1],
+        "index_bytes": code_size(index) * num_vectors,
+        f"recall_at_{k}": recall(found),
+        f"recall_at_{k}_reranked": recall(reranked),
+    }
+
+
+def exact_rerank(vectors: np.ndarray, query: np.ndarray, ids: np.ndarray, k: int) -> tuple:
+    """(ids, distances) of the k of ``ids`` closest to ``query`` by exact L2 distance over the float vectors"""
+    candidates = np.asarray(vectors[ids], dtype=np.float32)
+    distances = ((candidates - query) ** 2).sum(axis=1)
+    order = np.argsort(distances)[:k]
+    return ids[order], distances[order]
+
+
+def index_type_of(index) -> str:
+    """"flat", "ivf" or "hnsw" for an index built by build_faiss_index (or loaded from disk)"""
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVF):
+        return "ivf"
+    return "flat"
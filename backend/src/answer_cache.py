@@ -0,0 +1,166 @@
+"""Cache of generated answers with TTL and LRU bounds"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class MemoryCacheBackend:
+    """In-process LRU store"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            document_id, value, expires_at = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, document_id: str, value: dict, expires_at: float):
+        with self._lock:
+            self._entries[key] = (document_id, value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete_document(self, document_id: str):
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry[0] == document_id]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """Local-file store that survives restarts and can be shared by workers"""
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            " key TEXT PRIMARY KEY, document_id TEXT, value TEXT,"
+            " expires_at REAL, last_used REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS answers_document ON answers (document_id)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS answers_last_used ON answers (last_used)")
+
+    def get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM answers WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM answers WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE answers SET last_used = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, document_id: str, value: dict, expires_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?)",
+                (key, document_id, json.dumps(value), expires_at, time.time()),
+            )
+            self._conn.execute(
+                "DELETE FROM answers WHERE key IN ("
+                " SELECT key FROM answers ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def delete_document(self, document_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM answers WHERE document_id = ?", (document_id,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+
+
+class AnswerCache:
+    """Answers keyed on the sanitized question, document version and prompt version
+
+    The document version covers the index version and the retrieval options.
+    Including the index version in the key means a re-indexed document never
+    serves answers built from its old chunks, even from a shared backend;
+    ``invalidate_document`` additionally frees those entries right away.
+    """
+
+    def __init__(self, backend, ttl: float = 3600, prompt_version: str = "1"):
+        """
+        Args:
+            backend: MemoryCacheBackend or SQLiteCacheBackend
+            ttl: seconds an answer stays valid
+            prompt_version: version of the generation prompt, part of the key
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.prompt_version = prompt_version
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def key(self, question: str, document_id: str, version: str) -> str:
+        normalized = " ".join(question.casefold().split())
+        raw = f"{self.prompt_version}\0{document_id}\0{version}\0{normalized}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, question: str, document_id: str, version: str) -> Optional[dict]:
+        value = self.backend.get(self.key(question, document_id, version))
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, question: str, document_id: str, version: str, value: dict):
+        self.backend.set(self.key(question, document_id, version), document_id, value, time.time() + self.ttl)
+
+    def invalidate_document(self, document_id: str):
+        self.backend.delete_document(document_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "entries": len(self.backend),
+            "ttl": self.ttl,
+        }
+
+
+def create_answer_cache(backend: str, ttl: float, max_entries: int, prompt_version: str,
+                        path: Optional[str] = None) -> Optional[AnswerCache]:
+    """Build an AnswerCache from config; ``backend`` is one of memory, sqlite or none"""
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return AnswerCache(MemoryCacheBackend(max_entries), ttl=ttl, prompt_version=prompt_version)
+    if backend == "sqlite":
+        return AnswerCache(SQLiteCacheBackend(path, max_entries), ttl=ttl, prompt_version=prompt_version)
+    raise ValueError(f"Unknown answer cache backend: {backend}")
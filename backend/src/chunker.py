@@ -1,75 +1,214 @@
 """Text chunking module for legal documents"""
 
 import re
-from typing import List, Dict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .parser import page_at
+
+# Bump when chunk boundaries or metadata change, so cached indexes are rebuilt
+CHUNKER_VERSION = "4"
+
+# Chapter headings are upper case; articles MUST be at start of line to avoid false matches in text
+_STRUCTURE_PATTERN = re.compile(
+    r'(?P<chapter>CHAPTER\s+(?:[IVXLCDM]+|\d+)(?:\s*[-:.]?\s*[^\n]*)?)'
+    r'|(?P<article>(?:^|\n)\s*(?i:Article)\s+\d+\s\n)'
+)
+# Split points inside an article, coarsest first: numbered paragraphs ("1."), points ("(a)", "(1)"), lines
+_SPLIT_PATTERNS = [
+    re.compile(r'(?m)^\s*\d{1,3}\.(?=\s)'),
+    re.compile(r'(?m)^\s*\(\w{1,5}\)'),
+    re.compile(r'\n'),
+]
+_PARAGRAPH_BREAK = re.compile(r'\n\n')
+_WHITESPACE = re.compile(r'\s')
 
 
 class LegalChunker:
-    """Hierarchical chunking for legal documents"""
-    
-    @staticmethod
-    def chunk_gdpr(text: str) -> List[Dict[str, str]]:
+    """Hierarchical chunking for legal documents
+
+    Chapters and articles are found in a single pass over the text. Articles
+    longer than ``max_chunk_size`` characters are split at numbered
+    paragraphs, then points, then lines; the pieces are packed greedily up to
+    the budget, and pieces shorter than ``min_chunk_size`` are merged into a
+    neighbour. Continuation chunks repeat the article heading and up to the
+    last ``overlap`` characters of the previous chunk; the overlap is clipped
+    where needed so that no chunk exceeds ``max_chunk_size``.
+    """
+
+    def __init__(self, max_chunk_size: Optional[int] = 2000, min_chunk_size: int = 100, overlap: int = 200):
+        """
+        Args:
+            max_chunk_size: character budget per chunk (~4 characters per token);
+                None keeps every article whole
+            min_chunk_size: pieces of a split article shorter than this are merged
+            overlap: characters of the previous piece repeated at the start of the next
+        """
+        self.max_chunk_size = max_chunk_size
+        self.min_chunk_size = min_chunk_size
+        self.overlap = overlap
+
+    @property
+    def version(self) -> str:
+        """CHUNKER_VERSION plus the size settings, since both change the chunks produced"""
+        return f"{CHUNKER_VERSION}:{self.max_chunk_size}:{self.min_chunk_size}:{self.overlap}"
+
+    def chunk_gdpr(self, text: str, page_starts: Optional[List[int]] = None) -> List[Dict[str, str]]:
         """
         Splits GDPR text into chunks by chapters and articles
-        
+
         Args:
             text: document text
-            min_chunk_size: minimum character length for chunks
-            
+            page_starts: offset of each page in text (see PDFParser.parse_pages);
+                when given, chunks get 'page_start' / 'page_end'
+
         Returns:
             List of chunks with metadata
         """
-        chunks = []
-        
-        # Patterns for finding chapters and articles
-        chapter_pattern = r'(?:CHAPTER)\s+(?:[IVXLCDM]+|\d+)(?:\s*[-:.]?\s*[^\n]*)?'
-        # Article pattern - MUST be at start of line to avoid false matches in text
-        article_pattern = r'(?:^|\n)\s*(?:Article)\s+\d+\s\n'
-        
-        # Find all chapters
-        chapter_matches = list(re.finditer(chapter_pattern, text))
-        
-        for i, chapter_match in enumerate(chapter_matches):
-            chapter_start = chapter_match.start()
-            chapter_end = chapter_matches[i + 1].start() if i + 1 < len(chapter_matches) else len(text)
-            chapter_text = text[chapter_start:chapter_end]
-            chapter_name = chapter_match.group(0)
-            
-            # Find articles in chapter
-            article_matches = list(re.finditer(article_pattern, chapter_text, re.IGNORECASE))
-            
-            if article_matches:
-                for j, article_match in enumerate(article_matches):
-                    article_start = article_match.start()
-                    article_end = article_matches[j + 1].start() if j + 1 < len(article_matches) else len(chapter_text)
-                    article_text = chapter_text[article_start:article_end].strip()
-                    article_name = article_match.group(0)
-                    
-                    chunks.append({
-                        'chapter': chapter_name,
-                        'article': article_name,
-                        'text': article_text,
-                        'metadata': f"{chapter_name} - {article_name}"
-                    })
+        return list(self.iter_chunks(text, page_starts))
+
+    def iter_chunks(self, text: str, page_starts: Optional[List[int]] = None) -> Iterator[Dict[str, str]]:
+        """Same chunks as chunk_gdpr(), yielded as soon as each article is complete"""
+        for chunk, (start, end) in self._iter_sections(text):
+            if page_starts:
+                chunk['page_start'] = page_at(page_starts, start)
+                chunk['page_end'] = page_at(page_starts, max(end - 1, start))
+            yield chunk
+
+    def _iter_sections(self, text: str) -> Iterator[Tuple[Dict[str, str], Tuple[int, int]]]:
+        chapter_name = None
+        chapter_start = 0
+        chapter_has_articles = False
+        article = None  # (name, start) of the article being read
+
+        def close(end: int):
+            if article is not None:
+                yield from self._split(chapter_name, article[0], text, article[1], end)
+            elif chapter_name is not None and not chapter_has_articles:
+                yield from self._split(chapter_name, 'N/A', text, chapter_start, end)
+
+        for match in _STRUCTURE_PATTERN.finditer(text):
+            if match.lastgroup == 'chapter':
+                yield from close(match.start())
+                chapter_name, chapter_start = match.group(), match.start()
+                chapter_has_articles, article = False, None
+            elif chapter_name is not None:
+                # Text between a chapter heading and its first article is not indexed
+                if article is not None:
+                    yield from close(match.start())
+                chapter_has_articles, article = True, (match.group(), match.start())
+
+        if chapter_name is not None:
+            yield from close(len(text))
+            return
+
+        # No chapters found: pack paragraphs into sections
+        section = 0
+        for start, end in self._pack(text, self._paragraph_pieces(text), self.max_chunk_size):
+            section += 1
+            yield self._make_chunk('N/A', f'Section {section}', text[start:end].strip()), (start, end)
+
+    # ── Splitting ────────────────────────────────────────────────
+    def _split(self, chapter: str, article: str, text: str, start: int, end: int):
+        """Chunks for one article (or article-less chapter) spanning text[start:end]"""
+        body = text[start:end].strip()
+        if self.max_chunk_size is None or len(body) <= self.max_chunk_size:
+            yield self._make_chunk(chapter, article, body), (start, end)
+            return
+
+        heading = self._heading(text[start:end])[:self.max_chunk_size // 4]
+        # Continuation chunks also carry the heading and overlap. Pieces get what is left after the
+        # overlap but never less than half the chunk, and never more than the room beside the heading
+        limit = self.max_chunk_size - len(heading) - 2
+        budget = min(max(limit - self.overlap, self.max_chunk_size // 2), limit)
+        pieces = self._pack(text, self._split_pieces(text, start, end, _SPLIT_PATTERNS, budget), budget, limit)
+        previous = None
+        for part, (piece_start, piece_end) in enumerate(pieces, start=1):
+            piece = text[piece_start:piece_end].strip()
+            if previous is not None:
+                # The overlap gets whatever room the piece leaves, up to ``overlap`` characters
+                tail = self._tail(text, previous, min(self.overlap, limit - len(piece) - 1))
+                piece = f"{heading}\n{tail}\n{piece}" if tail else f"{heading}\n{piece}"
+            chunk = self._make_chunk(chapter, article, piece)
+            chunk['part'], chunk['parts'] = part, len(pieces)
+            chunk['metadata'] += f" (part {part} of {len(pieces)})"
+            previous = (piece_start, piece_end)
+            yield chunk, (piece_start, piece_end)
+
+    def _split_pieces(self, text: str, start: int, end: int, patterns, budget: int) -> List[Tuple[int, int]]:
+        """Cut text[start:end] into spans no longer than the budget, at the coarsest boundary possible"""
+        if end - start <= budget:
+            return [(start, end)]
+        if not patterns:
+            return self._hard_split(text, start, end, budget)
+        cuts = [m.start() for m in patterns[0].finditer(text, start, end) if m.start() > start]
+        bounds = [start] + cuts + [end]
+        pieces = []
+        for piece_start, piece_end in zip(bounds, bounds[1:]):
+            pieces.extend(self._split_pieces(text, piece_start, piece_end, patterns[1:], budget))
+        return pieces
+
+    @staticmethod
+    def _hard_split(text: str, start: int, end: int, budget: int) -> List[Tuple[int, int]]:
+        pieces = []
+        while end - start > budget:
+            cut = start + budget
+            space = text.rfind(' ', start + budget // 2, cut)
+            cut = space if space > 0 else cut
+            pieces.append((start, cut))
+            start = cut
+        return pieces + [(start, end)]
+
+    def _paragraph_pieces(self, text: str) -> List[Tuple[int, int]]:
+        bounds = [0] + [m.end() for m in _PARAGRAPH_BREAK.finditer(text)] + [len(text)]
+        pieces = []
+        for start, end in zip(bounds, bounds[1:]):
+            if self.max_chunk_size is None:
+                pieces.append((start, end))
             else:
-                chapter_text.strip()
-                chunks.append({
-                    'chapter': chapter_name,
-                    'article': 'N/A',
-                    'text': chapter_text.strip(),
-                    'metadata': chapter_name
-                })
-        
-        # If no chapters found, split text into paragraphs
-        if not chunks:
-            paragraphs = text.split('\n\n')
-            for i, para in enumerate(paragraphs):
-                para.strip()
-                chunks.append({
-                    'chapter': 'N/A',
-                    'article': f'Section {i+1}',
-                    'text': para.strip(),
-                    'metadata': f'Section {i+1}'
-                })
-        
-        return chunks
\ No newline at end of file
+                pieces.extend(self._split_pieces(text, start, end, _SPLIT_PATTERNS, self.max_chunk_size))
+        return [(start, end) for start, end in pieces if text[start:end].strip()]
+
+    def _pack(self, text: str, pieces: List[Tuple[int, int]], budget: Optional[int],
+              limit: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Merge consecutive spans up to the budget; spans below the minimum join a neighbour up to the limit"""
+        if budget is None:
+            return pieces
+        limit = budget if limit is None else limit
+        packed = []
+        for start, end in pieces:
+            if packed and (end - packed[-1][0] <= budget
+                           or (end - packed[-1][0] <= limit
+                               and len(text[packed[-1][0]:packed[-1][1]].strip()) < self.min_chunk_size)):
+                packed[-1] = (packed[-1][0], end)
+            else:
+                packed.append((start, end))
+        if (len(packed) > 1 and packed[-1][1] - packed[-2][0] <= limit
+                and len(text[packed[-1][0]:packed[-1][1]].strip()) < self.min_chunk_size):
+            last = packed.pop()
+            packed[-1] = (packed[-1][0], last[1])
+        return packed
+
+    @staticmethod
+    def _heading(body: str) -> str:
+        """'Article 6 Lawfulness of processing': the first two lines of the article"""
+        lines = body.strip().split('\n', 2)
+        return ' '.join(line.strip() for line in lines[:2])[:200]
+
+    @staticmethod
+    def _tail(text: str, piece: Tuple[int, int], overlap: int) -> str:
+        """Last ``overlap`` characters of a piece, starting at a word boundary"""
+        if overlap <= 0:
+            return ''
+        start = max(piece[0], piece[1] - overlap)
+        match = _WHITESPACE.search(text, start, piece[1])
+        return text[match.end() if match else start:piece[1]].strip()
+
+    @staticmethod
+    def _make_chunk(chapter: str, article: str, body: str) -> Dict[str, str]:
+        metadata = chapter if article == 'N/A' else f"{chapter} - {article}" if chapter != 'N/A' else article
+        return {
+            'chapter': chapter,
+            'article': article,
+            'text': body,
+            'metadata': metadata,
+        }
@@ -0,0 +1,172 @@
+"""Token-budgeted packing of retrieved chunks into the generation prompt"""
+
+import re
+from difflib import SequenceMatcher
+from typing import Callable, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+SOURCE_SEPARATOR = "\n---\n"
+TRUNCATION_MARK = " [...]"
+
+_WORD = re.compile(r'\S+')
+# Sentence ends, including the ";" / ":" that close points of legal enumerations, and new numbered points
+_SENTENCE_END = re.compile(r'(?<=[.;:!?])\s+|\n(?=\s*(?:\d{1,3}\.|\(\w{1,5}\))\s)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def estimate_tokens(text: str) -> int:
+    """~4 characters per token, the ratio used for all size settings"""
+    return (len(text) + 3) // 4
+
+
+def format_source(doc: Document) -> str:
+    """How one chunk appears in the prompt's <DOCUMENTS> section"""
+    return f"SOURCE: {doc.metadata.get('source', 'N/A')}\nCONTENT: {doc.page_content}"
+
+
+class ContextPacker:
+    """Fits retrieved chunks into a token budget before generation
+
+    Chunks keep the retriever's order (cited articles first, then its fused
+    or re-ranked ranking, which a raw cosine sort would undo for BM25-only
+    and re-ranked hits), and text that repeats an earlier chunk, such as the
+    overlap that continuation chunks share with the previous part of their
+    article, is cut out; chunks with nothing new left are dropped. Chunks are then added whole while they
+    fit; the first one that does not is truncated at the last sentence
+    boundary within the budget, unless less than ``min_truncated_tokens``
+    would remain, and everything after it is dropped.
+    """
+
+    def __init__(self, max_tokens: Optional[int] = 3000, min_truncated_tokens: int = 50,
+                 min_overlap_words: int = 12, count_tokens: Callable[[str], int] = estimate_tokens):
+        """
+        Args:
+            max_tokens: budget for the <DOCUMENTS> section; None disables it
+            min_truncated_tokens: smallest useful part of a truncated chunk
+            min_overlap_words: shortest run of words treated as repeated text
+            count_tokens: tokenizer-specific counter (estimate by default)
+        """
+        self.max_tokens = max_tokens
+        self.min_truncated_tokens = min_truncated_tokens
+        self.min_overlap_words = min_overlap_words
+        self.count_tokens = count_tokens
+
+    def cache_key(self) -> str:
+        """Identifies settings that change the prompt, and so cached answers"""
+        return f"context={self.max_tokens}/{self.min_truncated_tokens}/{self.min_overlap_words}"
+
+    def pack(self, docs: List[Document]) -> Tuple[List[Document], dict]:
+        """
+        Select and trim chunks for the prompt
+
+        Args:
+            docs: retrieved chunks, best first
+
+        Returns:
+            (documents to put in the prompt, in order, stats) where stats
+            counts tokens and chunks before and after packing
+        """
+        tokens_in = self._tokens(docs)
+        packed: List[Document] = []
+        seen: List[Tuple[List[str], set]] = []  # words and shingles of every packed chunk
+        deduplicated = truncated = 0
+        used = 0
+
+        for doc in docs:
+            text = self._remove_repeats(doc.page_content, seen)
+            if len(_WORD.findall(text)) < 3:
+                deduplicated += 1
+                continue
+            if text != doc.page_content:
+                doc = Document(page_content=text, metadata={**doc.metadata, "deduplicated": True})
+
+            cost = self._cost(doc, first=not packed)
+            if self.max_tokens is not None and used + cost > self.max_tokens:
+                doc = self._truncate(doc, self.max_tokens - used, first=not packed)
+                if doc is not None:
+                    packed.append(doc)
+                    truncated += 1
+                break
+            packed.append(doc)
+            words = _WORD.findall(text)
+            seen.append((words, self._shingles(words)))
+            used += cost
+
+        tokens_packed = self._tokens(packed)
+        return packed, {
+            "budget_tokens": self.max_tokens,
+            "tokens_in": tokens_in,
+            "tokens_packed": tokens_packed,
+            "tokens_dropped": max(tokens_in - tokens_packed, 0),
+            "chunks_in": len(docs),
+            "chunks_packed": len(packed),
+            "chunks_deduplicated": deduplicated,
+            "chunks_truncated": truncated,
+            "chunks_dropped": len(docs) - len(packed) - deduplicated,
+        }
+
+    # ── Helpers ──────────────────────────────────────────────────
+    def _tokens(self, docs: List[Document]) -> int:
+        return self.count_tokens(SOURCE_SEPARATOR.join(format_source(doc) for doc in docs))
+
+    def _cost(self, doc: Document, first: bool) -> int:
+        return self.count_tokens(format_source(doc) if first else SOURCE_SEPARATOR + format_source(doc))
+
+    def _remove_repeats(self, text: str, seen: List[Tuple[List[str], set]]) -> str:
+        """Cut runs of at least ``min_overlap_words`` words that already appear in a packed chunk"""
+        spans = [match.span() for match in _WORD.finditer(text)]
+        words = [text[start:end] for start, end in spans]
+        kept = list(range(len(words)))
+        shingles = self._shingles(words)
+        for other, other_shingles in seen:
+            # Cheap pre-check: a repeated run shares at least one shingle with the packed chunk
+            if shingles.isdisjoint(other_shingles):
+                continue
+            while kept:
+                current = [words[i] for i in kept]
+                match = SequenceMatcher(None, other, current, autojunk=False).find_longest_match(
+                    0, len(other), 0, len(current))
+                if match.size < self.min_overlap_words:
+                    break
+                del kept[match.b:match.b + match.size]
+        if len(kept) == len(words):
+            return text
+
+        # Rebuild from runs of consecutive kept words, keeping their original line breaks
+        runs, start = [], 0
+        for position in range(1, len(kept) + 1):
+            if position == len(kept) or kept[position] != kept[position - 1] + 1:
+                runs.append(text[spans[kept[start]][0]:spans[kept[position - 1]][1]])
+                start = position
+        return "\n".join(runs)
+
+    def _shingles(self, words: List[str]) -> set:
+        n = self.min_overlap_words
+        return {tuple(words[i:i + n]) for i in range(len(words) - n + 1)}
+
+    def _truncate(self, doc: Document, budget: int, first: bool) -> Optional[Document]:
+        """The chunk cut at the last sentence end that fits ``budget``; None if too little would remain
+
+        The first chunk is never dropped: without a sentence end in budget it is cut between words.
+        """
+        if budget < self.min_truncated_tokens and not first:
+            return None
+        best = self._cut(doc, _SENTENCE_END, budget, first)
+        if best is None and first:
+            best = self._cut(doc, _WHITESPACE, budget, first)
+        if best is None or (not first and self.count_tokens(best.page_content) < self.min_truncated_tokens):
+            return None
+        return best
+
+    def _cut(self, doc: Document, boundary: re.Pattern, budget: int, first: bool) -> Optional[Document]:
+        """Longest prefix of the chunk ending at a ``boundary`` match whose cost fits ``budget``"""
+        text = doc.page_content
+        best = None
+        for match in boundary.finditer(text):
+            candidate = Document(page_content=text[:match.start()].rstrip() + TRUNCATION_MARK,
+                                 metadata={**doc.metadata, "truncated": True})
+            if self._cost(candidate, first) > budget:
+                break
+            best = candidate
+        return best
@@ -0,0 +1,224 @@
+"""Embedding backends and wrappers"""
+
+import logging
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """LRU cache of query embeddings in front of another Embeddings object
+
+    Query vectors are stored as float32 arrays and evicted least recently
+    used first once they take more than ``max_bytes``. Document embedding is
+    passed straight through, as chunks are only embedded once at ingestion.
+    """
+
+    def __init__(self, embeddings: Embeddings, max_bytes: int = 16 * 1024 * 1024):
+        self.embeddings = embeddings
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        # Expose attributes of the wrapped embeddings, e.g. model_name
+        if name == "embeddings":
+            raise AttributeError(name)
+        return getattr(self.embeddings, name)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._normalize(text)
+        with self._lock:
+            vector = self._cache.get(key)
+            if vector is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                metrics.CACHE_LOOKUPS.inc(cache="query_embedding", result="hit")
+                return vector.tolist()
+            self.misses += 1
+        metrics.CACHE_LOOKUPS.inc(cache="query_embedding", result="miss")
+
+        vector = np.asarray(self.embeddings.embed_query(key), dtype=np.float32)
+        self._store(key, vector)
+        return vector.tolist()
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """embed_query() for many queries; the uncached ones are embedded in one batch
+
+        Misses go through the wrapped ``embed_documents``, which for the
+        symmetric models used here embeds a text exactly like ``embed_query``.
+        """
+        keys = [self._normalize(text) for text in texts]
+        vectors: List[Optional[np.ndarray]] = [None] * len(keys)
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._cache.get(key)
+                if vector is not None:
+                    self._cache.move_to_end(key)
+                    vectors[i] = vector
+            hits = sum(vector is not None for vector in vectors)
+            self.hits += hits
+            self.misses += len(keys) - hits
+        metrics.CACHE_LOOKUPS.inc(hits, cache="query_embedding", result="hit")
+        metrics.CACHE_LOOKUPS.inc(len(keys) - hits, cache="query_embedding", result="miss")
+
+        missing = list(dict.fromkeys(key for key, vector in zip(keys, vectors) if vector is None))
+        if missing:
+            embedded = dict(zip(missing, (np.asarray(vector, dtype=np.float32)
+                                          for vector in self.embeddings.embed_documents(missing))))
+            for key, vector in embedded.items():
+                self._store(key, vector)
+            vectors = [embedded[key] if vector is None else vector for key, vector in zip(keys, vectors)]
+        return [vector.tolist() for vector in vectors]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0,
+                "entries": len(self._cache),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _store(self, key: str, vector: np.ndarray):
+        with self._lock:
+            if key in self._cache:
+                return
+            self._cache[key] = vector
+            self._bytes += self._entry_size(key, vector)
+            while self._cache and self._bytes > self.max_bytes:
+                evicted_key, evicted = self._cache.popitem(last=False)
+                self._bytes -= self._entry_size(evicted_key, evicted)
+
+    @staticmethod
+    def _entry_size(key: str, vector: np.ndarray) -> int:
+        return vector.nbytes + len(key)
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+# ── Backends ─────────────────────────────────────────────────
+EMBEDDING_BACKENDS = ("sentence-transformers", "onnx", "hashing")
+
+
+def create_embeddings(backend: str, model_name: str, batch_size: int = 32,
+                      onnx_model_dir: Optional[str] = None, onnx_int8: bool = False) -> Embeddings:
+    """
+    Embeddings for the configured backend
+
+    Args:
+        backend: "sentence-transformers" (PyTorch), "onnx" (ONNX Runtime on CPU)
+            or "hashing" (deterministic, no model download; for offline tests)
+        model_name: sentence-transformers model; for "onnx" the model the
+            directory was exported from, which is recorded in index manifests
+        batch_size: texts encoded per forward pass
+        onnx_model_dir: directory with model.onnx and tokenizer.json
+        onnx_int8: run a dynamically int8-quantized copy of the ONNX model
+    """
+    if backend == "sentence-transformers":
+        from langchain_huggingface import HuggingFaceEmbeddings
+        return HuggingFaceEmbeddings(model_name=model_name, encode_kwargs={"batch_size": batch_size})
+    if backend == "onnx":
+        if not onnx_model_dir:
+            raise ValueError("The onnx embedding backend needs a model directory")
+        return OnnxEmbeddings(onnx_model_dir, model_name=model_name, int8=onnx_int8, batch_size=batch_size)
+    if backend == "hashing":
+        from .fakes import HashingEmbeddings
+        return HashingEmbeddings()
+    raise ValueError(f"Unknown embedding backend {backend!r}, expected one of {EMBEDDING_BACKENDS}")
+
+
+class OnnxEmbeddings(Embeddings):
+    """Sentence embeddings computed with ONNX Runtime on CPU
+
+    ``model_dir`` holds a sentence-transformers model exported to ONNX
+    (``model.onnx`` and ``tokenizer.json``, e.g. ``optimum-cli export onnx
+    --model <model> <dir>``). Token embeddings are mean-pooled over the
+    attention mask, as the sentence-transformers pooling layer does, so the
+    float model reproduces the PyTorch vectors. With ``int8=True`` the
+    weights are dynamically quantized once and the copy is reused; its
+    vectors differ slightly, so it gets its own ``model_name`` and indexes
+    must be rebuilt with it.
+    """
+
+    def __init__(self, model_dir: str, model_name: Optional[str] = None, int8: bool = False,
+                 batch_size: int = 32, max_length: int = 128, threads: Optional[int] = None):
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        model_path = os.path.join(model_dir, "model.onnx")
+        if int8:
+            model_path = quantize_onnx_model(model_path)
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self._input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length)
+        pad_token = next((token for token in ("<pad>", "[PAD]") if self.tokenizer.token_to_id(token) is not None),
+                         "[PAD]")
+        # Pads each batch to its longest text only
+        self.tokenizer.enable_padding(pad_id=self.tokenizer.token_to_id(pad_token) or 0, pad_token=pad_token)
+
+        self.batch_size = batch_size
+        self.model_name = (model_name or os.path.basename(os.path.normpath(model_dir))) + (":onnx-int8" if int8 else "")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        # Batching texts of similar length keeps padding small
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            for i, vector in zip(batch, self._encode([texts[i] for i in batch])):
+                vectors[i] = vector.tolist()
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([text])[0].tolist()
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        weights = attention_mask[..., None].astype(np.float32)
+        pooled = (token_embeddings * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+        return pooled.astype(np.float32)
+
+
+def quantize_onnx_model(model_path: str) -> str:
+    """Path of an int8 (dynamic, weights only) copy of an ONNX model, created on first use"""
+    output_path = model_path[:-len(".onnx")] + "_int8.onnx"
+    if not os.path.exists(output_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        logger.info("Quantizing %s to int8", model_path)
+        temp_path = f"{output_path}.{os.getpid()}.tmp"
+        quantize_dynamic(model_path, temp_path, weight_type=QuantType.QInt8)
+        os.replace(temp_path, output_path)
+    return output_path
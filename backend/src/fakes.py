@@ -0,0 +1,156 @@
+"""Offline stand-ins for the LLM, embedding model and re-ranker (benchmarks, local runs)"""
+
+import asyncio
+import json
+import random
+import re
+import time
+import zlib
+from typing import AsyncIterator, List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from .reranker import Reranker
+
+
+class FakeLLM:
+    """Chat model stub that answers after a fixed delay
+
+    Mirrors the parts of the LangChain chat model interface RAGDemo uses
+    (invoke / ainvoke / astream), so it can be passed as ``RAGDemo(llm=...)``.
+    ``astream`` yields the answer word by word, ``token_delay`` seconds apart;
+    ``streams_cancelled`` counts streams closed before the last token.
+    """
+
+    def __init__(self, delay: float = 0.5, answer: str = "This is a stub answer citing Article 1.",
+                 token_delay: float = 0.0):
+        self.delay = delay
+        self.answer = answer
+        self.token_delay = token_delay
+        self.streams_cancelled = 0
+
+    def invoke(self, messages, **kwargs) -> AIMessage:
+        time.sleep(self.delay)
+        return AIMessage(content=self.answer)
+
+    async def ainvoke(self, messages, **kwargs) -> AIMessage:
+        await asyncio.sleep(self.delay)
+        return AIMessage(content=self.answer)
+
+    async def astream(self, messages, **kwargs) -> AsyncIterator[AIMessageChunk]:
+        tokens = re.findall(r"\S+\s*", self.answer)
+        finished = False
+        try:
+            await asyncio.sleep(self.delay)
+            for token in tokens:
+                await asyncio.sleep(self.token_delay)
+                yield AIMessageChunk(content=token)
+            finished = True
+        finally:
+            if not finished:
+                self.streams_cancelled += 1
+
+
+def create_fake_llm_server(delay: float = 0.5, token_delay: float = 0.0, error_rate: float = 0.0,
+                           answer: str = "This is a stub answer citing Article 1."):
+    """
+    OpenAI-compatible chat server stub for load-testing the LLM client offline
+
+    Serves ``POST /v1/chat/completions`` (plain and streamed) after ``delay``
+    seconds; a fraction ``error_rate`` of requests fails with 503.
+    ``POST /fake/config`` changes the settings of the running server, and
+    ``{"outage_seconds": n}`` makes every request fail for n seconds.
+    ``GET /fake/stats`` counts requests and the peak number in flight.
+
+    Run with ``uvicorn src.fakes:create_fake_llm_server --factory --port 8001``
+    and point the API at it with ``LLM_BASE_URL=http://127.0.0.1:8001``.
+    """
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse, StreamingResponse
+
+    app = FastAPI(title="Fake LLM")
+    settings = {"delay": delay, "token_delay": token_delay, "error_rate": error_rate, "answer": answer,
+                "outage_until": 0.0}
+    stats = {"requests": 0, "errors": 0, "in_flight": 0, "peak_in_flight": 0}
+
+    def failing() -> bool:
+        return time.monotonic() < settings["outage_until"] or random.random() < settings["error_rate"]
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        stats["in_flight"] += 1
+        stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+        try:
+            await asyncio.sleep(settings["delay"])
+            if failing():
+                stats["errors"] += 1
+                return JSONResponse(status_code=503, content={"error": "fake upstream unavailable"})
+        finally:
+            stats["in_flight"] -= 1
+
+        if not body.get("stream"):
+            return {"choices": [{"message": {"role": "assistant", "content": settings["answer"]}}]}
+
+        async def events():
+            for token in re.findall(r"\S+\s*", settings["answer"]):
+                await asyncio.sleep(settings["token_delay"])
+                yield f"data: {json.dumps({'choices': [{'delta': {'content': token}}]})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/fake/config")
+    async def configure(request: Request):
+        changes = await request.json()
+        if "outage_seconds" in changes:
+            settings["outage_until"] = time.monotonic() + float(changes.pop("outage_seconds"))
+        settings.update({key: value for key, value in changes.items() if key in settings})
+        return settings
+
+    @app.get("/fake/stats")
+    def fake_stats():
+        return stats
+
+    return app
+
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic bag-of-words embedder, no model download required"""
+
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+        self.model_name = f"hashing-{dimension}"
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for token in text.lower().split():
+            vector[zlib.crc32(token.encode("utf-8")) % self.dimension] += 1.0
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+
+
+class FakeReranker(Reranker):
+    """Cross-encoder stub: fraction of query words found in the chunk, after a fixed delay per pair"""
+
+    def __init__(self, pair_delay: float = 0.0, batch_size: int = 32):
+        super().__init__(batch_size)
+        self.pair_delay = pair_delay
+        self.calls = 0
+
+    def _predict(self, query: str, texts: List[str]) -> List[float]:
+        self.calls += 1
+        time.sleep(self.pair_delay * len(texts))
+        terms = set(re.findall(r"\w{3,}", query.lower()))
+        return [len(terms & set(re.findall(r"\w{3,}", text.lower()))) / max(len(terms), 1) for text in texts]
@@ -0,0 +1,150 @@
+"""Build vector indexes from PDF documents"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+from . import metrics
+from .parser import PDFParser
+from .chunker import LegalChunker
+from .vector_index import MANIFEST_FILE, VectorIndex, chunk_hash
+
+logger = logging.getLogger(__name__)
+
+
+def build_vector_index(pdf_path: str, embeddings, parser: Optional[PDFParser] = None,
+                       chunker: Optional[LegalChunker] = None, batch_size: int = 32,
+                       progress: Optional[Callable] = None, previous: Optional[VectorIndex] = None,
+                       index_type: str = "auto", quantization: str = "none") -> VectorIndex:
+    """
+    Parse, chunk and embed a PDF document into a new vector index
+
+    When ``previous`` is an earlier index of the same document built with
+    the same embedding model, chunks whose text is unchanged (same SHA-256)
+    reuse its vectors and only new or edited chunks are embedded.
+
+    Args:
+        pdf_path: path to the PDF document
+        embeddings: LangChain embeddings used for the chunks
+        parser: PDF parser (a new PDFParser if omitted)
+        chunker: chunker (a new LegalChunker if omitted)
+        batch_size: chunks embedded per call
+        progress: optional callback ``progress(stage, done=None, total=None)``
+        previous: index whose embeddings may be reused
+        index_type: "flat", "ivf", "hnsw" or "auto" (see src/ann.py)
+        quantization: "none", "int8" or "pq" codes in the FAISS index
+
+    Returns:
+        VectorIndex whose manifest records the embedding model and chunker version
+    """
+    parser = parser or PDFParser()
+    chunker = chunker or LegalChunker()
+    progress = progress or (lambda stage, done=None, total=None: None)
+
+    logger.info("Building index for %s", pdf_path)
+    progress("parsing")
+    start = time.perf_counter()
+    with metrics.stage("parse"):
+        text, page_starts = parser.parse_pages(pdf_path)
+    elapsed = time.perf_counter() - start
+    logger.info("Extracted %d characters from %d pages (%.0f pages/sec)",
+                len(text), len(page_starts), len(page_starts) / max(elapsed, 1e-9))
+
+    progress("chunking")
+    with metrics.stage("chunk"):
+        raw_chunks = chunker.chunk_gdpr(text, page_starts)
+    logger.info("Created %d chunks (max %s chars)", len(raw_chunks), chunker.max_chunk_size)
+    docs = to_langchain_docs(raw_chunks)
+
+    model_name = getattr(embeddings, "model_name", type(embeddings).__name__)
+    texts = [doc.page_content for doc in docs]
+    vectors = reusable_vectors(texts, previous if previous is not None
+                               and previous.manifest.get("model_name") == model_name else None)
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+    logger.info("Reusing %d unchanged chunks, embedding %d", len(texts) - len(missing), len(missing))
+    progress("embedding", 0, len(missing))
+    for start in range(0, len(missing), batch_size):
+        batch = missing[start:start + batch_size]
+        with metrics.stage("embed"):
+            embedded = embeddings.embed_documents([texts[i] for i in batch])
+        for i, vector in zip(batch, embedded):
+            vectors[i] = vector
+        progress("embedding", min(start + batch_size, len(missing)), len(missing))
+
+    progress("indexing", len(texts), len(texts))
+    with metrics.stage("index_build"):
+        index = VectorIndex.from_embeddings(
+            texts,
+            vectors,
+            [doc.metadata for doc in docs],
+            manifest={
+                "model_name": model_name,
+                "chunker_version": chunker.version,
+                "embedded_chunks": len(missing),
+                "reused_chunks": len(texts) - len(missing),
+            },
+            index_type=index_type,
+            quantization=quantization,
+        )
+    logger.info("Built %s index (%s) over %d chunks", index.index_type, index.quantization, index.ntotal)
+    return index
+
+
+def reusable_vectors(texts: List[str], previous: Optional[VectorIndex]) -> list:
+    """Vector of the previous index for every text it already contains, None for the rest"""
+    if previous is None or previous.ntotal == 0:
+        return [None] * len(texts)
+    rows = {digest: row for row, digest in enumerate(previous.chunk_hashes())}
+    return [
+        np.array(previous.vectors[rows[digest]], dtype=np.float32) if digest in rows else None
+        for digest in (chunk_hash(text) for text in texts)
+    ]
+
+
+def to_langchain_docs(chunks: List[dict]) -> List[Document]:
+    docs = []
+    for chunk in chunks:
+        metadata = {
+            "chapter": chunk["chapter"],
+            "article": chunk["article"],
+            "source": chunk["metadata"],
+        }
+        for key in ("page_start", "page_end", "part", "parts"):
+            if key in chunk:
+                metadata[key] = chunk[key]
+        docs.append(Document(page_content=chunk["text"], metadata=metadata))
+    return docs
+
+
+# ── Manifest ─────────────────────────────────────────────────
+def describe_build(source_path: str, timings: Dict[str, float]) -> dict:
+    """Manifest fields describing where an index came from and how long it took"""
+    return {
+        "source": os.path.basename(source_path),
+        "source_sha256": file_sha256(source_path),
+        "timings": {stage: round(seconds, 3) for stage, seconds in timings.items()},
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def read_manifest(index_path: str) -> Optional[dict]:
+    """Manifest of a saved index, or None for indexes built without one"""
+    manifest_path = os.path.join(index_path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
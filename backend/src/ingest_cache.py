@@ -0,0 +1,127 @@
+"""Content-addressed cache of built document indexes"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import Optional
+
+from .vector_index import VectorIndex
+
+
+class IngestionCache:
+    """Maps uploaded file contents to a previously built VectorIndex
+
+    The key covers the file bytes, the embedding model and the chunker
+    version, so a change to either invalidates old entries. Entries are
+    evicted least recently used first once the cache exceeds ``max_bytes``.
+    """
+
+    META_FILE = "cache_meta.json"
+
+    def __init__(self, cache_dir: str, model_name: str, chunker_version: str, max_bytes: int = 1024 * 1024 * 1024):
+        """
+        Args:
+            cache_dir: directory holding one sub-directory per cached index
+            model_name: embedding model name, part of the cache key
+            chunker_version: chunker version, part of the cache key
+            max_bytes: disk budget for all cached indexes
+        """
+        self.cache_dir = cache_dir
+        self.model_name = model_name
+        self.chunker_version = chunker_version
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.seconds_saved = 0.0
+        self._lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key_for_file(self, path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        digest.update(f"\0{self.model_name}\0{self.chunker_version}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[VectorIndex]:
+        """Load the cached index for ``key``, or None on a miss"""
+        entry_dir = os.path.join(self.cache_dir, key)
+        try:
+            with open(os.path.join(entry_dir, self.META_FILE)) as f:
+                meta = json.load(f)
+            index = VectorIndex.load(entry_dir)
+        except (OSError, ValueError, RuntimeError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        os.utime(entry_dir)  # mark as recently used
+        with self._lock:
+            self.hits += 1
+            self.seconds_saved += meta["build_seconds"]
+        return index
+
+    def put(self, key: str, index: VectorIndex, build_seconds: float):
+        """Store a freshly built index and evict old entries over the budget"""
+        entry_dir = os.path.join(self.cache_dir, key)
+        tmp_dir = os.path.join(self.cache_dir, f".tmp-{uuid.uuid4().hex}")
+        index.save(tmp_dir)
+        size = sum(entry.stat().st_size for entry in os.scandir(tmp_dir))
+        with open(os.path.join(tmp_dir, self.META_FILE), "w") as f:
+            json.dump({
+                "model_name": self.model_name,
+                "chunker_version": self.chunker_version,
+                "build_seconds": build_seconds,
+                "bytes": size,
+                "created_at": time.time(),
+            }, f)
+
+        with self._lock:
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(tmp_dir, entry_dir)
+            self._evict()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._entries()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0,
+                "evictions": self.evictions,
+                "embedding_seconds_saved": round(self.seconds_saved, 3),
+                "entries": len(entries),
+                "bytes": sum(size for _, _, size in entries),
+                "max_bytes": self.max_bytes,
+            }
+
+    # ── Private helpers ──────────────────────────────────────────
+    def _entries(self):
+        """(last_used, path, bytes) for every complete cache entry"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            meta_path = os.path.join(entry.path, self.META_FILE)
+            if entry.name.startswith(".") or not os.path.exists(meta_path):
+                continue
+            with open(meta_path) as f:
+                size = json.load(f)["bytes"]
+            entries.append((entry.stat().st_mtime, entry.path, size))
+        return entries
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, _, size in entries)
+        # The newest entry is kept even if it alone exceeds the budget
+        while len(entries) > 1 and total > self.max_bytes:
+            _, path, size = entries.pop(0)
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            self.evictions += 1
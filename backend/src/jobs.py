@@ -0,0 +1,124 @@
+"""Background ingestion jobs with progress tracking"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+
+class IngestionJob:
+    """Status of one document ingestion
+
+    Stages follow the RAGDemo.setup() pipeline: queued → parsing → chunking →
+    embedding → indexing → done (or failed). ``timings`` holds the seconds
+    spent in every finished stage.
+    """
+
+    def __init__(self, filename: str, document_id: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.document_id = document_id
+        self.status = "queued"
+        self.stage = "queued"
+        self.chunks_done = 0
+        self.chunks_total = 0
+        self.timings: Dict[str, float] = {}
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._stage_started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def update(self, stage: str, done: Optional[int] = None, total: Optional[int] = None):
+        """Progress callback for RAGDemo.setup()"""
+        with self._lock:
+            if stage != self.stage:
+                self._finish_stage()
+                self.stage = stage
+            if done is not None:
+                self.chunks_done = done
+            if total is not None:
+                self.chunks_total = total
+
+    def start(self):
+        with self._lock:
+            self.status = "running"
+            self._finish_stage()
+
+    def complete(self):
+        with self._lock:
+            self._finish_stage()
+            self.status = "completed"
+            self.stage = "done"
+            self.finished_at = time.time()
+
+    def fail(self, error: str):
+        with self._lock:
+            self._finish_stage()
+            self.status = "failed"
+            self.error = error
+            self.finished_at = time.time()
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            timings = dict(self.timings)
+            if self.finished_at is None:
+                timings[self.stage] = time.perf_counter() - self._stage_started
+            return {
+                "job_id": self.id,
+                "document": self.filename,
+                "document_id": self.document_id,
+                "status": self.status,
+                "stage": self.stage,
+                "chunks_done": self.chunks_done,
+                "chunks_total": self.chunks_total,
+                "timings": {stage: round(seconds, 3) for stage, seconds in timings.items()},
+                "error": self.error,
+                "created_at": self.created_at,
+                "finished_at": self.finished_at,
+            }
+
+    def _finish_stage(self):
+        now = time.perf_counter()
+        self.timings[self.stage] = self.timings.get(self.stage, 0.0) + now - self._stage_started
+        self._stage_started = now
+
+
+class JobManager:
+    """Runs ingestion jobs in a worker pool and keeps their status for polling"""
+
+    def __init__(self, max_workers: int = 1, max_finished_jobs: int = 100):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rag-ingestion")
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._max_finished_jobs = max_finished_jobs
+        self._lock = threading.Lock()
+
+    def submit(self, filename: str, task: Callable[[IngestionJob], None],
+               document_id: Optional[str] = None) -> IngestionJob:
+        """Queue ``task(job)``; the task reports progress through ``job.update``"""
+        job = IngestionJob(filename, document_id)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, task)
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    @staticmethod
+    def _run(job: IngestionJob, task: Callable[[IngestionJob], None]):
+        job.start()
+        try:
+            task(job)
+            job.complete()
+        except Exception as e:
+            job.fail(str(e))
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished_at is not None]
+        for job_id in finished[:max(0, len(finished) - self._max_finished_jobs)]:
+            del self._jobs[job_id]
@@ -0,0 +1,122 @@
+"""BM25 inverted index over chunk texts, stored as flat NumPy posting arrays"""
+
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import Iterable, List, Sequence
+
+import numpy as np
+
+TERMS_FILE = "bm25_terms.json"
+POINTERS_FILE = "bm25_pointers.npy"
+POSTINGS_FILE = "bm25_postings.npy"
+WEIGHTS_FILE = "bm25_weights.npy"
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were which with "
+    "what does do shall".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(text.casefold()) if token not in _STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed set of chunks
+
+    Postings are kept in CSR layout: the chunk ids and precomputed BM25
+    weights of term ``t`` are ``postings[pointers[t]:pointers[t + 1]]`` and
+    ``weights[...]``. Scoring a query is one ``np.bincount`` over the
+    concatenated postings of its terms, and the arrays are memory-mapped
+    when loaded from disk.
+    """
+
+    def __init__(self, terms: List[str], pointers: np.ndarray, postings: np.ndarray, weights: np.ndarray,
+                 num_chunks: int):
+        self.terms = terms
+        self.vocabulary = {term: i for i, term in enumerate(terms)}
+        self.pointers = pointers
+        self.postings = postings
+        self.weights = weights
+        self.num_chunks = num_chunks
+
+    @classmethod
+    def from_texts(cls, texts: Iterable[str], k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        """Tokenize the chunks and precompute the BM25 weight of every (term, chunk) pair"""
+        counts = [Counter(tokenize(text)) for text in texts]
+        lengths = np.array([sum(c.values()) for c in counts], dtype=np.float32)
+        avg_length = float(lengths.mean()) if len(lengths) and lengths.mean() > 0 else 1.0
+
+        postings_by_term = {}
+        for chunk_id, chunk_counts in enumerate(counts):
+            for term, tf in chunk_counts.items():
+                postings_by_term.setdefault(term, []).append((chunk_id, tf))
+
+        terms = sorted(postings_by_term)
+        pointers = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum([len(postings_by_term[t]) for t in terms], out=pointers[1:])
+        postings = np.empty(pointers[-1], dtype=np.int32)
+        frequencies = np.empty(pointers[-1], dtype=np.float32)
+        idf = np.empty(pointers[-1], dtype=np.float32)
+        for i, term in enumerate(terms):
+            entries = postings_by_term[term]
+            start, end = pointers[i], pointers[i + 1]
+            postings[start:end] = [chunk_id for chunk_id, _ in entries]
+            frequencies[start:end] = [tf for _, tf in entries]
+            idf[start:end] = math.log(1 + (len(counts) - len(entries) + 0.5) / (len(entries) + 0.5))
+
+        norm = k1 * (1 - b + b * lengths[postings] / avg_length)
+        weights = idf * frequencies * (k1 + 1) / (frequencies + norm)
+        return cls(terms, pointers, postings, weights.astype(np.float32), len(counts))
+
+    # ── Persistence ──────────────────────────────────────────────
+    def save(self, path: str):
+        with open(os.path.join(path, TERMS_FILE), "w") as f:
+            json.dump({"num_chunks": self.num_chunks, "terms": self.terms}, f)
+        np.save(os.path.join(path, POINTERS_FILE), self.pointers)
+        np.save(os.path.join(path, POSTINGS_FILE), self.postings)
+        np.save(os.path.join(path, WEIGHTS_FILE), self.weights)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        with open(os.path.join(path, TERMS_FILE)) as f:
+            data = json.load(f)
+        return cls(
+            data["terms"],
+            np.load(os.path.join(path, POINTERS_FILE), mmap_mode="r"),
+            np.load(os.path.join(path, POSTINGS_FILE), mmap_mode="r"),
+            np.load(os.path.join(path, WEIGHTS_FILE), mmap_mode="r"),
+            data["num_chunks"],
+        )
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        return os.path.exists(os.path.join(path, TERMS_FILE))
+
+    # ── Search ───────────────────────────────────────────────────
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every chunk for the query"""
+        term_ids = {self.vocabulary[t] for t in tokenize(query) if t in self.vocabulary}
+        if not term_ids:
+            return np.zeros(self.num_chunks, dtype=np.float32)
+        slices = [slice(self.pointers[t], self.pointers[t + 1]) for t in term_ids]
+        postings = np.concatenate([self.postings[s] for s in slices])
+        weights = np.concatenate([self.weights[s] for s in slices])
+        return np.bincount(postings, weights=weights, minlength=self.num_chunks)
+
+    def search(self, query: str, k: int, exclude: Sequence[int] = ()) -> List[tuple]:
+        """(chunk id, score) pairs of the k best chunks with a non-zero score"""
+        scores = self.scores(query)
+        if len(exclude):
+            scores[list(exclude)] = 0.0
+        k = min(k, int(np.count_nonzero(scores)))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top]
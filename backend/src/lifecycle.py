@@ -0,0 +1,94 @@
+"""Background warmup of the API's models and indexes (standard library only, cheap to import)"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    """Runs startup steps in a background thread and reports their progress
+
+    Steps run in order; the stage is the name of the running step, then
+    "ready" (or "failed" with the error if a step raised). ``timings`` holds
+    the seconds spent in every step, like IngestionJob.timings, and
+    ``seconds_to_ready`` is measured from process start when ``started_at``
+    is given.
+    """
+
+    def __init__(self, steps: List[Tuple[str, Callable[[], None]]], started_at: Optional[float] = None):
+        self.steps = steps
+        self.status = "pending"
+        self.stage = "pending"
+        self.timings: Dict[str, float] = {}
+        self.error: Optional[str] = None
+        self.seconds_to_ready: Optional[float] = None
+        self._started_at = started_at
+        self._stage_started = time.perf_counter()
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the steps in a daemon thread (once)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            if self._started_at is None:
+                self._started_at = time.perf_counter()
+            self.status = "running"
+            self._thread = threading.Thread(target=self._run, name="rag-warmup", daemon=True)
+        self._thread.start()
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the warmup has finished; False if it failed or timed out"""
+        self._done.wait(timeout)
+        return self.ready
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            timings = dict(self.timings)
+            if self.status == "running":
+                timings[self.stage] = time.perf_counter() - self._stage_started
+            return {
+                "status": self.status,
+                "stage": self.stage,
+                "steps": [name for name, _ in self.steps],
+                "timings": {stage: round(seconds, 3) for stage, seconds in timings.items()},
+                "seconds_to_ready": None if self.seconds_to_ready is None else round(self.seconds_to_ready, 3),
+                "error": self.error,
+            }
+
+    def _run(self):
+        for name, step in self.steps:
+            with self._lock:
+                self.stage = name
+                self._stage_started = time.perf_counter()
+            try:
+                step()
+            except Exception as e:
+                logger.exception("Warmup failed during %s", name)
+                with self._lock:
+                    self._finish_stage()
+                    self.status = "failed"
+                    self.error = str(e)
+                self._done.set()
+                return
+            with self._lock:
+                self._finish_stage()
+
+        with self._lock:
+            self.status = "ready"
+            self.stage = "ready"
+            self.seconds_to_ready = time.perf_counter() - self._started_at
+        self._done.set()
+        logger.info("Ready after %.1fs", self.seconds_to_ready)
+
+    def _finish_stage(self):
+        self.timings[self.stage] = time.perf_counter() - self._stage_started
@@ -0,0 +1,443 @@
+"""LLM client layer: chat model construction, timeouts, retries, concurrency limit and circuit breaker"""
+
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Deque, Optional, Tuple, Union
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from . import metrics
+
+# HTTP statuses worth retrying: timeouts, rate limits and server errors
+TRANSIENT_STATUS = {408, 429, 500, 502, 503, 504}
+# Exception classes of the HTTP / Google client libraries that mean "try again"
+_TRANSIENT_ERRORS = {"TransportError", "TimeoutException", "ServiceUnavailable", "ResourceExhausted",
+                     "DeadlineExceeded", "InternalServerError", "TooManyRequests"}
+
+
+class LLMError(Exception):
+    """Generation failed; ``kind`` is the error code returned to clients"""
+
+    kind = "llm_error"
+
+
+class LLMTimeoutError(LLMError):
+    kind = "llm_timeout"
+
+
+class LLMUnavailableError(LLMError):
+    """Upstream kept failing with transient errors"""
+
+    kind = "llm_unavailable"
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """Not called: the circuit breaker is open"""
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether a failed call may succeed if repeated"""
+    if isinstance(error, (LLMTimeoutError, asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if status is None and getattr(error, "response", None) is not None:
+        status = getattr(error.response, "status_code", None)
+    if isinstance(status, int) and status in TRANSIENT_STATUS:
+        return True
+    return any(cls.__name__ in _TRANSIENT_ERRORS for cls in type(error).__mro__)
+
+
+@dataclass(frozen=True)
+class LLMClientOptions:
+    """Settings of ResilientLLM
+
+    Attributes:
+        timeout: seconds per call (per token for streams) before it is abandoned
+        max_retries: extra attempts after a transient failure
+        backoff_base: first retry waits up to this many seconds, doubling per attempt
+        backoff_max: cap of the retry wait
+        max_concurrency: calls in flight at once across the process
+        breaker_failures: consecutive transient failures that open the circuit
+        breaker_reset: seconds the circuit stays open before one trial call
+    """
+
+    timeout: float = 30.0
+    max_retries: int = 2
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    max_concurrency: int = 16
+    breaker_failures: int = 5
+    breaker_reset: float = 30.0
+
+
+class CircuitBreaker:
+    """Fails fast after ``failure_threshold`` consecutive failures
+
+    The open circuit rejects calls for ``reset_timeout`` seconds, then lets a
+    single trial call through (half-open): success closes the circuit,
+    failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now"""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            # A trial abandoned by its caller (cancelled) does not block the next one for long
+            if state == "half-open" and (self._trial_started is None
+                                         or self.clock() - self._trial_started >= self.reset_timeout):
+                self._trial_started = self.clock()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_started is not None or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+            self._trial_started = None
+
+    def _state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "open" if self.clock() - self.opened_at < self.reset_timeout else "half-open"
+
+
+class ConcurrencyLimiter:
+    """At most ``limit`` holders at once, shared by threads and coroutines of any event loop
+
+    ``with limiter:`` blocks the thread, ``async with limiter:`` only the
+    coroutine. Waiters are served first come, first served: a released slot
+    goes straight to the oldest waiter, a thread through its Event or a
+    coroutine through a future resolved in its own loop. A coroutine
+    cancelled while waiting gives up its place (or the slot, if it was
+    handed over meanwhile).
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self._waiters: Deque[Union[threading.Event, Tuple[asyncio.AbstractEventLoop, asyncio.Future]]] = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self._take():
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        event.wait()
+
+    async def acquire_async(self):
+        with self._lock:
+            if self._take():
+                return
+            loop = asyncio.get_running_loop()
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if isinstance(waiter, threading.Event):
+                    waiter.set()
+                    return
+                loop, future = waiter
+                try:
+                    loop.call_soon_threadsafe(_resolve, future)
+                    return
+                except RuntimeError:
+                    continue  # its event loop is closed
+            self.in_flight -= 1
+
+    def _take(self) -> bool:
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return True
+        return False
+
+    def __enter__(self):
+        self.acquire()
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    async def __aenter__(self):
+        await self.acquire_async()
+
+    async def __aexit__(self, *exc_info):
+        self.release()
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class ResilientLLM:
+    """Chat model wrapper with the interface RAGDemo uses (invoke / ainvoke / astream)
+
+    Every call takes one of ``max_concurrency`` slots (shared by synchronous
+    and asynchronous calls from any event loop), is abandoned after
+    ``timeout`` seconds, and transient failures (timeouts, connection
+    errors, 408 / 429 / 5xx) are retried with full-jitter exponential
+    backoff. Consecutive transient failures open the circuit breaker, after
+    which calls fail at once with CircuitOpenError instead of queueing
+    behind a dead upstream. Every failure is raised as an LLMError. Streams
+    are only retried before their first token.
+    """
+
+    def __init__(self, llm, options: Optional[LLMClientOptions] = None, breaker: Optional[CircuitBreaker] = None):
+        self.llm = llm
+        self.options = options or LLMClientOptions()
+        self.breaker = breaker or CircuitBreaker(self.options.breaker_failures, self.options.breaker_reset)
+        self.counters = {"calls": 0, "retries": 0, "timeouts": 0, "failures": 0, "rejected": 0}
+        self._slots = ConcurrencyLimiter(self.options.max_concurrency)
+        # Synchronous calls cannot be cancelled, so they run here and are waited for with a timeout
+        self._sync_pool = ThreadPoolExecutor(max_workers=self.options.max_concurrency, thread_name_prefix="llm-call")
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        # Expose attributes of the wrapped model, e.g. model
+        if name == "llm":
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+        return {**counters, "circuit": self.breaker.state}
+
+    # ── Calls ────────────────────────────────────────────────────
+    def invoke(self, messages, **kwargs) -> AIMessage:
+        self._count("calls")
+        for attempt in range(self.options.max_retries + 1):
+            try:
+                with self._slots:
+                    self._admit()
+                    future = self._sync_pool.submit(self.llm.invoke, messages, **kwargs)
+                    try:
+                        result = future.result(timeout=self.options.timeout)
+                    except FutureTimeoutError:
+                        future.cancel()
+                        raise LLMTimeoutError(f"LLM call timed out after {self.options.timeout}s")
+            except Exception as e:
+                error = self._record_failure(e, attempt)
+                if error is not None:
+                    raise error
+                time.sleep(self._backoff(attempt))
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def ainvoke(self, messages, **kwargs) -> AIMessage:
+        self._count("calls")
+        for attempt in range(self.options.max_retries + 1):
+            try:
+                async with self._slots:
+                    self._admit()
+                    result = await asyncio.wait_for(self.llm.ainvoke(messages, **kwargs), self.options.timeout)
+            except Exception as e:
+                error = self._record_failure(e, attempt)
+                if error is not None:
+                    raise error
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def astream(self, messages, **kwargs) -> AsyncIterator[AIMessageChunk]:
+        self._count("calls")
+        for attempt in range(self.options.max_retries + 1):
+            started = False
+            try:
+                async with self._slots:
+                    self._admit()
+                    stream = self.llm.astream(messages, **kwargs)
+                    try:
+                        while True:
+                            try:
+                                chunk = await asyncio.wait_for(stream.__anext__(), self.options.timeout)
+                            except StopAsyncIteration:
+                                break
+                            started = True
+                            yield chunk
+                    finally:
+                        await stream.aclose()
+            except Exception as e:
+                error = self._record_failure(e, attempt, retry=not started)
+                if error is not None:
+                    raise error
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+            self.breaker.record_success()
+            return
+
+    # ── Helpers ──────────────────────────────────────────────────
+    def _count(self, counter: str, n: int = 1):
+        with self._lock:
+            self.counters[counter] += n
+        metrics.LLM_EVENTS.inc(n, event=counter)
+
+    def _admit(self):
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise CircuitOpenError("LLM upstream is failing; not calling it until the circuit breaker resets")
+
+    def _record_failure(self, error: Exception, attempt: int, retry: bool = True) -> Optional[LLMError]:
+        """The LLMError to raise, or None if the call should be retried"""
+        if isinstance(error, CircuitOpenError):
+            return error
+        if isinstance(error, asyncio.TimeoutError) and not isinstance(error, LLMError):
+            error = LLMTimeoutError(f"LLM call timed out after {self.options.timeout}s")
+        transient = is_transient(error)
+        if isinstance(error, LLMTimeoutError):
+            self._count("timeouts")
+        # Other errors (e.g. a rejected prompt) neither open the circuit nor close it: only a success does
+        if transient:
+            self.breaker.record_failure()
+
+        if transient and retry and attempt < self.options.max_retries and self.breaker.state == "closed":
+            self._count("retries")
+            return None
+        self._count("failures")
+        if isinstance(error, LLMError):
+            return error
+        wrapped = (LLMUnavailableError if transient else LLMError)(f"{type(error).__name__}: {error}")
+        wrapped.__cause__ = error
+        return wrapped
+
+    def _backoff(self, attempt: int) -> float:
+        """Full jitter: uniform between 0 and the exponential cap, so retries of many callers spread out"""
+        return random.uniform(0, min(self.options.backoff_max, self.options.backoff_base * 2 ** attempt))
+
+
+# ── Chat models ──────────────────────────────────────────────
+def create_chat_model(api_key: str, base_url: Optional[str] = None, timeout: float = 30.0,
+                      max_connections: int = 16):
+    """
+    The chat model to generate answers with
+
+    Args:
+        api_key: Gemini API key (sent as a bearer token to ``base_url``)
+        base_url: OpenAI-compatible server to use instead of Gemini, e.g. a
+            local model or the fake server in src/fakes.py
+        timeout: HTTP timeout in seconds
+        max_connections: size of the HTTP connection pool of the OpenAI-compatible
+            client; ignored for Gemini, whose SDK manages its own pool (calls in
+            flight are still capped by ResilientLLM's ``max_concurrency``)
+    """
+    if base_url:
+        return HTTPChatModel(base_url, api_key=api_key, timeout=timeout, max_connections=max_connections)
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    # One instance serves the whole process, so its HTTP connections are reused;
+    # retries are left to ResilientLLM
+    return ChatGoogleGenerativeAI(
+        model="gemini-2.0-flash-lite",
+        google_api_key=api_key,
+        temperature=0.1,
+        top_p=0.9,
+        max_output_tokens=2048,
+        timeout=timeout,
+        max_retries=0,
+    )
+
+
+class HTTPChatModel:
+    """Minimal client of an OpenAI-compatible ``/v1/chat/completions`` endpoint
+
+    Keeps one pooled httpx client per mode (sync / async), so connections
+    are reused across calls.
+    """
+
+    def __init__(self, base_url: str, api_key: str = "", model: str = "default", timeout: float = 30.0,
+                 max_connections: int = 16, temperature: float = 0.1):
+        import httpx
+
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.temperature = temperature
+        self._headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self._timeout = httpx.Timeout(timeout)
+        self._client = httpx.Client(limits=self._limits, timeout=self._timeout, headers=self._headers)
+        self._async_client = None
+
+    def invoke(self, messages, **kwargs) -> AIMessage:
+        response = self._client.post(f"{self.base_url}/v1/chat/completions", json=self._payload(messages, False))
+        response.raise_for_status()
+        return AIMessage(content=response.json()["choices"][0]["message"]["content"])
+
+    async def ainvoke(self, messages, **kwargs) -> AIMessage:
+        response = await self._aclient().post(f"{self.base_url}/v1/chat/completions",
+                                              json=self._payload(messages, False))
+        response.raise_for_status()
+        return AIMessage(content=response.json()["choices"][0]["message"]["content"])
+
+    async def astream(self, messages, **kwargs) -> AsyncIterator[AIMessageChunk]:
+        async with self._aclient().stream("POST", f"{self.base_url}/v1/chat/completions",
+                                          json=self._payload(messages, True)) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data: ") or line == "data: [DONE]":
+                    continue
+                content = json.loads(line[len("data: "):])["choices"][0]["delta"].get("content")
+                if content:
+                    yield AIMessageChunk(content=content)
+
+    def _aclient(self):
+        if self._async_client is None:
+            import httpx
+            self._async_client = httpx.AsyncClient(limits=self._limits, timeout=self._timeout, headers=self._headers)
+        return self._async_client
+
+    def _payload(self, messages, stream: bool) -> dict:
+        return {
+            "model": self.model,
+            "messages": [{"role": _ROLES.get(message.type, "user"), "content": message.content} for message in messages],
+            "temperature": self.temperature,
+            "stream": stream,
+        }
+
+
+_ROLES = {"human": "user", "ai": "assistant", "system": "system"}
@@ -1,14 +1,67 @@
+import multiprocessing
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Tuple
+
 import pymupdf
 
+
 class PDFParser:
-    """Parser for extracting text from PDF documents"""
-    
-    @staticmethod
-    def parse(pdf_path: str) -> str:
+    """Parser for extracting text from PDF documents
+
+    Pages are extracted one at a time by ``iter_pages()``. With
+    ``workers > 1``, documents of at least two ``pages_per_task`` ranges are
+    split into page ranges extracted by a process pool; pages are still
+    yielded in document order.
+    """
+
+    def __init__(self, workers: int = 1, pages_per_task: int = 32):
+        self.workers = workers
+        self.pages_per_task = pages_per_task
+
+    def iter_pages(self, pdf_path: str) -> Iterator[Tuple[int, str]]:
+        """Yield (page number starting at 1, page text) in document order"""
+        with pymupdf.open(pdf_path) as doc:
+            page_count = doc.page_count
+            if self.workers <= 1 or page_count < 2 * self.pages_per_task:
+                for number, page in enumerate(doc, start=1):
+                    yield number, page.get_text()
+                return
+
+        ranges = [(start, min(start + self.pages_per_task, page_count))
+                  for start in range(0, page_count, self.pages_per_task)]
+        # spawn: forking a process that runs server threads is unsafe
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as pool:
+            texts = pool.map(_extract_range, [pdf_path] * len(ranges), *zip(*ranges))
+            for (start, _), pages in zip(ranges, texts):
+                for offset, text in enumerate(pages):
+                    yield start + offset + 1, text
+
+    def parse_pages(self, pdf_path: str) -> Tuple[str, List[int]]:
+        """
+        Extract the full text together with where each page starts in it
+
+        Returns:
+            (text, page_starts) where page_starts[i] is the offset of page i + 1
+        """
+        texts, page_starts, offset = [], [], 0
+        for _, text in self.iter_pages(pdf_path):
+            page_starts.append(offset)
+            texts.append(text)
+            offset += len(text)
+        return "".join(texts), page_starts
+
+    def parse(self, pdf_path: str) -> str:
         """Extract text from PDF file"""
-        doc = pymupdf.open(pdf_path)
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        doc.close()
-        return text
\ No newline at end of file
+        return "".join(text for _, text in self.iter_pages(pdf_path))
+
+
+def page_at(page_starts: List[int], offset: int) -> int:
+    """Page number (starting at 1) containing the given text offset"""
+    return max(bisect_right(page_starts, offset), 1)
+
+
+def _extract_range(pdf_path: str, start: int, end: int) -> List[str]:
+    with pymupdf.open(pdf_path) as doc:
+        return [doc[i].get_text() for i in range(start, end)]
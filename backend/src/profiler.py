@@ -0,0 +1,100 @@
+"""Sampling profiler that can be switched on and off in a running process"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+# Shorter intervals would keep the sampling thread walking stacks nearly all the time
+MIN_INTERVAL = 0.001
+
+
+class SamplingProfiler:
+    """Samples the stack of every thread each ``interval`` seconds while running
+
+    Stacks are counted in collapsed form (``outer;inner;leaf count`` per
+    line), which flamegraph.pl and speedscope read directly. Sampling runs in
+    a daemon thread and walks ``sys._current_frames()``, so it needs no
+    restart and costs one stack walk per interval while on, nothing while off.
+    """
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 64):
+        self.interval = self._check_interval(interval)
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: Optional[float] = None) -> bool:
+        """Start a new session (discarding the previous one's samples); False if already running"""
+        with self._lock:
+            if self.running:
+                return False
+            self.interval = self.interval if interval is None else self._check_interval(interval)
+            self.stacks = Counter()
+            self.samples = 0
+            self.started_at, self.stopped_at = time.time(), None
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self) -> dict:
+        """Stop sampling; the samples stay available until the next start()"""
+        with self._lock:
+            thread = self._thread
+            self._stop.set()
+        if thread is not None:
+            thread.join()
+            self.stopped_at = self.stopped_at or time.time()
+        return self.status()
+
+    def status(self) -> dict:
+        end = self.stopped_at or time.time()
+        return {
+            "running": self.running,
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "seconds": round(end - self.started_at, 3) if self.started_at else 0.0,
+        }
+
+    def collapsed(self, limit: Optional[int] = None) -> str:
+        """The ``limit`` most frequent stacks (all by default) in collapsed form"""
+        with self._lock:
+            stacks = self.stacks.most_common(limit)
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+    @staticmethod
+    def _check_interval(interval: float) -> float:
+        if not interval >= MIN_INTERVAL:
+            raise ValueError(f"Sampling interval must be at least {MIN_INTERVAL * 1000:g} ms, got {interval}s")
+        return interval
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, frame in frames.items():
+                    if thread_id != own:
+                        self.stacks[self._stack(frame)] += 1
+                self.samples += 1
+        self.stopped_at = time.time()
+
+    def _stack(self, frame) -> str:
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
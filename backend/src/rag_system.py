@@ -1,108 +1,565 @@
 """RAG system implementation for legal document Q&A"""
 
-from langchain_google_genai import ChatGoogleGenerativeAI
+import asyncio
+import contextvars
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from langchain_core.documents import Document
 from langchain_core.messages import HumanMessage
-from langchain_community.vectorstores import FAISS
-from langchain_huggingface import HuggingFaceEmbeddings
-from typing import List
+from typing import AsyncIterator, Callable, List, Optional
 
+from . import metrics
 from .parser import PDFParser
+from .ann import SearchParams
 from .chunker import LegalChunker
+from .context_packer import SOURCE_SEPARATOR, ContextPacker, estimate_tokens, format_source
+from .embeddings import CachedQueryEmbeddings, create_embeddings
+from .index_builder import build_vector_index, read_manifest, to_langchain_docs
+from .ingest_cache import IngestionCache
+from .llm_client import LLMClientOptions, LLMError, ResilientLLM, create_chat_model
+from .registry import DocumentRegistry
+from .reranker import Reranker
+from .retrieval import IndexRetriever, RetrievalOptions
+from .vector_index import VectorIndex
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+DEFAULT_DOCUMENT_ID = "default"
+# Bump whenever the prompt changes (_build_prompt(), context packing), so cached answers are regenerated
+PROMPT_VERSION = "2"
 
 
 class RAGDemo:
     """RAG system demo for legal documents"""
 
-    def __init__(self, gemini_api_key: str):
-        self.parser = PDFParser()
-        self.chunker = LegalChunker()
-        self.retriever = None
+    def __init__(self, gemini_api_key: str, llm=None, embeddings=None, max_workers: int = 4,
+                 embedding_batch_size: int = 32, storage_dir: Optional[str] = None,
+                 max_loaded_documents: int = 8, max_index_bytes: Optional[int] = None,
+                 ingest_cache_dir: Optional[str] = None, ingest_cache_max_bytes: int = 1024 * 1024 * 1024,
+                 answer_cache=None, query_cache_bytes: int = 16 * 1024 * 1024, parser_workers: int = 1,
+                 chunker: Optional[LegalChunker] = None, index_type: str = "auto",
+                 search_params: Optional[SearchParams] = None, quantization: str = "none",
+                 context_packer: Optional[ContextPacker] = None, reranker: Optional[Reranker] = None,
+                 llm_options: Optional[LLMClientOptions] = None, llm_base_url: Optional[str] = None):
+        """
+        Args:
+            gemini_api_key: API key for the Gemini model
+            llm: chat model to use instead of Gemini (e.g. a local fake)
+            embeddings: embeddings to use instead of the sentence-transformers model
+                (see embeddings.create_embeddings for the other backends)
+            max_workers: size of the thread pool for blocking retrieval work
+            embedding_batch_size: chunks embedded per call during setup
+            storage_dir: where document indexes are persisted (temp dir if omitted)
+            max_loaded_documents: document indexes kept in memory at once
+            max_index_bytes: memory budget for loaded document indexes
+            ingest_cache_dir: where built indexes are cached by file content
+                (caching is disabled if omitted)
+            ingest_cache_max_bytes: disk budget for the ingestion cache
+            answer_cache: optional AnswerCache for repeated questions
+            query_cache_bytes: memory cap for cached query embeddings
+            parser_workers: processes extracting PDF page ranges in parallel (1 = in-process)
+            chunker: chunker to use instead of a LegalChunker with default sizes
+            index_type: FAISS index built for new documents: "flat", "ivf", "hnsw"
+                or "auto" to choose from the number of chunks
+            search_params: nprobe / efSearch used when searching IVF / HNSW indexes
+            quantization: "none", "int8" or "pq" vector codes for new documents;
+                loaded indexes use the mode recorded in their manifest
+            context_packer: fits retrieved chunks into the prompt's token budget
+                (a ContextPacker with the default budget if omitted)
+            reranker: cross-encoder for requests with ``options.rerank``
+                (re-ranking is unavailable if omitted)
+            llm_options: timeout, retry, concurrency and circuit breaker settings
+                of the LLM client (defaults if omitted; an injected ``llm`` is
+                only wrapped when they are given)
+            llm_base_url: OpenAI-compatible server to use instead of Gemini
+        """
+        self.parser = PDFParser(workers=parser_workers)
+        self.chunker = chunker or LegalChunker()
+        self.context_packer = context_packer or ContextPacker()
+        self.reranker = reranker
+        self.index_type = index_type
+        self.quantization = quantization
+        self.search_params = search_params or SearchParams()
+        self.embedding_batch_size = embedding_batch_size
+        self._embedding_dimension: Optional[int] = None
+        # Retrieval (query embedding + FAISS search) is CPU-bound and
+        # synchronous, so the async path runs it here instead of on the event loop
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rag-retrieval")
 
-        try:
-            self.llm = ChatGoogleGenerativeAI(
-                model="gemini-2.0-flash-lite",
-                google_api_key=gemini_api_key,
-                temperature=0.1,
-                top_p=0.9,
-                max_output_tokens=2048,
-            )
-            print("✓ Gemini model initialized successfully")
-        except Exception as e:
-            print(f"⚠ Warning: Failed to initialize Gemini model: {str(e)}")
-            self.llm = None
+        if llm is not None:
+            self.llm = ResilientLLM(llm, llm_options) if llm_options is not None else llm
+        else:
+            options = llm_options or LLMClientOptions()
+            try:
+                model = create_chat_model(gemini_api_key, base_url=llm_base_url, timeout=options.timeout,
+                                          max_connections=options.max_concurrency)
+                self.llm = ResilientLLM(model, options)
+                logger.info("LLM client for %s initialized", llm_base_url or "Gemini")
+            except Exception as e:
+                logger.warning("Failed to initialize Gemini model: %s", e)
+                self.llm = None
+
+        self.embeddings = CachedQueryEmbeddings(
+            embeddings or create_embeddings("sentence-transformers", DEFAULT_EMBEDDING_MODEL,
+                                            batch_size=embedding_batch_size),
+            max_bytes=query_cache_bytes,
+        )
 
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+        self.registry = DocumentRegistry(
+            self.embeddings,
+            storage_dir or tempfile.mkdtemp(prefix="legal-rag-indexes-"),
+            max_loaded=max_loaded_documents,
+            max_bytes=max_index_bytes,
         )
 
+        self.answer_cache = answer_cache
+        self.ingest_cache = None
+        if ingest_cache_dir:
+            self.ingest_cache = IngestionCache(
+                ingest_cache_dir,
+                model_name=getattr(self.embeddings, "model_name", type(self.embeddings).__name__),
+                # The index type changes the cached artifact just like the chunker settings
+                chunker_version=f"{self.chunker.version}:{index_type}:{quantization}",
+                max_bytes=ingest_cache_max_bytes,
+            )
+
     # ── Setup ────────────────────────────────────────────────────
-    def setup(self, pdf_path: str):
-        """Parse, chunk and index the PDF document"""
-        print("=" * 60)
-        print("RAG SYSTEM SETUP")
-        print("=" * 60)
-
-        print("\n1. Parsing PDF document...")
-        text = self.parser.parse(pdf_path)
-        print(f"   Extracted {len(text)} characters")
-
-        print("\n2. Hierarchical chunking...")
-        raw_chunks = self.chunker.chunk_gdpr(text)
-        print(f"   Created {len(raw_chunks)} chunks")
-
-        print("\n3. Converting to LangChain documents...")
-        docs = self._to_langchain_docs(raw_chunks)
-
-        print("\n4. Creating vector index...")
-        vectorstore = FAISS.from_documents(docs, self.embeddings)
-        self.retriever = vectorstore.as_retriever(search_kwargs={"k": 3})
-
-        print("\n" + "=" * 60)
-        print("SYSTEM READY")
-        print("=" * 60 + "\n")
-
-    def save_index(self, path: str):
-        """Save FAISS index to disk"""
-        if self.retriever:
-            self.retriever.vectorstore.save_local(path)
-
-    def load_index(self, path: str):
-        """Load precomputed FAISS index from disk"""
-        vectorstore = FAISS.load_local(path, self.embeddings, allow_dangerous_deserialization=True)
-        self.retriever = vectorstore.as_retriever(search_kwargs={"k": 3})
-        print("✓ Loaded precomputed embeddings")
+    def setup(self, pdf_path: str, document_id: str = DEFAULT_DOCUMENT_ID,
+              progress: Optional[Callable] = None, name: Optional[str] = None) -> str:
+        """Parse, chunk and index the PDF document under ``document_id``
+
+        The new index replaces an existing one with the same ID only once it
+        is fully built, so questions keep being answered from the old index
+        in the meantime. When replacing, only chunks whose text changed are
+        re-embedded; the rest reuse the old index's vectors.
+
+        Args:
+            pdf_path: path to the PDF document
+            document_id: registry key for the document's index
+            progress: optional callback ``progress(stage, done=None, total=None)``
+                called as the pipeline moves through parsing, chunking,
+                embedding and indexing
+            name: display name of the document
+
+        Returns:
+            The document ID
+        """
+        index = None
+        cache_key = None
+        if self.ingest_cache:
+            cache_key = self.ingest_cache.key_for_file(pdf_path)
+            if progress:
+                progress("loading")
+            index = self.ingest_cache.get(cache_key)
+            metrics.CACHE_LOOKUPS.inc(cache="ingestion", result="miss" if index is None else "hit")
+            if index is not None:
+                logger.info("Loaded index for %s from ingestion cache", document_id)
+
+        if index is None:
+            start = time.perf_counter()
+            previous = self.registry.get(document_id) if document_id in self.registry else None
+            index = self.build_index(pdf_path, progress, previous=previous)
+            if cache_key:
+                self.ingest_cache.put(cache_key, index, time.perf_counter() - start)
+
+        self.registry.add(document_id, index, name=name or os.path.basename(pdf_path))
+        self._invalidate_answers(document_id)
+
+        logger.info("Document %s ready (%d chunks)", document_id, index.ntotal)
+        return document_id
+
+    def build_index(self, pdf_path: str, progress: Optional[Callable] = None,
+                    previous: Optional[VectorIndex] = None) -> VectorIndex:
+        """Parse, chunk and embed the PDF document into a new vector index, reusing ``previous`` embeddings"""
+        return build_vector_index(
+            pdf_path,
+            self.embeddings,
+            parser=self.parser,
+            chunker=self.chunker,
+            batch_size=self.embedding_batch_size,
+            progress=progress,
+            previous=previous,
+            index_type=self.index_type,
+            quantization=self.quantization,
+        )
+
+    def remove_document(self, document_id: str) -> bool:
+        """Delete a document's index and cached answers; False if it was not registered"""
+        if document_id not in self.registry:
+            return False
+        self.registry.remove(document_id)
+        self._invalidate_answers(document_id)
+        return True
+
+    def save_index(self, path: str, document_id: str = DEFAULT_DOCUMENT_ID):
+        """Save a document's vector index to disk"""
+        index = self.registry.get(document_id)
+        if index:
+            index.save(path)
+
+    def load_index(self, path: str, document_id: str = DEFAULT_DOCUMENT_ID):
+        """Load precomputed vector index from disk
+
+        If the index has a manifest (see build_index.py), it must have been
+        built with the same embedding model as the one used for queries.
+        """
+        manifest = read_manifest(path)
+        model_name = getattr(self.embeddings, "model_name", None)
+        if manifest and model_name and manifest["model_name"] != model_name:
+            raise ValueError(
+                f"Index at {path} was built with {manifest['model_name']}, "
+                f"but queries are embedded with {model_name}"
+            )
+        self.registry.add_path(document_id, path)
+        self._invalidate_answers(document_id)
+        index = self.registry.get(document_id)
+        logger.info("Loaded precomputed embeddings for %s (%s index, quantization: %s)",
+                    document_id, index.index_type, index.quantization)
+
+    def is_index_current(self, path: str) -> bool:
+        """Whether the index saved at ``path`` is what setup() would build now
+
+        Indexes converted from LangChain, built by an older chunker or with
+        another embedding model are not, and should be rebuilt rather than
+        loaded.
+        """
+        manifest = read_manifest(path)
+        return manifest is not None and self._is_current(manifest)
+
+    def load_or_build(self, pdf_path: str, document_id: str = DEFAULT_DOCUMENT_ID,
+                      index_path: Optional[str] = None) -> str:
+        """Register a current index for the document, building one only if needed
+
+        An index the registry already holds (persisted under its storage
+        directory by an earlier run) is kept if current; otherwise a current
+        prebuilt index at ``index_path`` is registered in place. Failing both,
+        the document is indexed again by setup() and the registry stores the
+        result: ``index_path`` is only ever read.
+
+        Returns:
+            "registered", "loaded" or "built"
+        """
+        if self.has_document(document_id) and self._is_current(self.registry.get(document_id).manifest):
+            return "registered"
+        if index_path and os.path.exists(index_path) and self.is_index_current(index_path):
+            self.load_index(index_path, document_id=document_id)
+            return "loaded"
+        self.setup(pdf_path=pdf_path, document_id=document_id)
+        return "built"
+
+    @property
+    def embedding_dimension(self) -> int:
+        """Length of the vectors the embedding model returns (probed once)"""
+        if self._embedding_dimension is None:
+            self._embedding_dimension = len(self.embeddings.embed_query("dimension"))
+        return self._embedding_dimension
+
+    def _is_current(self, manifest: dict) -> bool:
+        model_name = getattr(self.embeddings, "model_name", type(self.embeddings).__name__)
+        return (manifest.get("chunker_version") == self.chunker.version
+                and manifest.get("model_name") == model_name
+                and manifest.get("dimension") == self.embedding_dimension)
+
+    def warm_up(self, document_id: str = DEFAULT_DOCUMENT_ID):
+        """Run one retrieval so the first request does not pay for lazy initialisation
+
+        (embedding model kernels, index pages mapped from disk, BM25 postings,
+        the cross-encoder's weights)
+        """
+        if self.reranker is not None:
+            self.reranker.score("warm up", ["warm up"])
+        if self.has_document(document_id):
+            self._retrieve("warm up", document_id, RetrievalOptions())
+
+    def has_document(self, document_id: str = DEFAULT_DOCUMENT_ID) -> bool:
+        return document_id in self.registry
+
+    def get_retriever(self, document_id: str = DEFAULT_DOCUMENT_ID, options: Optional[RetrievalOptions] = None):
+        """Retriever over a document's index, or None if it is not registered"""
+        index = self.registry.get(document_id)
+        if index is None:
+            return None
+        return IndexRetriever(index, self.embeddings, options, self.search_params, self.reranker)
 
     # ── Answer method ─────────────────────────────────────
-    def answer(self, question: str) -> dict:
-        """Answer question using RAG pipeline"""
-        if self.retriever is None:
-            return {"answer": "Error: system not set up. Call setup() first.", "chunks": [], "error": "not_setup"}
+    def answer(self, question: str, document_id: str = DEFAULT_DOCUMENT_ID,
+               options: Optional[RetrievalOptions] = None) -> dict:
+        """Answer question about a document using RAG pipeline"""
+        options = options or RetrievalOptions()
+        sanitized = self._sanitize_input(question)
+        version = self._answer_version(document_id, options)
+        cached = self._get_cached_answer(sanitized, document_id, version)
+        if cached is not None:
+            return cached
+
+        docs = self._retrieve(sanitized, document_id, options)
+        if docs is None:
+            return self._not_setup_result()
 
+        context_docs, context = self._pack(docs)
+        answer, error = self._generate(sanitized, context_docs)
+        return self._cache_answer(sanitized, document_id, version, self._format_result(answer, docs, error, context))
+
+    async def aanswer(self, question: str, document_id: str = DEFAULT_DOCUMENT_ID,
+                      options: Optional[RetrievalOptions] = None) -> dict:
+        """Answer question without blocking the event loop"""
+        options = options or RetrievalOptions()
         sanitized = self._sanitize_input(question)
-        docs = self.retriever.invoke(sanitized)
-        answer, error = self._generate(sanitized, docs)
+        version = self._answer_version(document_id, options)
+        cached = self._get_cached_answer(sanitized, document_id, version)
+        if cached is not None:
+            return cached
 
-        return {
-            "answer": answer,
-            "chunks": [
-                {"metadata": doc.metadata.get("source"), "text": doc.page_content}
-                for doc in docs
-            ],
-            "error": error,
-        }
+        # Reloading an evicted index from disk blocks too, so it runs in the executor as well
+        docs = await self._run_in_executor(self._retrieve, sanitized, document_id, options)
+        if docs is None:
+            return self._not_setup_result()
+
+        context_docs, context = await self._run_in_executor(self._pack, docs)
+        answer, error = await self._agenerate(sanitized, context_docs)
+        return self._cache_answer(sanitized, document_id, version, self._format_result(answer, docs, error, context))
+
+    async def aanswer_batch(self, questions: List[str], document_id: str = DEFAULT_DOCUMENT_ID,
+                            options: Optional[RetrievalOptions] = None,
+                            concurrency: int = 8) -> AsyncIterator[dict]:
+        """Answer many questions about one document, yielding each result as soon as it is ready
+
+        Cached answers come first. The other questions are embedded and
+        searched together (IndexRetriever.invoke_batch), then answered with at
+        most ``concurrency`` LLM calls in flight. Every result is the
+        answer() dict plus ``index``, the question's position in ``questions``.
+        Closing the generator early cancels the generation still running.
+        """
+        options = options or RetrievalOptions()
+        sanitized = [self._sanitize_input(question) for question in questions]
+        version = self._answer_version(document_id, options)
+
+        pending = []
+        for i, question in enumerate(sanitized):
+            cached = self._get_cached_answer(question, document_id, version)
+            if cached is not None:
+                yield {"index": i, **cached}
+            else:
+                pending.append(i)
+        if not pending:
+            return
+
+        batch_docs = await self._run_in_executor(self._retrieve_batch, [sanitized[i] for i in pending],
+                                                 document_id, options)
+        if batch_docs is None:
+            for i in pending:
+                yield {"index": i, **self._not_setup_result()}
+            return
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def answer_one(i: int, docs: List[Document]) -> dict:
+            context_docs, context = await self._run_in_executor(self._pack, docs)
+            async with semaphore:
+                answer, error = await self._agenerate(sanitized[i], context_docs)
+            result = self._cache_answer(sanitized[i], document_id, version,
+                                        self._format_result(answer, docs, error, context))
+            return {"index": i, **result}
+
+        tasks = [asyncio.create_task(answer_one(i, docs)) for i, docs in zip(pending, batch_docs)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def astream_answer(self, question: str, document_id: str = DEFAULT_DOCUMENT_ID,
+                             options: Optional[RetrievalOptions] = None) -> AsyncIterator[dict]:
+        """Answer question as a stream of events
+
+        Yields ``{"event": ..., "data": ...}`` dicts: one ``chunks`` event with
+        the retrieved chunks, then a ``token`` event per piece of text the LLM
+        produces, and finally ``done`` (or ``error``). Closing the generator
+        early closes the upstream LLM stream, cancelling generation.
+        """
+        options = options or RetrievalOptions()
+        sanitized = self._sanitize_input(question)
+        version = self._answer_version(document_id, options)
+        cached = self._get_cached_answer(sanitized, document_id, version)
+        if cached is not None:
+            yield {"event": "chunks", "data": {"chunks": cached["chunks"]}}
+            yield {"event": "token", "data": {"text": cached["answer"]}}
+            yield {"event": "done", "data": {"error": None, "cached": True, "context": cached.get("context")}}
+            return
+
+        docs = await self._run_in_executor(self._retrieve, sanitized, document_id, options)
+        if docs is None:
+            metrics.ERRORS.inc(code="not_setup")
+            yield {"event": "error", "data": {"error": "not_setup"}}
+            return
+
+        yield {"event": "chunks", "data": {"chunks": self._format_chunks(docs)}}
+
+        if self.llm is None:
+            metrics.ERRORS.inc(code="model_not_initialized")
+            yield {"event": "error", "data": {"error": "model_not_initialized"}}
+            return
+
+        context_docs, context = await self._run_in_executor(self._pack, docs)
+        parts = []
+        prompt = self._prompt(sanitized, context_docs)
+        started = time.perf_counter()
+        stream = self.llm.astream([HumanMessage(content=prompt)])
+        try:
+            async for message in stream:
+                if message.content:
+                    parts.append(message.content)
+                    yield {"event": "token", "data": {"text": message.content}}
+        except Exception as e:
+            metrics.ERRORS.inc(code=self._error_code(e))
+            yield {"event": "error", "data": {"error": self._error_code(e), "message": str(e)}}
+            return
+        finally:
+            await stream.aclose()
+            # Time to the last token; not a context manager, so time spent by the consumer is included
+            metrics.STAGE_SECONDS.observe(time.perf_counter() - started, stage="llm")
+        metrics.TOKENS.inc(estimate_tokens("".join(parts)), kind="completion")
+
+        self._cache_answer(sanitized, document_id, version, self._format_result("".join(parts), docs, None, context))
+        yield {"event": "done", "data": {"error": None, "context": context}}
 
     # ── Private helpers ──────────────────────────────────────────
+    def _retrieve(self, question: str, document_id: str, options: RetrievalOptions) -> Optional[List[Document]]:
+        retriever = self.get_retriever(document_id, options)
+        if retriever is None:
+            return None
+        with metrics.stage("retrieval"):
+            return retriever.invoke(question)
+
+    def _retrieve_batch(self, questions: List[str], document_id: str,
+                        options: RetrievalOptions) -> Optional[List[List[Document]]]:
+        retriever = self.get_retriever(document_id, options)
+        if retriever is None:
+            return None
+        with metrics.stage("retrieval"):
+            return retriever.invoke_batch(questions)
+
+    def _run_in_executor(self, fn, *args):
+        """run_in_executor() on the retrieval pool, keeping context variables (the request's stage timings)"""
+        context = contextvars.copy_context()
+        return asyncio.get_running_loop().run_in_executor(self._executor, context.run, fn, *args)
+
+    def _pack(self, docs: List[Document]) -> tuple[List[Document], dict]:
+        with metrics.stage("context_packing"):
+            context_docs, context = self.context_packer.pack(docs)
+        metrics.TOKENS.inc(context["tokens_dropped"], kind="context_dropped")
+        return context_docs, context
+
+    def _prompt(self, question: str, docs: List[Document]) -> str:
+        with metrics.stage("prompt_build"):
+            prompt = self._build_prompt(question, docs)
+        metrics.TOKENS.inc(estimate_tokens(prompt), kind="prompt")
+        return prompt
+
     def _generate(self, question: str, docs: List[Document]) -> tuple[str, str | None]:
         if self.llm is None:
             return "Error: LLM not initialized.", "model_not_initialized"
 
-        context = "\n---\n".join(
-            f"SOURCE: {doc.metadata.get('source', 'N/A')}\nCONTENT: {doc.page_content}"
+        prompt = self._prompt(question, docs)
+        try:
+            with metrics.stage("llm"):
+                response = self.llm.invoke([HumanMessage(content=prompt)])
+            metrics.TOKENS.inc(estimate_tokens(response.content), kind="completion")
+            return response.content, None
+        except Exception as e:
+            return f"Error generating answer: {str(e)}", self._error_code(e)
+
+    async def _agenerate(self, question: str, docs: List[Document]) -> tuple[str, str | None]:
+        if self.llm is None:
+            return "Error: LLM not initialized.", "model_not_initialized"
+
+        prompt = self._prompt(question, docs)
+        try:
+            with metrics.stage("llm"):
+                response = await self.llm.ainvoke([HumanMessage(content=prompt)])
+            metrics.TOKENS.inc(estimate_tokens(response.content), kind="completion")
+            return response.content, None
+        except Exception as e:
+            return f"Error generating answer: {str(e)}", self._error_code(e)
+
+    def _answer_version(self, document_id: str, options: RetrievalOptions) -> Optional[str]:
+        """Everything besides the question that a cached answer depends on"""
+        index_version = self.registry.version(document_id)
+        if index_version is None:
+            return None
+        return f"{index_version}:{options.cache_key()}:{self.context_packer.cache_key()}"
+
+    def _get_cached_answer(self, question: str, document_id: str, version: Optional[str]) -> Optional[dict]:
+        if self.answer_cache is None or version is None:
+            return None
+        cached = self.answer_cache.get(question, document_id, version)
+        metrics.CACHE_LOOKUPS.inc(cache="answer", result="miss" if cached is None else "hit")
+        return {**cached, "cached": True} if cached is not None else None
+
+    def _cache_answer(self, question: str, document_id: str, version: Optional[str], result: dict) -> dict:
+        # Errors are not cached, so a transient LLM failure is retried next time
+        if result["error"] is not None:
+            metrics.ERRORS.inc(code=result["error"])
+        if self.answer_cache is not None and version is not None and result["error"] is None:
+            self.answer_cache.set(question, document_id, version, result)
+        return result
+
+    def _invalidate_answers(self, document_id: str):
+        if self.answer_cache is not None:
+            self.answer_cache.invalidate_document(document_id)
+
+    @staticmethod
+    def _error_code(error: Exception) -> str:
+        """llm_timeout, llm_unavailable (circuit open) or llm_error"""
+        return error.kind if isinstance(error, LLMError) else LLMError.kind
+
+    @staticmethod
+    def _not_setup_result() -> dict:
+        metrics.ERRORS.inc(code="not_setup")
+        return {"answer": "Error: system not set up. Call setup() first.", "chunks": [], "error": "not_setup"}
+
+    @staticmethod
+    def _format_result(answer: str, docs: List[Document], error: str | None, context: Optional[dict] = None) -> dict:
+        return {
+            "answer": answer,
+            "chunks": RAGDemo._format_chunks(docs),
+            "error": error,
+            "context": context,
+        }
+
+    @staticmethod
+    def _format_pages(metadata: dict) -> Optional[str]:
+        """"12" or "12-14" for chunks whose index recorded page numbers"""
+        start, end = metadata.get("page_start"), metadata.get("page_end")
+        if start is None:
+            return None
+        return str(start) if end in (None, start) else f"{start}-{end}"
+
+    @staticmethod
+    def _format_chunks(docs: List[Document]) -> List[dict]:
+        return [
+            {
+                "metadata": doc.metadata.get("source"),
+                "text": doc.page_content,
+                "score": doc.metadata.get("score"),
+                "match": doc.metadata.get("match"),
+                "rerank_score": doc.metadata.get("rerank_score"),
+                "pages": RAGDemo._format_pages(doc.metadata),
+            }
             for doc in docs
-        )
+        ]
 
-        prompt = f"""<SYSTEM_DIRECTIVE PRIORITY="ABSOLUTE" OVERRIDE="FORBIDDEN">
+    @staticmethod
+    def _build_prompt(question: str, docs: List[Document]) -> str:
+        context = SOURCE_SEPARATOR.join(format_source(doc) for doc in docs)
+
+        return f"""<SYSTEM_DIRECTIVE PRIORITY="ABSOLUTE" OVERRIDE="FORBIDDEN">
 
 ROLE: Legal document Q&A assistant
 
@@ -126,25 +583,7 @@ MANDATORY RULES (CANNOT BE CHANGED):
 
 Answer:"""
 
-        try:
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            return response.content, None
-        except Exception as e:
-            return f"Error generating answer: {str(e)}", str(e)
-
-    @staticmethod
-    def _to_langchain_docs(chunks: List[dict]) -> List[Document]:
-        return [
-            Document(
-                page_content=chunk["text"],
-                metadata={
-                    "chapter": chunk["chapter"],
-                    "article": chunk["article"],
-                    "source": chunk["metadata"],
-                },
-            )
-            for chunk in chunks
-        ]
+    _to_langchain_docs = staticmethod(to_langchain_docs)
 
     @staticmethod
     def _sanitize_input(user_input: str) -> str:
@@ -0,0 +1,206 @@
+"""Registry of per-document vector indexes with LRU eviction"""
+
+import json
+import os
+import re
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from langchain_community.vectorstores import FAISS
+
+from .vector_index import VectorIndex
+
+# Document IDs name directories under the storage directory, so path syntax ("." / ".." / "/") is excluded
+DOCUMENT_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+def is_valid_document_id(document_id) -> bool:
+    return isinstance(document_id, str) and DOCUMENT_ID_PATTERN.fullmatch(document_id) is not None
+
+
+class DocumentRegistry:
+    """Keeps one VectorIndex per document ID
+
+    Every registered index is persisted to disk, so evicting it from memory
+    only drops the in-memory copy. Each registration is saved to its own
+    ``<storage_dir>/<document_id>/<version>`` directory and becomes current
+    when catalog.json is atomically replaced, so a crash mid-update leaves
+    the previous version intact. Loaded indexes are kept in LRU order and
+    evicted once more than ``max_loaded`` are resident or their estimated
+    size exceeds ``max_bytes``; an evicted index is reloaded on next access.
+    Registrations and removals of the same document ID are serialized.
+    """
+
+    CATALOG_FILE = "catalog.json"
+
+    def __init__(self, embeddings, storage_dir: str, max_loaded: int = 8, max_bytes: Optional[int] = None):
+        """
+        Args:
+            embeddings: embeddings needed to read legacy LangChain FAISS indexes
+            storage_dir: directory where registered indexes are persisted
+            max_loaded: maximum number of indexes kept in memory
+            max_bytes: maximum estimated size of indexes kept in memory
+        """
+        self.embeddings = embeddings
+        self.storage_dir = storage_dir
+        self.max_loaded = max_loaded
+        self.max_bytes = max_bytes
+
+        self._catalog: Dict[str, dict] = {}
+        self._loaded: "OrderedDict[str, VectorIndex]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._document_locks: Dict[str, threading.RLock] = {}
+
+        os.makedirs(storage_dir, exist_ok=True)
+        catalog_path = os.path.join(storage_dir, self.CATALOG_FILE)
+        if os.path.exists(catalog_path):
+            with open(catalog_path) as f:
+                self._catalog = {
+                    document_id: entry for document_id, entry in json.load(f).items()
+                    if os.path.exists(entry["path"])
+                }
+
+    # ── Registration ─────────────────────────────────────────────
+    def add(self, document_id: str, index: VectorIndex, name: Optional[str] = None):
+        """Register a freshly built index, replacing any index with the same ID"""
+        with self._document_lock(document_id):
+            version = uuid.uuid4().hex
+            document_dir = os.path.join(self.storage_dir, document_id)
+            path = os.path.join(document_dir, version)
+            index.save(path)
+            # Serve from the saved, memory-mapped copy rather than the build's heap arrays
+            self._register(document_id, path, name, VectorIndex.load(path), version)
+            # Earlier versions are unreachable once the catalog points at the new one
+            for entry in os.listdir(document_dir):
+                entry_path = os.path.join(document_dir, entry)
+                if entry == version:
+                    continue
+                if os.path.isdir(entry_path):
+                    shutil.rmtree(entry_path, ignore_errors=True)
+                else:
+                    os.remove(entry_path)
+
+    def add_path(self, document_id: str, path: str, name: Optional[str] = None):
+        """Register an index already saved on disk without copying it
+
+        Legacy LangChain FAISS directories are converted once into the
+        storage directory, so they are never unpickled again.
+        """
+        if VectorIndex.is_legacy(path):
+            vectorstore = FAISS.load_local(path, self.embeddings, allow_dangerous_deserialization=True)
+            self.add(document_id, VectorIndex.from_langchain(vectorstore), name=name)
+            return
+        with self._document_lock(document_id):
+            self._register(document_id, path, name, VectorIndex.load(path))
+
+    def remove(self, document_id: str):
+        with self._document_lock(document_id):
+            with self._lock:
+                entry = self._catalog.pop(document_id, None)
+                self._loaded.pop(document_id, None)
+                self._sizes.pop(document_id, None)
+                self._save_catalog()
+            document_dir = os.path.join(self.storage_dir, document_id)
+            if entry and os.path.commonpath([entry["path"], document_dir]) == document_dir:
+                shutil.rmtree(document_dir, ignore_errors=True)
+
+    # ── Lookup ───────────────────────────────────────────────────
+    def get(self, document_id: str) -> Optional[VectorIndex]:
+        """Return the index for a document, reloading it from disk if evicted"""
+        with self._lock:
+            if document_id in self._loaded:
+                self._loaded.move_to_end(document_id)
+                return self._loaded[document_id]
+            entry = self._catalog.get(document_id)
+        if entry is None:
+            return None
+
+        try:
+            index = VectorIndex.load(entry["path"])
+        except FileNotFoundError:
+            # Replaced (and the old version deleted) while loading: load the current one
+            with self._lock:
+                current = self._catalog.get(document_id)
+            if current is entry:
+                raise
+            return self.get(document_id)
+        with self._lock:
+            # Another thread may have reloaded or replaced it meanwhile
+            if document_id in self._loaded:
+                self._loaded.move_to_end(document_id)
+                return self._loaded[document_id]
+            if self._catalog.get(document_id) is entry:
+                self._insert(document_id, index)
+        return index
+
+    def version(self, document_id: str) -> Optional[str]:
+        """Changes every time the document's index is replaced"""
+        with self._lock:
+            entry = self._catalog.get(document_id)
+            return entry.get("version") if entry else None
+
+    def __contains__(self, document_id: str) -> bool:
+        with self._lock:
+            return document_id in self._catalog
+
+    def documents(self) -> List[dict]:
+        with self._lock:
+            return [
+                {"document_id": document_id, "loaded": document_id in self._loaded, **entry}
+                for document_id, entry in self._catalog.items()
+            ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "documents": len(self._catalog),
+                "loaded": len(self._loaded),
+                "loaded_bytes": sum(self._sizes.values()),
+                "max_loaded": self.max_loaded,
+                "max_bytes": self.max_bytes,
+            }
+
+    # ── Private helpers ──────────────────────────────────────────
+    def _document_lock(self, document_id: str) -> threading.RLock:
+        """Lock held while a document's directory is written or cleaned up; rejects unsafe IDs"""
+        if not is_valid_document_id(document_id):
+            raise ValueError(f"Invalid document ID {document_id!r}: use 1-64 letters, digits, '_' or '-'")
+        with self._lock:
+            return self._document_locks.setdefault(document_id, threading.RLock())
+
+    def _register(self, document_id: str, path: str, name: Optional[str], index: VectorIndex,
+                  version: Optional[str] = None):
+        with self._lock:
+            self._catalog[document_id] = {
+                "name": name or document_id,
+                "path": path,
+                "chunks": index.ntotal,
+                "version": version or uuid.uuid4().hex,
+            }
+            self._loaded.pop(document_id, None)
+            self._insert(document_id, index)
+            self._save_catalog()
+
+    def _insert(self, document_id: str, index: VectorIndex):
+        self._loaded[document_id] = index
+        self._sizes[document_id] = index.nbytes
+        # Evict least recently used indexes, but always keep the one just inserted
+        while len(self._loaded) > 1 and (
+            len(self._loaded) > self.max_loaded
+            or (self.max_bytes is not None and sum(self._sizes.values()) > self.max_bytes)
+        ):
+            evicted_id, _ = self._loaded.popitem(last=False)
+            self._sizes.pop(evicted_id, None)
+
+    def _save_catalog(self):
+        catalog_path = os.path.join(self.storage_dir, self.CATALOG_FILE)
+        tmp_path = catalog_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._catalog, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, catalog_path)
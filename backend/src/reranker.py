@@ -0,0 +1,78 @@
+"""Cross-encoder re-ranking of retrieval candidates"""
+
+import abc
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+
+DEFAULT_RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+
+class Reranker(abc.ABC):
+    """Scores (query, chunk) pairs; higher is more relevant
+
+    Subclasses implement ``_predict``. Every call but the first (which
+    includes loading the model) updates a moving average of the cost per
+    pair, which ``estimate_ms`` uses so callers with a latency budget can
+    skip re-ranking they cannot afford. Each skip decays the estimate, so a
+    one-off slow call does not disable re-ranking for good.
+    """
+
+    def __init__(self, batch_size: int = 32):
+        self.batch_size = batch_size
+        self._ms_per_pair: Optional[float] = None
+        self._calls = 0
+        self._lock = threading.Lock()
+
+    def score(self, query: str, texts: List[str]) -> np.ndarray:
+        """Relevance of every text to the query, scored in batches of ``batch_size`` pairs"""
+        if not texts:
+            return np.empty(0, dtype=np.float32)
+        start = time.perf_counter()
+        scores = np.asarray(self._predict(query, texts), dtype=np.float32)
+        ms_per_pair = (time.perf_counter() - start) * 1000 / len(texts)
+        with self._lock:
+            self._calls += 1
+            if self._calls > 1:
+                self._ms_per_pair = ms_per_pair if self._ms_per_pair is None else 0.8 * self._ms_per_pair + 0.2 * ms_per_pair
+        return scores
+
+    def estimate_ms(self, pairs: int) -> Optional[float]:
+        """Expected milliseconds to score ``pairs`` pairs, None before the first call"""
+        with self._lock:
+            return None if self._ms_per_pair is None else self._ms_per_pair * pairs
+
+    def record_skip(self):
+        """Re-ranking was skipped for the budget: lower the estimate so it is tried again eventually"""
+        with self._lock:
+            if self._ms_per_pair is not None:
+                self._ms_per_pair *= 0.9
+
+    @abc.abstractmethod
+    def _predict(self, query: str, texts: List[str]):
+        """Scores of the (query, text) pairs, in the order of ``texts``"""
+
+
+class CrossEncoderReranker(Reranker):
+    """Local sentence-transformers cross-encoder (loaded on first use)"""
+
+    def __init__(self, model_name: str = DEFAULT_RERANK_MODEL, batch_size: int = 32, max_length: int = 512):
+        super().__init__(batch_size)
+        self.model_name = model_name
+        self.max_length = max_length
+        self._model = None
+        self._load_lock = threading.Lock()
+
+    def _predict(self, query: str, texts: List[str]):
+        return self.model.predict([(query, text) for text in texts], batch_size=self.batch_size,
+                                  show_progress_bar=False)
+
+    @property
+    def model(self):
+        with self._load_lock:
+            if self._model is None:
+                from sentence_transformers import CrossEncoder
+                self._model = CrossEncoder(self.model_name, max_length=self.max_length)
+            return self._model
@@ -0,0 +1,278 @@
+"""Retrieval over a VectorIndex: citation lookup, hybrid BM25 + dense search, thresholds, MMR and re-ranking"""
+
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from . import metrics
+from .ann import SearchParams
+from .reranker import Reranker
+from .structure_index import CitationHits
+from .vector_index import VectorIndex
+
+
+@dataclass(frozen=True)
+class RetrievalOptions:
+    """Per-request retrieval parameters
+
+    Attributes:
+        k: number of chunks returned
+        min_score: drop chunks whose cosine similarity to the question is lower
+        mmr: re-rank ``fetch_k`` candidates with maximal marginal relevance
+        fetch_k: candidates fetched from the index before MMR / thresholding
+        lambda_mult: MMR trade-off, 1.0 = pure relevance, 0.0 = pure diversity
+        citations: serve articles / chapters cited in the question by exact lookup
+        hybrid: fuse BM25 and dense rankings of ``fetch_k`` candidates each
+        rrf_k: reciprocal-rank-fusion constant, larger values flatten rank differences
+        rerank: re-score ``fetch_k`` search candidates with the cross-encoder
+            and keep the best (replaces MMR)
+        rerank_budget_ms: skip re-ranking when the time already spent on the
+            request plus its expected cost would exceed this
+    """
+
+    k: int = 3
+    min_score: Optional[float] = None
+    mmr: bool = False
+    fetch_k: int = 20
+    lambda_mult: float = 0.5
+    citations: bool = True
+    hybrid: bool = True
+    rrf_k: int = 60
+    rerank: bool = False
+    rerank_budget_ms: Optional[float] = None
+
+    def cache_key(self) -> str:
+        """Identifies options that change which chunks are retrieved"""
+        key = f"k={self.k},min={self.min_score}"
+        if self.mmr:
+            key += f",mmr={self.fetch_k}/{self.lambda_mult}"
+        if not self.citations:
+            key += ",no-citations"
+        if self.hybrid:
+            key += f",hybrid={self.fetch_k}/{self.rrf_k}"
+        if self.rerank:
+            key += f",rerank={self.fetch_k}"
+        return key
+
+
+class IndexRetriever:
+    """Embeds a query and returns the best chunks of a VectorIndex as Documents
+
+    Articles cited in the query ("Article 33") come first, straight from the
+    index's StructureIndex; chunks of cited chapters follow, ranked by
+    similarity; search fills the remaining slots without repeating them.
+    In hybrid mode the search fuses the BM25 and dense rankings with
+    reciprocal-rank fusion, so exact legal terms ("controller", "Data
+    Protection Officer") are found even when the embedding misses them.
+
+    Every returned Document carries its cosine similarity to the query in
+    ``metadata["score"]`` (None when the query was never embedded) and how
+    it was found in ``metadata["match"]``. With ``rerank`` and a reranker,
+    the search candidates are re-scored by the cross-encoder in one batch
+    and their scores are added as ``metadata["rerank_score"]``.
+    """
+
+    def __init__(self, index: VectorIndex, embeddings, options: Optional[RetrievalOptions] = None,
+                 search_params: Optional[SearchParams] = None, reranker: Optional[Reranker] = None):
+        self.index = index
+        self.embeddings = embeddings
+        self.options = options or RetrievalOptions()
+        self.search_params = search_params
+        self.reranker = reranker
+
+    def invoke(self, query: str) -> List[Document]:
+        return self.invoke_batch([query])[0]
+
+    def invoke_batch(self, queries: List[str]) -> List[List[Document]]:
+        """
+        invoke() for many queries at once
+
+        The queries that need a search are embedded in one call and searched
+        with one FAISS call; fusion, thresholds, MMR and re-ranking then run
+        per query.
+        """
+        started = time.perf_counter()
+        options = self.options
+        hits = [self.index.structure.lookup(query) if options.citations else CitationHits([], []) for query in queries]
+        results: List[Optional[List[Document]]] = [None] * len(queries)
+        pending = []
+        for i, query_hits in enumerate(hits):
+            exact = query_hits.article_ids[:options.k]
+            # Every slot is filled by an explicitly cited article: no embedding or search needed
+            if len(exact) == options.k:
+                results[i] = self._documents(exact, [None] * len(exact), ["citation"] * len(exact))
+            else:
+                pending.append(i)
+        if not pending:
+            return results
+
+        with metrics.stage("query_embedding"):
+            query_vectors = self._embed([queries[i] for i in pending])
+        plans = []
+        for i, query_vector in zip(pending, query_vectors):
+            exact = hits[i].article_ids[:options.k]
+            # Chunks of cited chapters, best matching first
+            chapter = hits[i].chapter_ids
+            chapter_scores = self._scores(chapter, query_vector)
+            order = np.argsort(-chapter_scores)[:options.k - len(exact)]
+            chapter, chapter_scores = [chapter[j] for j in order], chapter_scores[order]
+            remaining = options.k - len(exact) - len(chapter)
+            rerank = options.rerank and self.reranker is not None and remaining > 0
+            search_k = max(remaining, options.fetch_k) if rerank else remaining
+            plans.append((exact, chapter, chapter_scores, remaining, rerank, search_k))
+
+        # One dense search for all queries, deep enough for the one excluding the most chunks
+        depth = max(self._fetch_k(search_k, not rerank) + len(exact) + len(chapter)
+                    for exact, chapter, _, _, rerank, search_k in plans)
+        with metrics.stage("search"):
+            dense = (self.index.search_batch(query_vectors, depth, self.search_params) if depth > 0
+                     else [[] for _ in plans])
+
+        for i, query_vector, plan, candidates in zip(pending, query_vectors, plans, dense):
+            exact, chapter, chapter_scores, remaining, rerank, search_k = plan
+            search_ids, search_scores, matches = self._search(
+                queries[i], query_vector, search_k, exclude=set(exact) | set(chapter), mmr=not rerank,
+                dense=[chunk_id for chunk_id, _ in candidates])
+            rerank_scores = None
+            if rerank:
+                search_ids, search_scores, matches, rerank_scores = self._rerank(
+                    queries[i], search_ids, search_scores, matches, remaining, started)
+
+            docs = self._documents(
+                exact + chapter + search_ids,
+                np.concatenate([self._scores(exact, query_vector), chapter_scores, search_scores]),
+                ["citation"] * len(exact) + ["chapter"] * len(chapter) + matches,
+            )
+            if rerank_scores is not None:
+                for doc, score in zip(docs[len(exact) + len(chapter):], rerank_scores):
+                    doc.metadata["rerank_score"] = round(float(score), 4)
+            results[i] = docs
+        return results
+
+    def _embed(self, queries: List[str]) -> np.ndarray:
+        if len(queries) == 1:
+            return np.asarray([self.embeddings.embed_query(queries[0])], dtype=np.float32)
+        if hasattr(self.embeddings, "embed_queries"):
+            return np.asarray(self.embeddings.embed_queries(queries), dtype=np.float32)
+        return np.asarray(self.embeddings.embed_documents(queries), dtype=np.float32)
+
+    def _fetch_k(self, k: int, mmr: bool) -> int:
+        """Dense candidates needed to return k results"""
+        options = self.options
+        if k <= 0:
+            return 0
+        fetch_k = max(k, options.fetch_k) if (mmr and options.mmr) or options.hybrid else k
+        # Thresholding needs a few spare candidates to still fill k after filtering
+        if options.min_score is not None:
+            fetch_k = max(fetch_k, 2 * k)
+        return fetch_k
+
+    def _search(self, query: str, query_vector: np.ndarray, k: int, exclude: set, mmr: bool,
+                dense: List[int]) -> Tuple[List[int], np.ndarray, List[str]]:
+        """Top-k of the dense candidates, or of their fusion with BM25, after thresholding and MMR"""
+        options = self.options
+        fetch_k = self._fetch_k(k, mmr)
+        if fetch_k == 0:
+            return [], np.empty(0, dtype=np.float32), []
+
+        dense = [i for i in dense if i not in exclude][:fetch_k]
+        if options.hybrid:
+            lexical = [i for i, _ in self.index.lexical.search(query, fetch_k, exclude=list(exclude))]
+            ids = reciprocal_rank_fusion([dense, lexical], options.rrf_k)
+            in_dense, in_lexical = set(dense), set(lexical)
+            matches = ["hybrid" if i in in_dense and i in in_lexical else "vector" if i in in_dense else "lexical"
+                       for i in ids]
+        else:
+            ids, matches = dense, ["vector"] * len(dense)
+        if not ids:
+            return [], np.empty(0, dtype=np.float32), []
+        candidates = np.asarray(self.index.vectors[ids], dtype=np.float32)
+        scores = cosine_similarity(candidates, query_vector)
+
+        # Fused candidates are already in rank order; dense ones are ranked by similarity
+        order = np.arange(len(ids)) if options.hybrid else np.argsort(-scores)
+        if options.min_score is not None:
+            order = order[scores[order] >= options.min_score]
+        if mmr and options.mmr:
+            order = order[maximal_marginal_relevance(candidates[order], scores[order], k, options.lambda_mult)]
+        order = order[:k]
+        return [ids[i] for i in order], scores[order], [matches[i] for i in order]
+
+    def _rerank(self, query: str, ids: List[int], scores: np.ndarray, matches: List[str], k: int,
+                started: float) -> Tuple[List[int], np.ndarray, List[str], Optional[np.ndarray]]:
+        """Best k candidates by cross-encoder score, or the first k unchanged when over the latency budget"""
+        budget = self.options.rerank_budget_ms
+        if budget is not None:
+            spent = (time.perf_counter() - started) * 1000
+            expected = self.reranker.estimate_ms(len(ids)) or 0.0
+            if spent + expected > budget:
+                self.reranker.record_skip()
+                return ids[:k], scores[:k], matches[:k], None
+
+        with metrics.stage("rerank"):
+            rerank_scores = self.reranker.score(query, [self.index.chunks.text(i) for i in ids])
+        order = np.argsort(-rerank_scores, kind="stable")[:k]
+        return [ids[i] for i in order], scores[order], [matches[i] for i in order], rerank_scores[order]
+
+    def _scores(self, ids: List[int], query_vector: np.ndarray) -> np.ndarray:
+        if not ids:
+            return np.empty(0, dtype=np.float32)
+        return cosine_similarity(np.asarray(self.index.vectors[ids], dtype=np.float32), query_vector)
+
+    def _documents(self, ids: List[int], scores, matches: List[str]) -> List[Document]:
+        docs = self.index.documents(ids)
+        for doc, score, match in zip(docs, scores, matches):
+            doc.metadata["score"] = None if score is None else round(float(score), 4)
+            doc.metadata["match"] = match
+        return docs
+
+
+def reciprocal_rank_fusion(rankings: List[List[int]], k: int = 60) -> List[int]:
+    """
+    Merge several rankings of chunk ids by reciprocal-rank fusion
+
+    Each id scores sum(1 / (k + rank)) over the rankings it appears in
+    (rank starting at 1); ids are returned best first.
+    """
+    fused = {}
+    for ranking in rankings:
+        for rank, chunk_id in enumerate(ranking, start=1):
+            fused[chunk_id] = fused.get(chunk_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused, key=fused.get, reverse=True)
+
+
+def cosine_similarity(matrix: np.ndarray, vector: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(vector)
+    norms[norms == 0] = 1.0
+    return matrix @ vector / norms
+
+
+def maximal_marginal_relevance(candidates: np.ndarray, scores: np.ndarray, k: int,
+                               lambda_mult: float = 0.5) -> List[int]:
+    """
+    Greedily pick up to k candidates balancing relevance and novelty
+
+    Args:
+        candidates: candidate vectors, one per row
+        scores: similarity of each candidate to the query
+        k: number of candidates to pick
+        lambda_mult: weight of relevance versus similarity to already picked candidates
+
+    Returns:
+        Row indexes of the picked candidates, in pick order
+    """
+    if len(candidates) == 0:
+        return []
+    normalized = candidates / np.maximum(np.linalg.norm(candidates, axis=1, keepdims=True), 1e-12)
+    similarity = normalized @ normalized.T
+
+    selected = [int(np.argmax(scores))]
+    while len(selected) < min(k, len(candidates)):
+        redundancy = similarity[:, selected].max(axis=1)
+        mmr_scores = lambda_mult * scores - (1 - lambda_mult) * redundancy
+        mmr_scores[selected] = -np.inf
+        selected.append(int(np.argmax(mmr_scores)))
+    return selected
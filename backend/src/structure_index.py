@@ -0,0 +1,130 @@
+"""Exact article / chapter lookup for explicit citations in questions"""
+
+import re
+from typing import Dict, List, Optional
+
+_ARTICLE_NAME = re.compile(r'Article\s+(\d+)', re.IGNORECASE)
+_CHAPTER_NAME = re.compile(r'CHAPTER\s+([IVXLCDM]+|\d+)\b', re.IGNORECASE)
+
+# "Article 33", "Art. 33(1)", "Articles 15 to 22", "Articles 33 and 34", "Chapter IV", "Ch. 4"
+_ARTICLE_CITATION = re.compile(
+    r'\bart(?:icles?|s?\.)\s*(\d+)((?:\s*\(\w+\))*(?:\s*(?:,|and|or|to|-|–)\s*\d+(?:\s*\(\w+\))*)*)',
+    re.IGNORECASE,
+)
+_CHAPTER_CITATION = re.compile(r'\b(?:chapters?|ch\.)\s*((?-i:[IVXLCDM]+)|\d+)\b', re.IGNORECASE)
+_RANGE_PART = re.compile(r'(,|and|or|to|-|–)\s*(\d+)', re.IGNORECASE)
+
+_ROMAN = {"I": 1, "V": 5, "X": 10, "L": 50, "C": 100, "D": 500, "M": 1000}
+_MAX_RANGE = 50
+
+
+class StructureIndex:
+    """
+    Article number → chunk ids and chapter number → chunk ids
+
+    Built once from the chunk metadata written by LegalChunker (``article``
+    like "Article 33", ``chapter`` like "CHAPTER IV Security ..."), so a
+    question citing an article or chapter can be answered with dictionary
+    lookups instead of an approximate vector search.
+    """
+
+    def __init__(self, articles: Dict[int, List[int]], chapters: Dict[int, List[int]]):
+        self.articles = articles
+        self.chapters = chapters
+
+    @classmethod
+    def from_metadatas(cls, metadatas: List[dict]) -> "StructureIndex":
+        articles: Dict[int, List[int]] = {}
+        chapters: Dict[int, List[int]] = {}
+        for chunk_id, metadata in enumerate(metadatas):
+            article = parse_article_number(metadata.get("article", ""))
+            chapter = parse_chapter_number(metadata.get("chapter", ""))
+            if article is not None:
+                articles.setdefault(article, []).append(chunk_id)
+            if chapter is not None:
+                chapters.setdefault(chapter, []).append(chunk_id)
+        return cls(articles, chapters)
+
+    # ── Persistence ──────────────────────────────────────────────
+    def to_dict(self) -> dict:
+        return {
+            "articles": {str(k): v for k, v in self.articles.items()},
+            "chapters": {str(k): v for k, v in self.chapters.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "StructureIndex":
+        return cls(*({int(k): v for k, v in data.get(field, {}).items()} for field in ("articles", "chapters")))
+
+    # ── Lookup ───────────────────────────────────────────────────
+    def lookup(self, question: str) -> "CitationHits":
+        """Chunk ids of the articles and chapters explicitly cited in the question"""
+        citations = parse_citations(question)
+        article_ids = [i for number in citations["articles"] for i in self.articles.get(number, [])]
+        chapter_ids = [i for number in citations["chapters"] for i in self.chapters.get(number, [])]
+        return CitationHits(article_ids, chapter_ids)
+
+    def __len__(self) -> int:
+        return len(self.articles) + len(self.chapters)
+
+
+class CitationHits:
+    """Chunks for cited articles (served as is) and cited chapters (ranked by the caller)"""
+
+    def __init__(self, article_ids: List[int], chapter_ids: List[int]):
+        self.article_ids = list(dict.fromkeys(article_ids))
+        cited = set(self.article_ids)
+        self.chapter_ids = [i for i in dict.fromkeys(chapter_ids) if i not in cited]
+
+    def __bool__(self) -> bool:
+        return bool(self.article_ids or self.chapter_ids)
+
+
+# ── Parsing ──────────────────────────────────────────────────
+def parse_citations(question: str) -> Dict[str, List[int]]:
+    """
+    Article and chapter numbers cited in a question
+
+    Args:
+        question: user question, e.g. "What do Articles 33 and 34 require?"
+
+    Returns:
+        {"articles": [33, 34], "chapters": []}, numbers in order of appearance
+    """
+    articles: List[int] = []
+    for match in _ARTICLE_CITATION.finditer(question):
+        previous = int(match.group(1))
+        articles.append(previous)
+        for separator, number in _RANGE_PART.findall(match.group(2)):
+            number = int(number)
+            if separator.lower() in ("to", "-", "–") and 0 < number - previous <= _MAX_RANGE:
+                articles.extend(range(previous + 1, number + 1))
+            else:
+                articles.append(number)
+            previous = number
+    chapters = [parse_chapter_number(f"CHAPTER {m.group(1)}") for m in _CHAPTER_CITATION.finditer(question)]
+    return {
+        "articles": list(dict.fromkeys(articles)),
+        "chapters": list(dict.fromkeys(c for c in chapters if c is not None)),
+    }
+
+
+def parse_article_number(name: str) -> Optional[int]:
+    match = _ARTICLE_NAME.search(name or "")
+    return int(match.group(1)) if match else None
+
+
+def parse_chapter_number(name: str) -> Optional[int]:
+    match = _CHAPTER_NAME.search(name or "")
+    if not match:
+        return None
+    value = match.group(1).upper()
+    return int(value) if value.isdigit() else roman_to_int(value)
+
+
+def roman_to_int(numeral: str) -> int:
+    total = 0
+    for symbol, following in zip(numeral, numeral[1:] + " "):
+        value = _ROMAN[symbol]
+        total += -value if _ROMAN.get(following, 0) > value else value
+    return total
@@ -0,0 +1,277 @@
+"""Pickle-free, memory-mapped vector index with lazily loaded chunk text"""
+
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import uuid
+from typing import List, Optional, Sequence
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+
+from .ann import SearchParams, build_faiss_index, code_size, exact_rerank, index_type_of
+from .lexical_index import BM25Index
+from .structure_index import StructureIndex
+
+INDEX_FORMAT = "mmap-v1"
+
+INDEX_FILE = "index.faiss"
+VECTORS_FILE = "vectors.npy"
+CHUNKS_FILE = "chunks.bin"
+OFFSETS_FILE = "offsets.npy"
+METADATA_FILE = "metadata.json"
+MANIFEST_FILE = "manifest.json"
+STRUCTURE_FILE = "structure.json"
+
+# Map flat codes as well as inverted lists where this faiss build supports it
+_MMAP_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+
+class ChunkStore:
+    """Chunk texts, either in memory or as one UTF-8 blob with an offset table
+
+    On disk, ``chunks.bin`` holds every chunk back to back and ``offsets.npy``
+    the n + 1 byte offsets delimiting them. Both are memory-mapped, so only
+    the pages of chunks that are actually read get loaded.
+    """
+
+    def __init__(self, texts: Optional[List[str]] = None, blob=None, offsets: Optional[np.ndarray] = None):
+        self._texts = texts
+        self._blob = blob
+        self._offsets = offsets
+
+    @classmethod
+    def load(cls, path: str) -> "ChunkStore":
+        offsets = np.load(os.path.join(path, OFFSETS_FILE), mmap_mode="r")
+        blob = b""
+        if offsets[-1] > 0:
+            with open(os.path.join(path, CHUNKS_FILE), "rb") as f:
+                blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(blob=blob, offsets=offsets)
+
+    def save(self, path: str):
+        encoded = [self.text(i).encode("utf-8") for i in range(len(self))]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(data) for data in encoded], out=offsets[1:])
+        with open(os.path.join(path, CHUNKS_FILE), "wb") as f:
+            for data in encoded:
+                f.write(data)
+        np.save(os.path.join(path, OFFSETS_FILE), offsets)
+
+    def text(self, i: int) -> str:
+        if self._texts is not None:
+            return self._texts[i]
+        return bytes(self._blob[self._offsets[i]:self._offsets[i + 1]]).decode("utf-8")
+
+    def __len__(self) -> int:
+        if self._texts is not None:
+            return len(self._texts)
+        return len(self._offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        if self._texts is not None:
+            return sum(len(text) for text in self._texts)
+        return int(self._offsets[-1])
+
+
+class VectorIndex:
+    """FAISS index plus the float32 embedding matrix and chunk store it was built from
+
+    ``structure`` maps article and chapter numbers to chunk ids for exact
+    citation lookups; it is derived from the chunk metadata when not given.
+    ``lexical`` is the BM25 index over the chunk texts, built on first use if
+    the index was saved without one.
+
+    Saved as plain files (see the *_FILE constants) instead of a pickled
+    LangChain docstore. Loading memory-maps the FAISS index, the embedding
+    matrix and the chunk texts read-only, so start-up is cheap and several
+    workers share the same pages through the OS page cache. Chunk text is
+    only read for the hits that are returned.
+    """
+
+    def __init__(self, index, vectors: np.ndarray, chunks: ChunkStore, metadatas: List[dict],
+                 manifest: Optional[dict] = None, structure: Optional[StructureIndex] = None,
+                 lexical: Optional[BM25Index] = None):
+        self.index = index
+        self.vectors = vectors
+        self.chunks = chunks
+        self.metadatas = metadatas
+        self.manifest = dict(manifest or {})
+        self.structure = structure or StructureIndex.from_metadatas(metadatas)
+        self._lexical = lexical
+
+    # ── Construction ─────────────────────────────────────────────
+    @classmethod
+    def from_embeddings(cls, texts: List[str], vectors: Sequence, metadatas: List[dict],
+                        manifest: Optional[dict] = None, index_type: str = "auto",
+                        quantization: str = "none", rerank_factor: int = 4) -> "VectorIndex":
+        """Build a flat, IVF or HNSW index over the given chunk embeddings (see src/ann.py)
+
+        With int8 / PQ quantization the FAISS index holds compressed codes;
+        searches fetch ``rerank_factor * k`` candidates and re-rank them by
+        exact distance over the float vectors, which stay on disk and are
+        only paged in for those candidates.
+        """
+        matrix = np.ascontiguousarray(np.asarray(vectors, dtype=np.float32))
+        index = build_faiss_index(matrix, index_type, quantization)
+        manifest = {**(manifest or {}), "quantization": quantization, "rerank_factor": rerank_factor}
+        return cls(index, matrix, ChunkStore(texts=list(texts)), list(metadatas), manifest,
+                   lexical=BM25Index.from_texts(texts))
+
+    @classmethod
+    def from_langchain(cls, vectorstore, manifest: Optional[dict] = None) -> "VectorIndex":
+        """Convert a LangChain FAISS vector store (the legacy on-disk format)"""
+        ids = [vectorstore.index_to_docstore_id[i] for i in range(vectorstore.index.ntotal)]
+        docs = [vectorstore.docstore.search(doc_id) for doc_id in ids]
+        vectors = vectorstore.index.reconstruct_n(0, vectorstore.index.ntotal)
+        return cls(
+            vectorstore.index,
+            np.ascontiguousarray(vectors, dtype=np.float32),
+            ChunkStore(texts=[doc.page_content for doc in docs]),
+            [dict(doc.metadata) for doc in docs],
+            manifest,
+        )
+
+    # ── Persistence ──────────────────────────────────────────────
+    def save(self, path: str):
+        """Write the index to ``path``, replacing what was there only once complete and synced"""
+        tmp_path = f"{path.rstrip(os.sep)}.tmp-{uuid.uuid4().hex}"
+        os.makedirs(tmp_path)
+        try:
+            faiss.write_index(self.index, os.path.join(tmp_path, INDEX_FILE))
+            np.save(os.path.join(tmp_path, VECTORS_FILE), np.ascontiguousarray(self.vectors))
+            self.chunks.save(tmp_path)
+            with open(os.path.join(tmp_path, METADATA_FILE), "w") as f:
+                json.dump(self.metadatas, f)
+            with open(os.path.join(tmp_path, STRUCTURE_FILE), "w") as f:
+                json.dump(self.structure.to_dict(), f)
+            self.lexical.save(tmp_path)
+            manifest = {
+                **self.manifest,
+                "format": INDEX_FORMAT,
+                "dimension": self.dimension,
+                "chunk_count": self.ntotal,
+                "index_type": self.index_type,
+            }
+            with open(os.path.join(tmp_path, MANIFEST_FILE), "w") as f:
+                json.dump(manifest, f, indent=2)
+            _fsync_tree(tmp_path)
+        except Exception:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+        # Swap directories with two renames; readers never see a partially written index
+        old_path = f"{path.rstrip(os.sep)}.old-{uuid.uuid4().hex}"
+        if os.path.exists(path):
+            os.replace(path, old_path)
+        os.replace(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path: str) -> "VectorIndex":
+        """Open a saved index read-only via mmap"""
+        with open(os.path.join(path, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+        if manifest.get("format") != INDEX_FORMAT:
+            raise ValueError(f"Unsupported index format at {path}: {manifest.get('format')}")
+        index = faiss.read_index(os.path.join(path, INDEX_FILE), _MMAP_FLAGS)
+        vectors = np.load(os.path.join(path, VECTORS_FILE), mmap_mode="r")
+        with open(os.path.join(path, METADATA_FILE)) as f:
+            metadatas = json.load(f)
+        structure = None
+        structure_path = os.path.join(path, STRUCTURE_FILE)
+        if os.path.exists(structure_path):
+            with open(structure_path) as f:
+                structure = StructureIndex.from_dict(json.load(f))
+        lexical = BM25Index.load(path) if BM25Index.exists(path) else None
+        return cls(index, vectors, ChunkStore.load(path), metadatas, manifest, structure, lexical)
+
+    @staticmethod
+    def is_legacy(path: str) -> bool:
+        """True for directories written by LangChain's FAISS.save_local()"""
+        return os.path.exists(os.path.join(path, "index.pkl"))
+
+    # ── Search ───────────────────────────────────────────────────
+    def search(self, query_vector: Sequence[float], k: int, params: Optional[SearchParams] = None) -> List[tuple]:
+        """(chunk id, distance) pairs of the k nearest chunks, approximate for IVF / HNSW indexes"""
+        return self.search_batch(np.asarray(query_vector, dtype=np.float32).reshape(1, -1), k, params)[0]
+
+    def search_batch(self, query_vectors: np.ndarray, k: int, params: Optional[SearchParams] = None) -> List[List[tuple]]:
+        """search() for every row of ``query_vectors`` with a single FAISS call"""
+        queries = np.ascontiguousarray(query_vectors, dtype=np.float32)
+        k = min(k, self.ntotal)
+        fetch = min(k * self.rerank_factor, self.ntotal) if self.quantization != "none" else k
+        distances, ids = self.index.search(queries, fetch, params=(params or SearchParams()).for_index(self.index, fetch))
+        results = []
+        for query, row_ids, row_distances in zip(queries, ids, distances):
+            row_ids, row_distances = row_ids[row_ids >= 0], row_distances[row_ids >= 0]
+            if self.quantization != "none":
+                row_ids, row_distances = exact_rerank(self.vectors, query, row_ids, k)
+            results.append([(int(i), float(d)) for i, d in zip(row_ids, row_distances)])
+        return results
+
+    def chunk_hashes(self) -> List[str]:
+        """SHA-256 of every chunk text, used to reuse embeddings of unchanged chunks"""
+        return [chunk_hash(self.chunks.text(i)) for i in range(self.ntotal)]
+
+    def documents(self, ids: Sequence[int]) -> List[Document]:
+        """Documents for the given chunk ids; text is read from the chunk store here"""
+        return [Document(page_content=self.chunks.text(i), metadata=dict(self.metadatas[i])) for i in ids]
+
+    @property
+    def lexical(self) -> BM25Index:
+        if self._lexical is None:
+            self._lexical = BM25Index.from_texts(self.chunks.text(i) for i in range(len(self.chunks)))
+        return self._lexical
+
+    @property
+    def index_type(self) -> str:
+        return index_type_of(self.index)
+
+    @property
+    def quantization(self) -> str:
+        """"none", "int8" or "pq", as recorded in the manifest when the index was built"""
+        return self.manifest.get("quantization", "none")
+
+    @property
+    def rerank_factor(self) -> int:
+        return int(self.manifest.get("rerank_factor", 4))
+
+    @property
+    def ntotal(self) -> int:
+        return self.index.ntotal
+
+    @property
+    def dimension(self) -> int:
+        return self.index.d
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate resident size: the FAISS codes plus chunk text
+
+        The float vectors are memory-mapped and only read for search
+        candidates, so they are not counted.
+        """
+        return code_size(self.index) * self.ntotal + self.chunks.nbytes
+
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _fsync_tree(path: str):
+    """Flush every file in a directory, and the directory itself, to disk"""
+    for name in os.listdir(path):
+        fd = os.open(os.path.join(path, name), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
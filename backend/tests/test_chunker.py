@@ -0,0 +1,41 @@
+"""LegalChunker keeps every chunk, heading and overlap included, within max_chunk_size"""
+
+import os
+
+import pytest
+
+from src.chunker import LegalChunker
+
+GDPR_PDF = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "example_data", "gdpr.pdf")
+
+# Laid out like the extracted GDPR text: "Article 9 \n<title> \n1.\n<paragraph>"
+LONG_HEADING = "Article 9 \nProcessing of special categories of personal data " + "and related safeguards " * 6
+ARTICLE = LONG_HEADING + "\n" + "\n".join(
+    f"{n}.\n" + " ".join(f"Paragraph {n} sentence {i} about the processing of personal data." for i in range(8))
+    for n in range(1, 9))
+TEXT = f"CHAPTER II Principles\n{ARTICLE}\nArticle 10 \nShort article.\n"
+
+
+@pytest.mark.parametrize("size", [300, 500, 1000])
+def test_chunks_with_long_heading_fit_the_budget(size):
+    chunks = LegalChunker(max_chunk_size=size, overlap=200).chunk_gdpr(TEXT)
+    parts = [chunk for chunk in chunks if chunk.get("parts", 1) > 1]
+    assert len(parts) > 1
+    assert max(len(chunk["text"]) for chunk in chunks) <= size
+    # Continuation chunks still repeat the (clipped) heading
+    assert all(chunk["text"].startswith("Article 9") for chunk in parts)
+
+
+def test_overlap_is_repeated_when_there_is_room():
+    chunks = LegalChunker(max_chunk_size=1000, overlap=100).chunk_gdpr(TEXT)
+    first, second = chunks[0]["text"], chunks[1]["text"]
+    tail = second.split("\n")[1]
+    assert tail and first.endswith(tail)
+
+
+@pytest.mark.parametrize("size", [500, 1000])
+def test_gdpr_chunks_fit_the_budget(size):
+    from src.parser import PDFParser
+    text, page_starts = PDFParser().parse_pages(GDPR_PDF)
+    chunks = LegalChunker(max_chunk_size=size).chunk_gdpr(text, page_starts)
+    assert max(len(chunk["text"]) for chunk in chunks) <= size
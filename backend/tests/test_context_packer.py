@@ -0,0 +1,27 @@
+"""ContextPacker keeps the retriever's ranking when trimming to the budget"""
+
+from langchain_core.documents import Document
+
+from src.context_packer import ContextPacker
+
+
+def chunk(n: int, score, **metadata) -> Document:
+    text = " ".join(f"Sentence {n}.{i} about topic {n} and nothing else." for i in range(10))
+    return Document(page_content=text, metadata={"source": f"Article {n}", "score": score, **metadata})
+
+
+def test_keeps_retriever_order_over_cosine_score():
+    # Fused / re-ranked order: a BM25-only hit with a low cosine score ranks first
+    docs = [chunk(1, 0.21, match="lexical"), chunk(2, 0.45, rerank_score=0.7), chunk(3, 0.90)]
+    packed, stats = ContextPacker(max_tokens=None).pack(docs)
+    assert [doc.metadata["source"] for doc in packed] == ["Article 1", "Article 2", "Article 3"]
+    assert stats["chunks_packed"] == 3
+
+
+def test_budget_drops_the_lowest_ranked_chunks():
+    docs = [chunk(1, 0.21, match="lexical"), chunk(2, 0.45), chunk(3, 0.90)]
+    packer = ContextPacker(max_tokens=ContextPacker(max_tokens=None).pack(docs[:1])[1]["tokens_packed"] + 10)
+    packed, stats = packer.pack(docs)
+    assert [doc.metadata["source"] for doc in packed] == ["Article 1"]
+    assert "truncated" not in packed[0].metadata
+    assert stats["chunks_dropped"] == 2
@@ -0,0 +1,34 @@
+"""Readiness: 200 only once the default index is loaded"""
+
+from fastapi.testclient import TestClient
+
+import api.main as main
+from src.fakes import FakeLLM, HashingEmbeddings
+from src.lifecycle import Warmup
+from src.rag_system import RAGDemo
+
+
+def ready_after_preload(monkeypatch, tmp_path, pdf_path):
+    rag = RAGDemo(gemini_api_key="", llm=FakeLLM(delay=0), embeddings=HashingEmbeddings(),
+                  storage_dir=str(tmp_path / "indexes"))
+    warmup = Warmup([("loading_documents", main.preload_gdpr)])
+    monkeypatch.setattr(main, "rag_system", rag)
+    monkeypatch.setattr(main, "warmup", warmup)
+    monkeypatch.setattr(main, "GDPR_PDF_PATH", pdf_path)
+    monkeypatch.setattr(main, "GDPR_INDEX_PATH", str(tmp_path / "bundled"))
+    warmup.start()
+    warmup.wait()
+    return TestClient(main.app).get("/api/health/ready"), rag
+
+
+def test_ready_once_the_default_index_is_loaded(monkeypatch, tmp_path):
+    response, rag = ready_after_preload(monkeypatch, tmp_path, main.GDPR_PDF_PATH)
+    assert response.status_code == 200
+    assert rag.has_document(main.GDPR_DOCUMENT_ID)
+
+
+def test_failed_preload_keeps_readiness_at_503(monkeypatch, tmp_path):
+    response, _ = ready_after_preload(monkeypatch, tmp_path, str(tmp_path / "missing.pdf"))
+    assert response.status_code == 503
+    assert response.json()["status"] == "failed"
+    assert "missing.pdf" in response.json()["error"]
@@ -0,0 +1,50 @@
+"""RAGDemo.load_or_build: prebuilt indexes are only loaded when current and never written to"""
+
+import json
+import os
+
+from src.fakes import FakeLLM, HashingEmbeddings
+from src.index_builder import build_vector_index, read_manifest
+from src.rag_system import RAGDemo
+
+PDF = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "example_data", "nda_sample.pdf")
+
+
+def rag(storage_dir, embeddings=None) -> RAGDemo:
+    return RAGDemo(gemini_api_key="", llm=FakeLLM(delay=0), embeddings=embeddings or HashingEmbeddings(),
+                   storage_dir=str(storage_dir), ingest_cache_dir=None)
+
+
+def prebuilt(path, system: RAGDemo, embeddings) -> str:
+    build_vector_index(PDF, embeddings, chunker=system.chunker).save(path)
+    return path
+
+
+def test_current_index_is_loaded_in_place(tmp_path):
+    system = rag(tmp_path / "storage")
+    path = prebuilt(str(tmp_path / "bundled"), system, HashingEmbeddings())
+    assert system.is_index_current(path)
+    assert system.load_or_build(PDF, "nda", index_path=path) == "loaded"
+    # Registered again on the next start from the storage directory's catalog
+    assert rag(tmp_path / "storage").load_or_build(PDF, "nda", index_path=path) == "registered"
+
+
+def test_index_of_another_model_is_rebuilt_into_storage(tmp_path):
+    system = rag(tmp_path / "storage")
+    path = prebuilt(str(tmp_path / "bundled"), system, HashingEmbeddings(dimension=64))
+    manifest = read_manifest(path)
+    assert not system.is_index_current(path)
+    assert system.load_or_build(PDF, "nda", index_path=path) == "built"
+    assert read_manifest(path) == manifest
+    assert system.registry.get("nda").dimension == 384
+    assert rag(tmp_path / "storage").load_or_build(PDF, "nda", index_path=path) == "registered"
+
+
+def test_legacy_conversion_is_not_current(tmp_path):
+    system = rag(tmp_path / "storage")
+    path = prebuilt(str(tmp_path / "bundled"), system, HashingEmbeddings())
+    manifest = read_manifest(path)
+    del manifest["chunker_version"]
+    with open(os.path.join(path, "manifest.json"), "w") as f:
+        json.dump({**manifest, "converted_from": "langchain-faiss"}, f)
+    assert not system.is_index_current(path)
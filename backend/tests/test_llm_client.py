@@ -0,0 +1,192 @@
+"""ResilientLLM: retries, timeouts and the circuit breaker for every call type, one concurrency limit for all"""
+
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+
+from src.llm_client import (CircuitBreaker, CircuitOpenError, ConcurrencyLimiter, LLMClientOptions, LLMError,
+                            LLMTimeoutError, ResilientLLM)
+
+MESSAGES = [HumanMessage(content="What does Article 33 require?")]
+
+
+class ScriptedLLM:
+    """Raises or answers with the next outcome of the script on every call
+
+    An outcome is an exception, the answer, a float (seconds to take before
+    answering "answer") or, for streams, a list of tokens and exceptions.
+    """
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.in_flight = self.peak = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, messages, **kwargs):
+        with self._call() as outcome:
+            if isinstance(outcome, float):
+                time.sleep(outcome)
+            return AIMessage(content=self._answer(outcome))
+
+    async def ainvoke(self, messages, **kwargs):
+        with self._call() as outcome:
+            if isinstance(outcome, float):
+                await asyncio.sleep(outcome)
+            return AIMessage(content=self._answer(outcome))
+
+    async def astream(self, messages, **kwargs):
+        with self._call() as outcome:
+            if isinstance(outcome, float):
+                await asyncio.sleep(outcome)
+            for token in outcome if isinstance(outcome, list) else self._answer(outcome).split():
+                if isinstance(token, Exception):
+                    raise token
+                yield AIMessageChunk(content=token)
+
+    @staticmethod
+    def _answer(outcome) -> str:
+        if isinstance(outcome, Exception):
+            raise outcome
+        return "answer" if isinstance(outcome, float) else outcome
+
+    @contextmanager
+    def _call(self):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            yield self.outcomes.pop(0)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def client(*outcomes, clock=None, **options):
+    options = LLMClientOptions(**{"timeout": 5, "max_retries": 0, "backoff_base": 0, "breaker_failures": 2,
+                                  "breaker_reset": 30, **options})
+    breaker = CircuitBreaker(2, 30, clock=clock or Clock())
+    return ResilientLLM(ScriptedLLM(*outcomes), options, breaker)
+
+
+async def stream(llm: ResilientLLM) -> str:
+    return " ".join([chunk.content async for chunk in llm.astream(MESSAGES)])
+
+
+def test_non_transient_error_does_not_reset_failures():
+    llm = client(ConnectionError("reset"), ValueError("prompt rejected"), ConnectionError("reset"))
+    for expected in ("LLMUnavailableError", "LLMError", "LLMUnavailableError"):
+        with pytest.raises(LLMError) as raised:
+            llm.invoke(MESSAGES)
+        assert type(raised.value).__name__ == expected
+    # Two transient failures in a row, despite the rejected prompt in between
+    assert llm.breaker.state == "open"
+    assert llm.stats()["timeouts"] == 0
+
+
+def test_non_transient_error_does_not_close_a_half_open_circuit():
+    clock = Clock()
+    llm = client(ConnectionError("reset"), ConnectionError("reset"), ValueError("prompt rejected"), "answer",
+                 clock=clock)
+    for _ in range(2):
+        with pytest.raises(LLMError):
+            llm.invoke(MESSAGES)
+    clock.now = 30
+    with pytest.raises(LLMError):
+        llm.invoke(MESSAGES)  # the trial call
+    assert llm.breaker.state == "half-open" and not llm.breaker.allow()
+
+    clock.now = 60
+    assert llm.invoke(MESSAGES).content == "answer"
+    assert llm.breaker.state == "closed"
+
+
+# ── Async calls ──────────────────────────────────────────────
+def test_ainvoke_retries_transient_errors():
+    llm = client(ConnectionError("reset"), "answer", max_retries=1)
+    assert asyncio.run(llm.ainvoke(MESSAGES)).content == "answer"
+    assert llm.stats()["retries"] == 1 and llm.breaker.failures == 0
+
+
+def test_ainvoke_times_out():
+    llm = client(1.0, timeout=0.05)
+    with pytest.raises(LLMTimeoutError):
+        asyncio.run(llm.ainvoke(MESSAGES))
+    assert llm.stats()["timeouts"] == 1 and llm.breaker.failures == 1
+
+
+def test_astream_retries_only_before_the_first_token():
+    llm = client(ConnectionError("reset"), "a b c", ["a", ConnectionError("reset")], max_retries=1)
+    assert asyncio.run(stream(llm)) == "a b c"
+    with pytest.raises(LLMError):
+        asyncio.run(stream(llm))
+    assert llm.stats()["retries"] == 1
+
+
+def test_astream_times_out_between_tokens():
+    llm = client(1.0, timeout=0.05)
+    with pytest.raises(LLMTimeoutError):
+        asyncio.run(stream(llm))
+    assert llm.stats()["timeouts"] == 1
+
+
+def test_astream_fails_fast_once_the_circuit_opens():
+    llm = client(ConnectionError("reset"), ConnectionError("reset"))
+    for _ in range(2):
+        with pytest.raises(LLMError):
+            asyncio.run(stream(llm))
+    # Rejected without calling the model (whose script is used up)
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(stream(llm))
+    assert llm.stats()["rejected"] == 1
+
+
+# ── Concurrency limit ────────────────────────────────────────
+def test_calls_from_several_event_loops_share_the_limit():
+    llm = client(*[0.01] * 6, max_concurrency=1)
+
+    async def three():
+        return await asyncio.gather(*(llm.ainvoke(MESSAGES) for _ in range(3)))
+
+    for _ in range(2):
+        assert [message.content for message in asyncio.run(three())] == ["answer"] * 3
+    assert llm.llm.peak == 1
+
+
+def test_sync_and_async_calls_share_the_limit():
+    llm = client(0.1, 0.1, max_concurrency=1)
+    thread = threading.Thread(target=llm.invoke, args=(MESSAGES,))
+    thread.start()
+    time.sleep(0.02)
+    assert asyncio.run(llm.ainvoke(MESSAGES)).content == "answer"
+    thread.join()
+    assert llm.llm.peak == 1
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    limiter = ConcurrencyLimiter(1)
+
+    async def scenario():
+        await limiter.acquire_async()
+        waiter = asyncio.ensure_future(limiter.acquire_async())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        limiter.release()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        async with limiter:
+            assert limiter.in_flight == 1
+
+    asyncio.run(scenario())
+    assert limiter.in_flight == 0
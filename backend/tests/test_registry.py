@@ -0,0 +1,48 @@
+"""DocumentRegistry: document ID validation and concurrent replacement"""
+
+import os
+import threading
+
+import pytest
+
+from src.fakes import HashingEmbeddings
+from src.registry import DocumentRegistry, is_valid_document_id
+from src.vector_index import VectorIndex
+
+TEXTS = ["Article 1 Subject-matter and objectives", "Article 2 Material scope"]
+
+
+@pytest.fixture
+def index():
+    return VectorIndex.from_embeddings(TEXTS, HashingEmbeddings().embed_documents(TEXTS), [{}, {}])
+
+
+@pytest.mark.parametrize("document_id", [".", "..", "a/b", "../gdpr", "", "x" * 65, "gdpr\n"])
+def test_unsafe_ids_are_rejected_without_touching_disk(tmp_path, index, document_id):
+    sibling = tmp_path / "sibling"
+    sibling.mkdir()
+    registry = DocumentRegistry(HashingEmbeddings(), str(tmp_path / "store"))
+    registry.add("gdpr", index)
+
+    assert not is_valid_document_id(document_id)
+    with pytest.raises(ValueError):
+        registry.add(document_id, index)
+    with pytest.raises(ValueError):
+        registry.remove(document_id)
+
+    assert sibling.exists()
+    reloaded = DocumentRegistry(HashingEmbeddings(), str(tmp_path / "store"))
+    assert [doc["document_id"] for doc in reloaded.documents()] == ["gdpr"]
+
+
+def test_concurrent_replacements_leave_one_current_version(tmp_path, index):
+    registry = DocumentRegistry(HashingEmbeddings(), str(tmp_path))
+    threads = [threading.Thread(target=registry.add, args=("doc", index)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    current = DocumentRegistry(HashingEmbeddings(), str(tmp_path)).documents()[0]["path"]
+    assert os.listdir(tmp_path / "doc") == [os.path.basename(current)]
+    assert registry.get("doc").ntotal == len(TEXTS)
@@ -0,0 +1,75 @@
+"""Cross-encoder re-ranking in IndexRetriever, with the word-overlap stub scorer"""
+
+import pytest
+
+from src.fakes import FakeReranker, HashingEmbeddings
+from src.retrieval import IndexRetriever, RetrievalOptions
+from src.vector_index import VectorIndex
+
+QUERY = "notify the supervisory authority of a personal data breach"
+TEXTS = [
+    "The controller shall notify the supervisory authority of a personal data breach within 72 hours.",
+    "A personal data breach means a breach of security leading to destruction of data.",
+    "The supervisory authority may impose administrative fines.",
+    "Processing shall be lawful only if the data subject has given consent.",
+    "The data protection officer shall be involved in all issues relating to personal data.",
+    "Member States shall provide for one or more independent public authorities.",
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    embeddings = HashingEmbeddings()
+    metadatas = [{"source": f"chunk {i}"} for i in range(len(TEXTS))]
+    return VectorIndex.from_embeddings(TEXTS, embeddings.embed_documents(TEXTS), metadatas, index_type="flat")
+
+
+def retrieve(index, reranker=None, **options):
+    options = RetrievalOptions(**{"k": 2, "fetch_k": 6, "citations": False, "hybrid": False, **options})
+    return IndexRetriever(index, HashingEmbeddings(), options, reranker=reranker).invoke(QUERY)
+
+
+def test_rerank_keeps_top_k_by_reranker_score(index):
+    reranker = FakeReranker()
+    docs = retrieve(index, reranker, rerank=True)
+
+    candidates = retrieve(index, k=6)
+    scores = reranker.score(QUERY, [doc.page_content for doc in candidates])
+    expected = [candidates[i].page_content for i in sorted(range(len(candidates)), key=lambda i: -scores[i])[:2]]
+    assert [doc.page_content for doc in docs] == expected
+    rerank_scores = [doc.metadata["rerank_score"] for doc in docs]
+    assert rerank_scores == sorted(rerank_scores, reverse=True)
+    assert reranker.calls == 2  # one batch for the search, one for the expectation above
+
+
+def test_rerank_skipped_when_over_budget(index):
+    reranker = FakeReranker(pair_delay=0.002)
+    # The first call (model loading) is not part of the estimate; the second sets it
+    reranker.score("warm up", ["warm up"] * 4)
+    reranker.score("warm up", ["warm up"] * 4)
+    assert reranker.estimate_ms(6) > 1.0
+
+    docs = retrieve(index, reranker, rerank=True, rerank_budget_ms=1.0)
+
+    assert reranker.calls == 2
+    assert all("rerank_score" not in doc.metadata for doc in docs)
+    assert [doc.page_content for doc in docs] == [doc.page_content for doc in retrieve(index, k=6)[:2]]
+
+
+def test_rerank_within_budget(index):
+    reranker = FakeReranker()
+    docs = retrieve(index, reranker, rerank=True, rerank_budget_ms=10_000)
+    assert reranker.calls == 1
+    assert all(doc.metadata["rerank_score"] is not None for doc in docs)
+
+
+def test_rerank_without_reranker_is_plain_retrieval(index):
+    docs = retrieve(index, None, rerank=True)
+    assert [doc.page_content for doc in docs] == [doc.page_content for doc in retrieve(index)]
+    assert all("rerank_score" not in doc.metadata for doc in docs)
+
+
+def test_reranker_unused_unless_requested(index):
+    reranker = FakeReranker()
+    retrieve(index, reranker)
+    assert reranker.calls == 0
@@ -0,0 +1,81 @@
+"""/api/ask/stream with the stub LLM: SSE event sequence and cancellation on client disconnect"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api.main as main
+from src.fakes import FakeLLM, HashingEmbeddings
+from src.lifecycle import Warmup
+from src.rag_system import RAGDemo
+from src.vector_index import VectorIndex
+
+ANSWER = "Controllers notify the supervisory authority within 72 hours."
+TEXTS = [
+    "Article 33 In the case of a personal data breach, the controller shall notify the supervisory authority.",
+    "Article 34 The controller shall communicate the personal data breach to the data subject.",
+    "Article 37 The controller and the processor shall designate a data protection officer.",
+]
+
+
+@pytest.fixture
+def llm(tmp_path, monkeypatch):
+    llm = FakeLLM(delay=0, answer=ANSWER, token_delay=0.01)
+    rag = RAGDemo(gemini_api_key="", llm=llm, embeddings=HashingEmbeddings(), storage_dir=str(tmp_path))
+    embeddings = HashingEmbeddings()
+    rag.registry.add("doc", VectorIndex.from_embeddings(
+        TEXTS, embeddings.embed_documents(TEXTS), [{"source": text[:10]} for text in TEXTS], index_type="flat"))
+    warmup = Warmup([])
+    warmup.start()
+    warmup.wait()
+    monkeypatch.setattr(main, "rag_system", rag)
+    monkeypatch.setattr(main, "warmup", warmup)
+    return llm
+
+
+def parse_events(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_stream_event_sequence(llm):
+    response = TestClient(main.app).post("/api/ask/stream", json={"question": "When is a breach notified?",
+                                                                   "document_id": "doc"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = parse_events(response.text)
+    names = [name for name, _ in events]
+    assert names[0] == "chunks" and names[-1] == "done"
+    assert set(names[1:-1]) == {"token"} and len(names) > 3
+    assert events[0][1]["chunks"]
+    assert "".join(data["text"] for name, data in events if name == "token") == ANSWER
+    assert events[-1][1]["error"] is None
+    assert llm.streams_cancelled == 0
+
+
+def test_client_disconnect_cancels_generation(llm):
+    class DisconnectingRequest:
+        """Reports a disconnect once the first token has been sent"""
+
+        def __init__(self):
+            self.checks = 0
+
+        async def is_disconnected(self):
+            self.checks += 1
+            return self.checks > 2
+
+    async def consume():
+        request = main.QuestionRequest(question="When is a breach notified?", document_id="doc")
+        response = await main.ask_question_stream(request, DisconnectingRequest())
+        return [chunk async for chunk in response.body_iterator]
+
+    sent = asyncio.run(consume())
+
+    assert [chunk.split("\n", 1)[0] for chunk in sent] == ["event: chunks", "event: token"]
+    assert llm.streams_cancelled == 1
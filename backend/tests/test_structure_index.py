@@ -0,0 +1,25 @@
+"""StructureIndex: cited articles and chapters resolve to chunk ids, and survive a save / load"""
+
+from src.structure_index import StructureIndex
+
+METADATAS = [
+    {"chapter": "CHAPTER IV Controller and processor", "article": "Article 33"},
+    {"chapter": "CHAPTER IV Controller and processor", "article": "Article 33"},
+    {"chapter": "CHAPTER IV Controller and processor", "article": "Article 34"},
+    {"chapter": "CHAPTER V Transfers", "article": "Article 44"},
+]
+
+
+def test_lookup_of_cited_articles_and_chapters():
+    hits = StructureIndex.from_metadatas(METADATAS).lookup("How do Article 44 and Chapter IV relate?")
+    assert hits.article_ids == [3]
+    assert hits.chapter_ids == [0, 1, 2]
+
+
+def test_round_trip_and_older_files():
+    structure = StructureIndex.from_metadatas(METADATAS)
+    data = structure.to_dict()
+    assert set(data) == {"articles", "chapters"}
+    # Indexes saved before chapter_articles was dropped still load
+    loaded = StructureIndex.from_dict({**data, "chapter_articles": {"4": [33, 34]}})
+    assert (loaded.articles, loaded.chapters) == (structure.articles, structure.chapters)
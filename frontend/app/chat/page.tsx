@@ -30,6 +30,7 @@ export default function ChatPage() {
   const searchParams = useSearchParams()
   const doc = searchParams.get("doc") || "gdpr.pdf"
   const docName = doc
+  const documentId = searchParams.get("document_id") || "gdpr"
 
   const [messages, setMessages] = useState<Message[]>([])
   const [input, setInput] = useState("")
@@ -62,6 +63,7 @@ export default function ChatPage() {
         body: JSON.stringify({
           question: question,
           top_k: 3,
+          document_id: documentId,
         }),
       })
 
@@ -7,6 +7,25 @@ import { FileText, Upload, Lock, Scale } from "lucide-react"
 import { useState, useRef } from "react"
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000"
+const JOB_POLL_INTERVAL_MS = 1000
+
+// Uploads are ingested in the background; poll the job until the index is ready
+async function waitForJob(jobId: string) {
+  while (true) {
+    const response = await fetch(`${API_BASE_URL}/api/jobs/${jobId}`)
+    if (!response.ok) {
+      throw new Error("Failed to check upload status")
+    }
+    const job = await response.json()
+    if (job.status === "completed") {
+      return job
+    }
+    if (job.status === "failed") {
+      throw new Error(job.error || "Failed to process document")
+    }
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS))
+  }
+}
 
 export default function HomePage() {
   const router = useRouter()
@@ -29,7 +48,7 @@ export default function HomePage() {
       }
 
       const data = await response.json()
-      router.push(`/chat?doc=gdpr.pdf&chunks=${data.chunks}`)
+      router.push(`/chat?doc=gdpr.pdf&document_id=${data.document_id}&chunks=${data.chunks}`)
     } catch (err) {
       setError(err instanceof Error ? err.message : "Failed to load document")
     } finally {
@@ -54,7 +73,10 @@ export default function HomePage() {
       }
 
       const data = await response.json()
-      router.push(`/chat?doc=${encodeURIComponent(data.document)}&chunks=${data.chunks}`)
+      const job = await waitForJob(data.job_id)
+      router.push(
+        `/chat?doc=${encodeURIComponent(data.document)}&document_id=${data.document_id}&chunks=${job.chunks_total}`,
+      )
     } catch (err) {
       setError(err instanceof Error ? err.message : "Failed to upload document")
     } finally {